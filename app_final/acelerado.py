@@ -0,0 +1,357 @@
+import math
+import os
+import time
+
+import numpy as np
+
+try:
+    import numba
+except ImportError:  # backend opcional: sem Numba, tudo roda pelo caminho NumPy
+    numba = None
+
+from defuzzificacao import METODOS, TOLERANCIA_MAXIMOS
+
+# -----------------------------------------------
+# BACKEND ACELERADO (NUMBA)
+# -----------------------------------------------
+#
+# O caminho NumPy do `SistemaCompilado` monta matrizes intermediárias por
+# etapa (graus, forças, uma curva (N, resolucao) por conjunto cortado...).
+# Aqui as quatro etapas viram um único laço por amostra, compilado pelo
+# Numba: fuzzificação (mesma regra de `np.interp`) → disparo das regras →
+# corte e agregação → defuzzificação, usando só vetores de trabalho
+# alocados uma vez por fatia de amostras. As fatias rodam em paralelo.
+#
+# Sem Numba instalado as mesmas funções continuam sendo Python puro (úteis
+# para conferir a lógica em lotes pequenos) e o backend "numba" não fica
+# disponível. Os resultados coincidem com o caminho NumPy até o
+# arredondamento da ordem das somas (~1e-12); o cálculo é sempre em float64.
+
+BACKENDS = ("numpy", "numba")
+NUMBA_DISPONIVEL = numba is not None
+
+_FATIA = 256
+
+if numba is not None:
+    _prange = numba.prange
+
+    def _jit(funcao, **opcoes):
+        return numba.njit(cache=True, **opcoes)(funcao)
+else:
+    _prange = range
+
+    def _jit(funcao, **opcoes):
+        return funcao
+
+
+def resolver_backend(backend=None):
+    """
+    "numpy", "numba" ou "auto" (Numba se instalado). Sem valor, usa a
+    variável de ambiente FUZZY_BACKEND (padrão "numpy").
+    """
+    backend = (backend or os.environ.get("FUZZY_BACKEND", "numpy")).lower().strip()
+    if backend == "auto":
+        return "numba" if NUMBA_DISPONIVEL else "numpy"
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend desconhecido: {backend}. Use {', '.join(BACKENDS)} ou auto.")
+    if backend == "numba" and not NUMBA_DISPONIVEL:
+        raise ValueError("O backend 'numba' exige o pacote numba (pip install numba).")
+    return backend
+
+
+# -----------------------------------------------
+# KERNELS
+# -----------------------------------------------
+
+
+def _interp(x, xp, fp):
+    # Mesma regra de np.interp: extremos constantes, acerto exato num nó
+    # devolve o nó, senão inclinação * (x - xp[j]) + fp[j]
+    if x != x:
+        return x
+    n = xp.shape[0]
+    if x < xp[0]:
+        return fp[0]
+    if x >= xp[n - 1]:
+        return fp[n - 1]
+    lo, hi = 0, n - 1
+    while hi - lo > 1:
+        meio = (lo + hi) >> 1
+        if xp[meio] <= x:
+            lo = meio
+        else:
+            hi = meio
+    if xp[lo] == x:
+        return fp[lo]
+    inclinacao = (fp[lo + 1] - fp[lo]) / (xp[lo + 1] - xp[lo])
+    return inclinacao * (x - xp[lo]) + fp[lo]
+
+
+def _tnorma(codigo, p, a, b):
+    # Mesma ordem de `operadores.TNORMAS`
+    if codigo == 0:
+        return min(a, b)
+    if codigo == 1:
+        return a * b
+    if codigo == 2:
+        return max(a + b - 1, 0.0)
+    if codigo == 3:
+        den = p + (1 - p) * (a + b - a * b)
+        return a * b / den if den > 0 else 0.0
+    if codigo == 4:
+        return max(1 - ((1 - a) ** p + (1 - b) ** p) ** (1 / p), 0.0)
+    return a * b / (2 - (a + b - a * b))
+
+
+def _tconorma(codigo, p, a, b):
+    # Mesma ordem de `operadores.TCONORMAS`
+    if codigo == 0:
+        return max(a, b)
+    if codigo == 1:
+        return a + b - a * b
+    if codigo == 2:
+        return min(a + b, 1.0)
+    if codigo == 3:
+        den = 1 - (1 - p) * a * b
+        return (a + b - (2 - p) * a * b) / den if den > 0 else 1.0
+    if codigo == 4:
+        return min((a ** p + b ** p) ** (1 / p), 1.0)
+    return (a + b) / (1 + a * b)
+
+
+def _defuzzificar(xs, agg, metodo, tol):
+    res = agg.shape[0]
+    if metodo == 0:  # centroid
+        num = 0.0
+        den = 0.0
+        for p in range(res):
+            num += agg[p] * xs[p]
+            den += agg[p]
+        return num / den if den != 0 else 0.0
+    if metodo == 1:  # bisector
+        total = 0.0
+        for p in range(1, res):
+            total += (agg[p - 1] + agg[p]) * (0.5 * (xs[p] - xs[p - 1]))
+        if not total > 0:
+            return 0.0
+        metade = 0.5 * total
+        acumulada = 0.0
+        j = res - 1
+        for p in range(1, res):
+            area = (agg[p - 1] + agg[p]) * (0.5 * (xs[p] - xs[p - 1]))
+            if acumulada + area >= metade:
+                j = p
+                break
+            acumulada += area
+        a = agg[j - 1]
+        b = agg[j]
+        h = xs[j] - xs[j - 1]
+        resto = metade - acumulada
+        den = a + math.sqrt(max(a * a + 2 * (b - a) / h * resto, 0.0))
+        t = 2 * resto / den if den > 0 else 0.0
+        return xs[j - 1] + min(max(t, 0.0), h)
+    maximo = agg[0]
+    for p in range(1, res):
+        if agg[p] > maximo:
+            maximo = agg[p]
+    limite = maximo * (1 - tol)
+    if metodo == 2:  # mom
+        soma = 0.0
+        contagem = 0
+        for p in range(res):
+            if agg[p] >= limite:
+                soma += xs[p]
+                contagem += 1
+        return soma / contagem
+    if metodo == 3:  # lom
+        for p in range(res - 1, -1, -1):
+            if agg[p] >= limite:
+                return xs[p]
+    for p in range(res):  # som
+        if agg[p] >= limite:
+            return xs[p]
+    return 0.0
+
+
+def _avaliar_fatias(X, coluna, x_entradas, curvas_termos, inicio_regra, termos_regra,
+                    regra_and, saida_regra, conj_regra, x_saidas, curvas_saida, n_conj,
+                    centros, alturas, cod_and, p_and, cod_or, p_or, ag_soma, metodo, tol, out):
+    n = X.shape[0]
+    n_termos = curvas_termos.shape[0]
+    n_regras = regra_and.shape[0]
+    n_saidas = x_saidas.shape[0]
+    k_max = curvas_saida.shape[1]
+    res = x_saidas.shape[1]
+    n_fatias = (n + _FATIA - 1) // _FATIA
+    for fatia in _prange(n_fatias):
+        # Vetores de trabalho da fatia: nada é alocado dentro do laço das amostras
+        g = np.empty(n_termos)
+        f = np.empty(n_regras)
+        ativ = np.empty((n_saidas, k_max))
+        agg = np.empty(res)
+        for i in range(fatia * _FATIA, min(n, (fatia + 1) * _FATIA)):
+            for t in range(n_termos):
+                c = coluna[t]
+                g[t] = _interp(X[i, c], x_entradas[c], curvas_termos[t])
+
+            for r in range(n_regras):
+                v = g[termos_regra[inicio_regra[r]]]
+                for j in range(inicio_regra[r] + 1, inicio_regra[r + 1]):
+                    w = g[termos_regra[j]]
+                    if regra_and[r]:
+                        v = _tnorma(cod_and, p_and, v, w)
+                    else:
+                        v = _tconorma(cod_or, p_or, v, w)
+                f[r] = v
+
+            ativ[:, :] = 0.0
+            for r in range(n_regras):
+                s = saida_regra[r]
+                k = conj_regra[r]
+                if ag_soma:
+                    ativ[s, k] += f[r]
+                elif f[r] > ativ[s, k]:
+                    ativ[s, k] = f[r]
+
+            for s in range(n_saidas):
+                if metodo >= 5:  # wtaver / height: sem curva agregada
+                    num = 0.0
+                    den = 0.0
+                    for k in range(n_conj[s]):
+                        h = min(min(ativ[s, k], 1.0) if ag_soma else ativ[s, k], alturas[s, k])
+                        num += h * centros[s, k]
+                        den += h
+                    out[i, s] = num / den if den != 0 else 0.0
+                    continue
+
+                agg[:] = 0.0
+                if ag_soma:
+                    for r in range(n_regras):
+                        if saida_regra[r] == s:
+                            fr = f[r]
+                            k = conj_regra[r]
+                            for p in range(res):
+                                agg[p] += min(fr, curvas_saida[s, k, p])
+                    for p in range(res):
+                        if agg[p] > 1.0:
+                            agg[p] = 1.0
+                else:
+                    for k in range(n_conj[s]):
+                        a = ativ[s, k]
+                        for p in range(res):
+                            v = min(a, curvas_saida[s, k, p])
+                            if v > agg[p]:
+                                agg[p] = v
+                out[i, s] = _defuzzificar(x_saidas[s], agg, metodo, tol)
+
+
+_interp = _jit(_interp)
+_tnorma = _jit(_tnorma)
+_tconorma = _jit(_tconorma)
+_defuzzificar = _jit(_defuzzificar)
+_avaliar_fatias = _jit(_avaliar_fatias, parallel=True)
+
+
+class AvaliadorFundido:
+    """
+    Dados de um `SistemaCompilado` empacotados em vetores contíguos para o
+    kernel fundido. Criado na primeira avaliação com backend "numba".
+    """
+
+    def __init__(self, compilado):
+        c = compilado
+        self.saidas = c.saidas
+        self.coluna = np.ascontiguousarray(c.coluna_termo, dtype=np.int64)
+        self.x_entradas = np.array([c.x_entradas[e] for e in c.entradas], dtype=np.float64)
+        self.curvas_termos = np.array(c.curvas_termos, dtype=np.float64).reshape(
+            len(c.termos), c.resolucao)
+
+        tamanhos = [len(idx) for idx, _, _, _ in c.regras]
+        self.inicio_regra = np.concatenate([[0], np.cumsum(tamanhos)]).astype(np.int64)
+        self.termos_regra = (np.concatenate([idx for idx, _, _, _ in c.regras]).astype(np.int64)
+                             if c.regras else np.zeros(0, dtype=np.int64))
+        self.regra_and = np.array([a for _, a, _, _ in c.regras], dtype=np.bool_)
+        self.saida_regra = np.array([c.saidas.index(s) for _, _, s, _ in c.regras], dtype=np.int64)
+        self.conj_regra = np.array([k for _, _, _, k in c.regras], dtype=np.int64)
+
+        self.x_saidas = np.array([c.x_saidas[s] for s in c.saidas], dtype=np.float64)
+        self.n_conj = np.array([len(c.curvas_saida[s]) for s in c.saidas], dtype=np.int64)
+        k_max = max(int(self.n_conj.max(initial=0)), 1)
+        self.curvas_saida = np.zeros((len(c.saidas), k_max, c.resolucao))
+        self.centros = np.zeros((len(c.saidas), k_max))
+        self.alturas = np.zeros((len(c.saidas), k_max))
+        for j, s in enumerate(c.saidas):
+            k = self.n_conj[j]
+            self.curvas_saida[j, :k] = c.curvas_saida[s]
+            if s in c.centros_saida:
+                self.centros[j, :k], self.alturas[j, :k] = c.centros_saida[s]
+
+        self.cod_and, self.p_and = c.tnorma.codigo, float(c.tnorma.parametro or 0)
+        self.cod_or, self.p_or = c.tconorma.codigo, float(c.tconorma.parametro or 0)
+        self.ag_soma = c.agregacao != "max"
+        self.metodo = METODOS.index(c.defuzz)
+
+    def avaliar(self, X):
+        """Matriz (N, entradas) -> {saida: array (N,)} em float64."""
+        X = np.ascontiguousarray(X, dtype=np.float64)
+        out = np.empty((X.shape[0], len(self.saidas)))
+        _avaliar_fatias(X, self.coluna, self.x_entradas, self.curvas_termos, self.inicio_regra,
+                        self.termos_regra, self.regra_and, self.saida_regra, self.conj_regra,
+                        self.x_saidas, self.curvas_saida, self.n_conj, self.centros,
+                        self.alturas, self.cod_and, self.p_and, self.cod_or, self.p_or,
+                        self.ag_soma, self.metodo, TOLERANCIA_MAXIMOS, out)
+        return {s: out[:, j] for j, s in enumerate(self.saidas)}
+
+
+# -----------------------------------------------
+# BENCHMARK
+# -----------------------------------------------
+
+
+def comparar_backends(tamanhos=((2, 3), (2, 5), (3, 5), (4, 5), (4, 7)), n=20_000,
+                      df="centroid", ag="max", repeticoes=3, semente=0):
+    """
+    Amostras/s dos dois backends em bases de regras de grade (entradas ×
+    conjuntos -> conjuntos^entradas regras) e a maior diferença entre eles.
+    A primeira chamada do Numba (compilação) fica fora da medida.
+    """
+    from motor_fuzzy import compilar_sistema
+    from sistemas_sinteticos import sistema_grade
+
+    linhas = []
+    for n_entradas, n_conjuntos in tamanhos:
+        sistema = sistema_grade(n_entradas, n_conjuntos)
+        rng = np.random.default_rng(semente)
+        X = np.column_stack([rng.uniform(*map(float, info["universo"]), n)
+                             for info in sistema["entradas"].values()])
+        linha = {"regras": len(sistema["regras"]), "entradas": n_entradas}
+        resultados = {}
+        for backend in BACKENDS:
+            if backend == "numba" and not NUMBA_DISPONIVEL:
+                continue
+            compilado = compilar_sistema(sistema, None, ag, df, backend=backend)
+            resultados[backend] = compilado.avaliar(X)
+            melhor = float("inf")
+            for _ in range(repeticoes):
+                t0 = time.perf_counter()
+                compilado.avaliar(X)
+                melhor = min(melhor, time.perf_counter() - t0)
+            linha[f"{backend}_amostras_s"] = n / melhor
+        if "numba" in resultados:
+            linha["aceleracao"] = linha["numba_amostras_s"] / linha["numpy_amostras_s"]
+            linha["diferenca_maxima"] = max(
+                float(np.max(np.abs(resultados["numba"][s] - resultados["numpy"][s])))
+                for s in resultados["numpy"])
+        linhas.append(linha)
+    return linhas
+
+
+if __name__ == "__main__":
+    if not NUMBA_DISPONIVEL:
+        print("Numba não instalado: só o backend NumPy será medido.")
+    for linha in comparar_backends():
+        texto = f"{linha['regras']:5d} regras: numpy {linha['numpy_amostras_s']:12,.0f} amostras/s"
+        if "aceleracao" in linha:
+            texto += (f" | numba {linha['numba_amostras_s']:12,.0f} amostras/s"
+                      f" | {linha['aceleracao']:5.1f}x | Δmax {linha['diferenca_maxima']:.1e}")
+        print(texto)
@@ -0,0 +1,290 @@
+import hashlib
+import json
+import os
+import pickle
+import sqlite3
+import threading
+import time
+import zlib
+
+import numpy as np
+
+from acelerado import resolver_backend
+from motor_fuzzy import (carregar_sistema, compilar_sistema, compilar_tabela,
+                         normalizar_agregacao, normalizar_defuzz)
+from operadores import normalizar_ops
+
+# -----------------------------------------------
+# BIBLIOTECA DE SISTEMAS FUZZY (SQLITE)
+# -----------------------------------------------
+#
+# Guarda sistemas do Editor e do Gerador num arquivo SQLite local.
+# - Cada sistema é identificado pelo hash do seu conteúdo (JSON canônico de
+#   entradas, saídas e regras): salvar duas vezes o mesmo sistema não duplica.
+# - Os metadados (nome, tema, nº de regras, variáveis) ficam em tabelas
+#   pequenas e indexadas; a definição completa fica à parte, comprimida, e
+#   só é lida em `carregar` (listagens e buscas nunca a tocam).
+# - A busca por prefixo usa intervalos [prefixo, prefixo + U+FFFF) sobre
+#   colunas em minúsculas, que o SQLite resolve pelo índice.
+# - Artefatos compilados (SistemaCompilado, TabelaConsulta) ficam no mesmo
+#   arquivo, indexados pelo hash do sistema e pelos parâmetros de compilação.
+
+# Incrementar quando a estrutura dos objetos compilados mudar: artefatos de
+# versões anteriores são ignorados e recompilados.
+VERSAO_ARTEFATO = 4
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS sistemas (
+    id          INTEGER PRIMARY KEY,
+    hash        TEXT NOT NULL UNIQUE,
+    nome        TEXT NOT NULL,
+    nome_busca  TEXT NOT NULL,
+    tema        TEXT NOT NULL DEFAULT '',
+    tema_busca  TEXT NOT NULL DEFAULT '',
+    n_entradas  INTEGER NOT NULL,
+    n_saidas    INTEGER NOT NULL,
+    n_regras    INTEGER NOT NULL,
+    criado_em   REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_sistemas_nome ON sistemas(nome_busca);
+CREATE INDEX IF NOT EXISTS idx_sistemas_tema ON sistemas(tema_busca);
+CREATE INDEX IF NOT EXISTS idx_sistemas_regras ON sistemas(n_regras);
+
+CREATE TABLE IF NOT EXISTS variaveis (
+    sistema_id  INTEGER NOT NULL REFERENCES sistemas(id) ON DELETE CASCADE,
+    secao       TEXT NOT NULL,
+    nome        TEXT NOT NULL,
+    nome_busca  TEXT NOT NULL,
+    PRIMARY KEY (sistema_id, secao, nome)
+);
+CREATE INDEX IF NOT EXISTS idx_variaveis_nome ON variaveis(nome_busca);
+
+CREATE TABLE IF NOT EXISTS definicoes (
+    sistema_id  INTEGER PRIMARY KEY REFERENCES sistemas(id) ON DELETE CASCADE,
+    json_z      BLOB NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS artefatos (
+    hash        TEXT NOT NULL REFERENCES sistemas(hash) ON DELETE CASCADE,
+    chave       TEXT NOT NULL,
+    versao      INTEGER NOT NULL,
+    dados       BLOB NOT NULL,
+    criado_em   REAL NOT NULL,
+    PRIMARY KEY (hash, chave)
+);
+"""
+
+_COLUNAS_RESUMO = "id, hash, nome, tema, n_entradas, n_saidas, n_regras, criado_em"
+
+
+def json_canonico(sistema):
+    """JSON determinístico do sistema (chaves ordenadas, tuplas como listas)."""
+    sistema = carregar_sistema(sistema)
+    return json.dumps({k: sistema[k] for k in ("entradas", "saidas", "regras")},
+                      sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+
+
+def hash_sistema(sistema):
+    return hashlib.sha256(json_canonico(sistema).encode("utf-8")).hexdigest()
+
+
+def _intervalo_prefixo(prefixo):
+    p = prefixo.strip().lower()
+    return p, p + "\uffff"
+
+
+def _resumo(linha):
+    return dict(zip(("id", "hash", "nome", "tema", "n_entradas", "n_saidas",
+                     "n_regras", "criado_em"), linha))
+
+
+class BibliotecaSistemas:
+    """
+    Acesso à biblioteca. Uma conexão por instância, protegida por trava
+    (o Streamlit atende reruns em threads diferentes).
+    """
+
+    def __init__(self, caminho="biblioteca_fuzzy.db"):
+        self.caminho = caminho
+        self._trava = threading.Lock()
+        self._con = sqlite3.connect(caminho, check_same_thread=False)
+        self._con.execute("PRAGMA foreign_keys = ON")
+        if caminho != ":memory:":
+            self._con.execute("PRAGMA journal_mode = WAL")
+        self._con.executescript(_ESQUEMA)
+
+    def fechar(self):
+        with self._trava:
+            self._con.close()
+
+    # ---------------- escrita ----------------
+
+    def salvar(self, sistema, nome="", tema=""):
+        """
+        Salva o sistema e retorna seu hash. Se o mesmo conteúdo já existe,
+        só atualiza nome/tema quando informados.
+        """
+        sistema = carregar_sistema(sistema)
+        texto = json_canonico(sistema)
+        chave = hashlib.sha256(texto.encode("utf-8")).hexdigest()
+        nome = nome.strip() or "sem nome"
+        tema = tema.strip()
+        with self._trava, self._con:
+            existente = self._con.execute(
+                "SELECT id FROM sistemas WHERE hash = ?", (chave,)).fetchone()
+            if existente is not None:
+                if nome != "sem nome" or tema:
+                    self._con.execute(
+                        "UPDATE sistemas SET nome = ?, nome_busca = ?, tema = ?, tema_busca = ? "
+                        "WHERE id = ?", (nome, nome.lower(), tema, tema.lower(), existente[0]))
+                return chave
+            cur = self._con.execute(
+                "INSERT INTO sistemas (hash, nome, nome_busca, tema, tema_busca, "
+                "n_entradas, n_saidas, n_regras, criado_em) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (chave, nome, nome.lower(), tema, tema.lower(), len(sistema["entradas"]),
+                 len(sistema["saidas"]), len(sistema["regras"]), time.time()))
+            sistema_id = cur.lastrowid
+            self._con.executemany(
+                "INSERT INTO variaveis (sistema_id, secao, nome, nome_busca) VALUES (?, ?, ?, ?)",
+                [(sistema_id, secao, var, var.lower())
+                 for secao in ("entradas", "saidas") for var in sistema[secao]])
+            self._con.execute("INSERT INTO definicoes (sistema_id, json_z) VALUES (?, ?)",
+                              (sistema_id, zlib.compress(texto.encode("utf-8"))))
+        return chave
+
+    def salvar_varios(self, itens):
+        """`itens`: iterável de (sistema, nome, tema). Retorna a lista de hashes."""
+        return [self.salvar(s, nome, tema) for s, nome, tema in itens]
+
+    def remover(self, chave):
+        with self._trava, self._con:
+            self._con.execute("DELETE FROM sistemas WHERE hash = ?", (chave,))
+
+    # ---------------- consulta ----------------
+
+    def __len__(self):
+        with self._trava:
+            return self._con.execute("SELECT COUNT(*) FROM sistemas").fetchone()[0]
+
+    def buscar(self, prefixo="", campo="nome", min_regras=None, max_regras=None, limite=50):
+        """
+        Metadados (sem a definição) dos sistemas cujo `campo` começa com
+        `prefixo`, sem diferenciar maiúsculas. `campo`: "nome", "tema" ou
+        "variavel" (qualquer entrada/saída com esse prefixo).
+        """
+        condicoes, args = [], []
+        if prefixo.strip():
+            ini, fim = _intervalo_prefixo(prefixo)
+            if campo == "variavel":
+                condicoes.append("id IN (SELECT sistema_id FROM variaveis "
+                                 "WHERE nome_busca >= ? AND nome_busca < ?)")
+            elif campo in ("nome", "tema"):
+                condicoes.append(f"{campo}_busca >= ? AND {campo}_busca < ?")
+            else:
+                raise ValueError(f"Campo de busca desconhecido: {campo}")
+            args += [ini, fim]
+        if min_regras is not None:
+            condicoes.append("n_regras >= ?")
+            args.append(int(min_regras))
+        if max_regras is not None:
+            condicoes.append("n_regras <= ?")
+            args.append(int(max_regras))
+        sql = f"SELECT {_COLUNAS_RESUMO} FROM sistemas"
+        if condicoes:
+            sql += " WHERE " + " AND ".join(condicoes)
+        sql += " ORDER BY nome_busca, id LIMIT ?"
+        args.append(int(limite))
+        with self._trava:
+            return [_resumo(l) for l in self._con.execute(sql, args)]
+
+    def variaveis(self, chave):
+        with self._trava:
+            return [{"secao": s, "nome": n} for s, n in self._con.execute(
+                "SELECT v.secao, v.nome FROM variaveis v JOIN sistemas s ON s.id = v.sistema_id "
+                "WHERE s.hash = ? ORDER BY v.secao, v.nome", (chave,))]
+
+    def resolver_hash(self, prefixo):
+        """Hash completo a partir de um prefixo (como o exibido no app)."""
+        ini, fim = _intervalo_prefixo(prefixo)
+        with self._trava:
+            linhas = self._con.execute(
+                "SELECT hash FROM sistemas WHERE hash >= ? AND hash < ? LIMIT 2",
+                (ini, fim)).fetchall()
+        if len(linhas) != 1:
+            raise KeyError(f"Prefixo de hash {'ambíguo' if linhas else 'não encontrado'}: "
+                           f"{prefixo}")
+        return linhas[0][0]
+
+    def carregar(self, chave):
+        """Definição completa (formato `sistema`) do hash informado."""
+        with self._trava:
+            linha = self._con.execute(
+                "SELECT d.json_z FROM definicoes d JOIN sistemas s ON s.id = d.sistema_id "
+                "WHERE s.hash = ?", (chave,)).fetchone()
+        if linha is None:
+            raise KeyError(f"Sistema não encontrado: {chave}")
+        return carregar_sistema(json.loads(zlib.decompress(linha[0]).decode("utf-8")))
+
+    # ---------------- artefatos compilados ----------------
+
+    def compilado(self, chave, ops=None, ag="max", df="centroid", tipo="lote", pontos=201,
+                  dtype="float64", backend=None):
+        """
+        `SistemaCompilado` (tipo="lote") ou `TabelaConsulta` (tipo="lut") do
+        sistema, no `dtype` e `backend` pedidos, lido do cache de artefatos ou
+        compilado e gravado nele. O backend faz parte da chave do lote: um
+        artefato gravado com FUZZY_BACKEND=numba não volta em outro ambiente.
+        Os artefatos são pickles gerados por esta própria biblioteca: não
+        abra arquivos .db de origem desconhecida.
+        """
+        dtype = np.dtype(dtype).name
+        # Rótulos do Editor e chaves equivalentes dão o mesmo artefato
+        ops = normalizar_ops(ops)
+        ag = normalizar_agregacao(ag)
+        df = normalizar_defuzz(df)
+        backend = resolver_backend(backend)
+        # A LUT é a mesma em qualquer backend (ele só acelera a construção)
+        parametros = json.dumps([tipo, ops, ag, df, pontos if tipo == "lut" else None, dtype,
+                                 backend if tipo == "lote" else None], sort_keys=True)
+        with self._trava:
+            linha = self._con.execute(
+                "SELECT dados FROM artefatos WHERE hash = ? AND chave = ? AND versao = ?",
+                (chave, parametros, VERSAO_ARTEFATO)).fetchone()
+        if linha is not None:
+            try:
+                return pickle.loads(linha[0])
+            except Exception:
+                pass  # artefato corrompido ou de outra versão do código: recompila
+
+        sistema = self.carregar(chave)
+        if tipo == "lut":
+            objeto = compilar_tabela(sistema, ops, ag, df, pontos, dtype, backend=backend)
+        elif tipo == "lote":
+            objeto = compilar_sistema(sistema, ops, ag, df, dtype=dtype, backend=backend)
+        else:
+            raise ValueError(f"Tipo de artefato desconhecido: {tipo}")
+        with self._trava, self._con:
+            self._con.execute(
+                "INSERT OR REPLACE INTO artefatos (hash, chave, versao, dados, criado_em) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (chave, parametros, VERSAO_ARTEFATO,
+                 pickle.dumps(objeto, protocol=pickle.HIGHEST_PROTOCOL), time.time()))
+        return objeto
+
+    def limpar_artefatos(self):
+        with self._trava, self._con:
+            self._con.execute("DELETE FROM artefatos")
+
+
+_abertas = {}
+_trava_abertas = threading.Lock()
+
+
+def abrir_biblioteca(caminho=None):
+    """Uma `BibliotecaSistemas` por arquivo e por processo (reaproveitada nos reruns)."""
+    caminho = os.path.abspath(caminho or os.path.join(os.path.dirname(__file__),
+                                                      "biblioteca_fuzzy.db"))
+    with _trava_abertas:
+        if caminho not in _abertas:
+            _abertas[caminho] = BibliotecaSistemas(caminho)
+        return _abertas[caminho]
@@ -0,0 +1,111 @@
+import time
+
+import numpy as np
+
+from metricas import INFERENCIAS
+from motor_fuzzy import TabelaConsulta, compilar_sistema, compilar_tabela
+
+# -----------------------------------------------
+# SIMULAÇÃO EM MALHA FECHADA (VENTILADOR + PLANTA TÉRMICA)
+# -----------------------------------------------
+#
+# Planta: um ambiente com ganho de calor constante, troca passiva com o
+# exterior e resfriamento proporcional à potência do ventilador:
+#   dT/dt = (T_ext - T) / tau + ganho_calor - resfriamento * P / 100
+# integrada por Euler com passo `dt`. Todas as condições iniciais avançam
+# juntas (um vetor de estados), então cada passo é uma única consulta ao
+# controlador para todas as execuções.
+
+
+def sistema_ventilador():
+    """O controlador da página "Exemplo Controle Fuzzy" como `sistema`."""
+    return {
+        "entradas": {
+            "temperatura": {
+                "universo": [0.0, 40.0],
+                "conjuntos": {
+                    "fria": {"tipo": "trimf", "params": [0, 0, 15]},
+                    "amena": {"tipo": "trimf", "params": [10, 20, 30]},
+                    "quente": {"tipo": "trimf", "params": [25, 40, 40]},
+                },
+            },
+        },
+        "saidas": {
+            "potencia": {
+                "universo": [0.0, 100.0],
+                "conjuntos": {
+                    "baixa": {"tipo": "trimf", "params": [0, 0, 50]},
+                    "media": {"tipo": "trimf", "params": [25, 50, 75]},
+                    "alta": {"tipo": "trimf", "params": [50, 100, 100]},
+                },
+            },
+        },
+        "regras": [
+            {"antecedentes": [("temperatura", "fria")],
+             "consequente": ("potencia", "baixa"), "logica": "AND"},
+            {"antecedentes": [("temperatura", "amena")],
+             "consequente": ("potencia", "media"), "logica": "AND"},
+            {"antecedentes": [("temperatura", "quente")],
+             "consequente": ("potencia", "alta"), "logica": "AND"},
+        ],
+    }
+
+
+def criar_controlador(sistema=None, motor="lut", pontos=401):
+    """
+    motor="lut": tabela de consulta pré-calculada (caminho rápido);
+    motor="lote": inferência completa vetorizada a cada passo.
+    """
+    sistema = sistema or sistema_ventilador()
+    if motor == "lut":
+        return compilar_tabela(sistema, pontos=pontos)
+    return compilar_sistema(sistema)
+
+
+def simular_malha_fechada(controlador, temperaturas_iniciais, passos=5000, dt=1.0,
+                          t_ext=32.0, tau=900.0, ganho_calor=0.01, resfriamento=0.05,
+                          entrada="temperatura", saida="potencia", registrar_cada=1):
+    """
+    Simula `len(temperaturas_iniciais)` execuções em paralelo.
+    Retorna dict com "tempo" (K,), "temperatura" (K, M), "potencia" (K, M)
+    registrados a cada `registrar_cada` passos, e "passos_por_s"
+    (passos de execução simulados por segundo, somando as execuções).
+    """
+    T = np.array(temperaturas_iniciais, dtype=float).ravel()
+    n_reg = passos // registrar_cada + 1
+    hist_T = np.empty((n_reg, len(T)))
+    hist_P = np.empty((n_reg, len(T)))
+    tempo = np.arange(n_reg) * dt * registrar_cada
+
+    consulta = {entrada: T}
+    t0 = time.perf_counter()
+    P = controlador.avaliar(consulta)[saida]
+    hist_T[0], hist_P[0] = T, P
+    for passo in range(1, passos + 1):
+        T = T + dt * ((t_ext - T) / tau + ganho_calor - resfriamento * P / 100)
+        consulta[entrada] = T
+        P = controlador.avaliar(consulta)[saida]
+        if passo % registrar_cada == 0:
+            hist_T[passo // registrar_cada] = T
+            hist_P[passo // registrar_cada] = P
+    duracao = time.perf_counter() - t0
+    # A LUT não conta as próprias consultas (custam poucos µs): conta-se aqui
+    if isinstance(controlador, TabelaConsulta):
+        INFERENCIAS.inc((passos + 1) * len(T), "lut")
+
+    return {
+        "tempo": tempo,
+        "temperatura": hist_T,
+        "potencia": hist_P,
+        "tempo_s": duracao,
+        "passos_por_s": passos * len(T) / duracao if duracao > 0 else float("inf"),
+    }
+
+
+def erro_tabela(tabela, compilado, n=10_000, semente=0):
+    """Maior diferença entre a LUT e a inferência completa em pontos aleatórios."""
+    rng = np.random.default_rng(semente)
+    X = np.column_stack([rng.uniform(e[0], e[-1], n) for e in tabela.eixos])
+    exato = compilado.avaliar(X)
+    aprox = tabela.avaliar(X)
+    return max(float(np.max(np.abs(exato[s] - aprox[s]))) for s in exato)
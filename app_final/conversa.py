@@ -0,0 +1,180 @@
+import time
+from collections import deque
+
+# -----------------------------------------------
+# HISTÓRICO DO CHATBOT COM ORÇAMENTO DE TOKENS
+# -----------------------------------------------
+#
+# O histórico é um buffer circular de turnos (pergunta + resposta): acima da
+# capacidade, o turno mais antigo sai do buffer e deixa uma linha num resumo
+# acumulado, também limitado. A cada pergunta, `montar_contexto` escolhe o
+# que cabe no orçamento de tokens, do mais recente para o mais antigo:
+#   1. turnos inteiros;
+#   2. turnos que não couberam inteiros viram uma linha truncada;
+#   3. o resumo dos turnos que já saíram do buffer, se ainda couber.
+# Os resumos são extrativos (trechos truncados), sem chamada extra ao modelo.
+# Os tokens são estimados por caracteres (~4 por token), o suficiente para
+# controlar o tamanho do prompt sem depender do tokenizador do modelo.
+
+INSTRUCAO = ("Você é um tutor de lógica fuzzy. Responda em português, de forma "
+             "didática, levando em conta a conversa anterior quando for relevante.")
+
+CAPACIDADE_PADRAO = 50
+ORCAMENTO_PADRAO = 2000
+MAX_TOKENS_RESUMO = 300
+
+_CARACTERES_POR_TOKEN = 4
+_TITULO_RESUMO = "Resumo do início da conversa:\n"
+_TITULO_RECENTE = "Conversa recente:\n"
+
+
+def estimar_tokens(texto):
+    return (len(texto) + _CARACTERES_POR_TOKEN - 1) // _CARACTERES_POR_TOKEN
+
+
+def _truncar(texto, limite):
+    texto = " ".join(texto.split())
+    return texto if len(texto) <= limite else texto[:limite - 1].rstrip() + "…"
+
+
+def _bloco_turno(turno):
+    return f"Aluno: {turno['pergunta']}\nTutor: {turno['resposta']}\n"
+
+
+def _linha_turno(turno):
+    return (f"- Aluno perguntou: {_truncar(turno['pergunta'], 120)} | "
+            f"Tutor: {_truncar(turno['resposta'], 160)}\n")
+
+
+class HistoricoConversa:
+    """
+    Buffer circular dos turnos da conversa, com resumo dos descartados e
+    medidas (tokens do prompt, latência) de cada turno.
+    """
+
+    def __init__(self, capacidade=CAPACIDADE_PADRAO, max_tokens_resumo=MAX_TOKENS_RESUMO):
+        self.turnos = deque(maxlen=capacidade)
+        self.resumo = deque()
+        self.tokens_resumo = 0
+        self.max_tokens_resumo = max_tokens_resumo
+        self.total_turnos = 0
+
+    def __len__(self):
+        return len(self.turnos)
+
+    def limpar(self):
+        self.turnos.clear()
+        self.resumo.clear()
+        self.tokens_resumo = 0
+        self.total_turnos = 0
+
+    def registrar(self, pergunta, resposta, tokens_prompt=None, latencia_s=None):
+        if len(self.turnos) == self.turnos.maxlen:
+            self._resumir(self.turnos[0])
+        self.total_turnos += 1
+        self.turnos.append({
+            "numero": self.total_turnos,
+            "pergunta": pergunta,
+            "resposta": resposta,
+            "tokens_prompt": tokens_prompt,
+            "latencia_s": latencia_s,
+        })
+
+    def _resumir(self, turno):
+        linha = _linha_turno(turno)
+        self.resumo.append(linha)
+        self.tokens_resumo += estimar_tokens(linha)
+        while self.tokens_resumo > self.max_tokens_resumo and self.resumo:
+            self.tokens_resumo -= estimar_tokens(self.resumo.popleft())
+
+    def janela(self, n):
+        """Os últimos `n` turnos (para exibir só o final da conversa)."""
+        inicio = max(len(self.turnos) - n, 0)
+        return [self.turnos[i] for i in range(inicio, len(self.turnos))]
+
+    def montar_contexto(self, pergunta, orcamento=ORCAMENTO_PADRAO):
+        """
+        Prompt com a instrução, o máximo de contexto que cabe em `orcamento`
+        tokens e a pergunta. Retorna (prompt, info).
+        """
+        cabecalho = INSTRUCAO + "\n\n"
+        final = f"Pergunta atual do aluno: {pergunta}\n"
+        restante = (orcamento - estimar_tokens(cabecalho) - estimar_tokens(final)
+                    - estimar_tokens(_TITULO_RESUMO + _TITULO_RECENTE + "\n\n"))
+
+        completos, resumidos = [], []
+        i = len(self.turnos) - 1
+        while i >= 0:
+            t = estimar_tokens(_bloco_turno(self.turnos[i]))
+            if t > restante:
+                break
+            completos.append(_bloco_turno(self.turnos[i]))
+            restante -= t
+            i -= 1
+        while i >= 0:
+            linha = _linha_turno(self.turnos[i])
+            t = estimar_tokens(linha)
+            if t > restante:
+                break
+            resumidos.append(linha)
+            restante -= t
+            i -= 1
+
+        resumo_antigo = []
+        if i < 0:
+            for linha in reversed(self.resumo):
+                t = estimar_tokens(linha)
+                if t > restante:
+                    break
+                resumo_antigo.append(linha)
+                restante -= t
+
+        partes = [cabecalho]
+        if resumo_antigo or resumidos:
+            partes.append(_TITULO_RESUMO)
+            partes.extend(reversed(resumo_antigo))
+            partes.extend(reversed(resumidos))
+            partes.append("\n")
+        if completos:
+            partes.append(_TITULO_RECENTE)
+            partes.extend(reversed(completos))
+            partes.append("\n")
+        partes.append(final)
+        prompt = "".join(partes)
+        return prompt, {
+            "tokens_estimados": estimar_tokens(prompt),
+            "turnos_completos": len(completos),
+            "turnos_resumidos": len(resumidos) + len(resumo_antigo),
+            "turnos_omitidos": (self.total_turnos - len(completos) - len(resumidos)
+                                - len(resumo_antigo)),
+        }
+
+    def estatisticas(self):
+        """Tokens do prompt e latência dos turnos no buffer."""
+        return [{"turno": t["numero"], "tokens_prompt": t["tokens_prompt"],
+                 "latencia_s": t["latencia_s"]} for t in self.turnos]
+
+
+def tokens_usados(resposta, estimativa):
+    """Tokens do prompt informados pelo modelo, quando houver; senão a estimativa."""
+    uso = getattr(resposta, "usage_metadata", None)
+    return getattr(uso, "prompt_token_count", None) or estimativa
+
+
+def simular_sessao(n_turnos=500, orcamento=ORCAMENTO_PADRAO, capacidade=CAPACIDADE_PADRAO,
+                   tamanho_resposta=800):
+    """
+    Sessão sintética longa: tamanho do prompt e custo de montá-lo ao longo
+    dos turnos. Com o buffer e o orçamento, os dois param de crescer.
+    """
+    conversa = HistoricoConversa(capacidade)
+    medidas = []
+    for n in range(n_turnos):
+        pergunta = f"Pergunta {n}: como a defuzzificação afeta o resultado? " * 2
+        t0 = time.perf_counter()
+        prompt, info = conversa.montar_contexto(pergunta, orcamento)
+        medidas.append({"turno": n + 1, "tokens": info["tokens_estimados"],
+                        "montagem_s": time.perf_counter() - t0})
+        conversa.registrar(pergunta, "Resposta " + "x" * tamanho_resposta,
+                           info["tokens_estimados"])
+    return medidas
@@ -0,0 +1,237 @@
+import sys
+import time
+
+import numpy as np
+
+# -----------------------------------------------
+# DEFUZZIFICAÇÃO VETORIZADA
+# -----------------------------------------------
+#
+# Todos os métodos recebem um lote de curvas agregadas Y (N, R), amostradas
+# nos mesmos R pontos xs, e devolvem N valores numa única chamada.
+#
+# Métodos sobre a curva agregada:
+#   centroid  centro de área (Σ x·y / Σ y)
+#   bisector  ponto que divide a área ao meio (exato para a curva linear
+#             por partes entre as amostras)
+#   mom       média dos máximos
+#   lom       maior dos máximos
+#   som       menor dos máximos
+# Os máximos são os pontos com y >= max·(1 − tol): a comparação exata
+# (y == max) perde pontos do platô por diferenças de arredondamento.
+#
+# Métodos sobre os conjuntos de saída (caminho rápido: não precisam das
+# curvas agregadas, só da altura de ativação h_k de cada conjunto):
+#   wtaver    média dos centroides dos conjuntos ponderada por h_k
+#   height    média dos picos dos conjuntos ponderada por h_k
+
+METODOS_CURVA = ("centroid", "bisector", "mom", "lom", "som")
+METODOS_CONJUNTOS = ("wtaver", "height")
+METODOS = METODOS_CURVA + METODOS_CONJUNTOS
+
+# Tolerância relativa para considerar um ponto como máximo
+TOLERANCIA_MAXIMOS = 1e-6
+
+
+def centroide(xs, Y):
+    den = Y.sum(axis=1)
+    num = Y @ xs
+    return np.divide(num, den, out=np.zeros_like(num), where=den != 0)
+
+
+def _corte_area(xs, Y):
+    """
+    Para cada curva: índice j do fim do primeiro segmento em que a área
+    (trapézios) acumulada alcança a metade do total, a área até xs[j-1] e
+    a metade. Na grade uniforme (linspace) basta uma soma acumulada:
+    T_i = dx·(S_i − (y_0 + y_i)/2), com S_i = Σ_{k<=i} y_k, e o corte de T
+    é o corte de S ou o ponto seguinte.
+    """
+    linhas = np.arange(Y.shape[0])
+    dx = np.diff(xs)
+    # Em float32 a própria linspace só é uniforme até ~1e-4 relativo
+    if len(dx) and np.allclose(dx, dx[0], rtol=max(1e-9, 1e3 * np.finfo(xs.dtype).eps), atol=0):
+        h = dx[0]
+        # Soma acumulada sempre em float64 (em float32 o corte perde ~1e-5
+        # relativo), no lugar: cumsum(dtype=...) faria mais uma cópia inteira
+        S = Y.astype(np.float64)
+        np.cumsum(S, axis=1, out=S)
+        y0 = Y[:, 0]
+        metade = 0.5 * h * (S[:, -1] - 0.5 * (y0 + Y[:, -1]))
+        alvo = metade / h + 0.5 * y0
+        k = (S >= alvo[:, None]).argmax(axis=1)
+        j = np.clip(k + (S[linhas, k] - 0.5 * Y[linhas, k] < alvo), 1, Y.shape[1] - 1)
+        antes = h * (S[linhas, j - 1] - 0.5 * (y0 + Y[linhas, j - 1]))
+        return j, antes, metade
+    T = np.zeros(Y.shape)
+    np.cumsum((Y[:, :-1] + Y[:, 1:]) * (0.5 * dx), axis=1, out=T[:, 1:])
+    metade = 0.5 * T[:, -1]
+    j = np.maximum((T >= metade[:, None]).argmax(axis=1), 1)
+    return j, T[linhas, j - 1], metade
+
+
+def bissetor(xs, Y):
+    """Abscissa que divide a área de cada curva ao meio; 0 se a área é nula."""
+    j, antes, metade = _corte_area(xs, Y)
+    linhas = np.arange(Y.shape[0])
+    a, b, h = Y[linhas, j - 1], Y[linhas, j], xs[j] - xs[j - 1]
+    resto = metade - antes
+    # Dentro do segmento a área é a·t + (b − a)·t²/(2h); raiz na forma estável
+    den = a + np.sqrt(np.maximum(a * a + 2 * (b - a) / h * resto, 0))
+    t = np.divide(2 * resto, den, out=np.zeros_like(resto), where=den > 0)
+    return np.where(metade > 0, xs[j - 1] + np.clip(t, 0, h), 0.0).astype(Y.dtype, copy=False)
+
+
+def mascara_maximos(Y, tol=TOLERANCIA_MAXIMOS):
+    """Pontos de cada curva dentro da tolerância relativa do máximo (N, R)."""
+    return Y >= Y.max(axis=1, keepdims=True) * (1 - tol)
+
+
+def media_maximos(xs, Y, tol=TOLERANCIA_MAXIMOS):
+    maximos = mascara_maximos(Y, tol)
+    return (maximos @ xs) / maximos.sum(axis=1)
+
+
+def maior_maximo(xs, Y, tol=TOLERANCIA_MAXIMOS):
+    maximos = mascara_maximos(Y, tol)
+    return xs[Y.shape[1] - 1 - maximos[:, ::-1].argmax(axis=1)]
+
+
+def menor_maximo(xs, Y, tol=TOLERANCIA_MAXIMOS):
+    return xs[mascara_maximos(Y, tol).argmax(axis=1)]
+
+
+def defuzzificar_curvas(xs, Y, metodo, tol=TOLERANCIA_MAXIMOS):
+    """Defuzzifica um lote de curvas agregadas Y (N, R) pelo método informado."""
+    if metodo == "centroid":
+        return centroide(xs, Y)
+    elif metodo == "bisector":
+        return bissetor(xs, Y)
+    elif metodo == "mom":
+        return media_maximos(xs, Y, tol)
+    elif metodo == "lom":
+        return maior_maximo(xs, Y, tol)
+    elif metodo == "som":
+        return menor_maximo(xs, Y, tol)
+    raise ValueError(f"Método '{metodo}' não usa a curva agregada.")
+
+
+def centros_conjuntos(xs, curvas, metodo, tol=TOLERANCIA_MAXIMOS):
+    """
+    Centro (centroide para wtaver, média dos picos para height) e altura
+    máxima de cada curva de conjunto de saída (K, R). Calculados uma vez.
+    """
+    curvas = np.atleast_2d(curvas)
+    if metodo == "wtaver":
+        centros = centroide(xs, curvas)
+    elif metodo == "height":
+        centros = media_maximos(xs, curvas, tol)
+    else:
+        raise ValueError(f"Método '{metodo}' não usa os conjuntos de saída.")
+    return centros, curvas.max(axis=1)
+
+
+def defuzzificar_conjuntos(centros, alturas, H):
+    """
+    Média dos centros ponderada pelas alturas de ativação H (N, K), já
+    limitadas à altura de cada conjunto. 0 quando nenhuma regra dispara.
+    """
+    H = np.minimum(H, alturas)
+    den = H.sum(axis=1)
+    num = H @ centros
+    return np.divide(num, den, out=np.zeros_like(num), where=den != 0)
+
+
+# -----------------------------------------------
+# BENCHMARK
+# -----------------------------------------------
+
+
+def curvas_teste(n=20_000, resolucao=400, k=5, semente=0):
+    """
+    Lote de curvas agregadas com o formato das reais: `k` triângulos
+    igualmente espaçados, cada um cortado numa altura aleatória.
+    """
+    rng = np.random.default_rng(semente)
+    xs = np.linspace(0, 1, resolucao)
+    picos = np.linspace(0, 1, k)
+    largura = 1 / (k - 1)
+    curvas = np.clip(1 - np.abs(xs[None, :] - picos[:, None]) / largura, 0, None)
+    H = rng.uniform(0, 1, (n, k)) * (rng.uniform(size=(n, k)) < 0.5)
+    Y = np.zeros((n, resolucao))
+    for j in range(k):
+        np.fmax(Y, np.fmin(H[:, j, None], curvas[j]), out=Y)
+    return xs, Y, curvas, H
+
+
+def medir_metodos(n=20_000, resolucao=400, k=5, repeticoes=5, semente=0):
+    """
+    Vazão (curvas/s) de cada método sobre o mesmo lote sintético e a
+    diferença média, em unidades do universo, para o centroide.
+    """
+    xs, Y, curvas, H = curvas_teste(n, resolucao, k, semente)
+    referencia = centroide(xs, Y)
+    resultado = {}
+    for metodo in METODOS:
+        if metodo in METODOS_CURVA:
+            def rodar():
+                return defuzzificar_curvas(xs, Y, metodo)
+        else:
+            centros, alturas = centros_conjuntos(xs, curvas, metodo)
+
+            def rodar():
+                return defuzzificar_conjuntos(centros, alturas, H)
+        valores = rodar()
+        melhor = float("inf")
+        for _ in range(repeticoes):
+            t0 = time.perf_counter()
+            rodar()
+            melhor = min(melhor, time.perf_counter() - t0)
+        resultado[metodo] = {"curvas_por_s": n / melhor,
+                             "diferenca_media": float(np.mean(np.abs(valores - referencia)))}
+    return resultado
+
+
+def medir_sistema(sistema, ops=None, ag="max", n=20_000, repeticoes=3, semente=0):
+    """
+    Vazão de ponta a ponta (`SistemaCompilado.avaliar`) de cada método num
+    sistema real e a diferença média para o centroide, por saída somada.
+    """
+    from motor_fuzzy import carregar_sistema, compilar_sistema
+
+    sistema = carregar_sistema(sistema)
+    base = compilar_sistema(sistema, ops, ag, "centroid")
+    rng = np.random.default_rng(semente)
+    X = np.column_stack([rng.uniform(x[0], x[-1], n) for x in base.x_entradas.values()])
+    referencia = base.avaliar(X)
+    resultado = {}
+    for metodo in METODOS:
+        compilado = compilar_sistema(sistema, ops, ag, metodo)
+        valores = compilado.avaliar(X)
+        melhor = float("inf")
+        for _ in range(repeticoes):
+            t0 = time.perf_counter()
+            compilado.avaliar(X)
+            melhor = min(melhor, time.perf_counter() - t0)
+        resultado[metodo] = {
+            "amostras_por_s": n / melhor,
+            "diferenca_media": float(sum(np.mean(np.abs(valores[s] - referencia[s]))
+                                         for s in referencia)),
+        }
+    return resultado
+
+
+def _imprimir(titulo, resultado, unidade):
+    print(titulo)
+    for metodo, r in sorted(resultado.items(), key=lambda item: -item[1][unidade]):
+        print(f"  {metodo:9s} {r[unidade]:14,.0f} {unidade.replace('_', ' ')}"
+              f"   |Δ| para centroid: {r['diferenca_media']:.4g}")
+
+
+if __name__ == "__main__":
+    # Uso: python defuzzificacao.py [sistema.json]
+    _imprimir("Defuzzificação isolada (20.000 curvas × 400 pontos):",
+              medir_metodos(), "curvas_por_s")
+    if len(sys.argv) > 1:
+        _imprimir(f"Sistema {sys.argv[1]} (avaliação completa em lote):",
+                  medir_sistema(sys.argv[1]), "amostras_por_s")
@@ -0,0 +1,180 @@
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from sistemas_sinteticos import sistema_aleatorio
+
+# -----------------------------------------------
+# LATÊNCIA DOS RERUNS POR PÁGINA (STREAMLIT HEADLESS)
+# -----------------------------------------------
+#
+# Cada interação com um widget reexecuta o app.py inteiro. Aqui o app roda
+# sem navegador, pelo `AppTest` do Streamlit, com sistemas sintéticos de
+# tamanho crescente (entradas, conjuntos, regras) já no session_state.
+# Em cada página são simuladas as interações típicas (abrir a página,
+# mover um slider, clicar um botão) e cada rerun é medido duas vezes:
+# o tempo de parede sem instrumentação e, repetindo a mesma interação, o
+# pico de memória alocada (tracemalloc), além do número de elementos
+# desenhados. O relatório traz a tabela por tamanho e, por interação, o
+# expoente de escala do tempo com o número de regras (inclinação log-log):
+# ~1 é linear; bem acima disso indica uma página que não escala.
+#
+# O modelo de linguagem roda em replay local (FUZZY_LLM=replay), então
+# nada aqui depende de rede.
+
+APP = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+
+# (entradas, conjuntos por variável, regras)
+TAMANHOS = ((2, 3, 10), (4, 5, 50), (8, 7, 200), (16, 9, 800))
+
+
+def _como_json(sistema):
+    # O Gerador guarda o JSON do modelo: listas no lugar de tuplas e uma explicação
+    dados = json.loads(json.dumps(sistema))
+    dados["explicacao"] = "Sistema sintético do benchmark de reruns."
+    return dados
+
+
+def _botao(at, inicio):
+    return next(b for b in at.button if b.label.startswith(inicio))
+
+
+# Interações de cada página: (nome, função que prepara o rerun); "abrir" é a navegação
+INTERACOES = {
+    "Editor Fuzzy": (
+        ("atualizar", lambda at: _botao(at, "💾 Atualizar").click()),
+        ("universo", lambda at: at.slider[0].set_value((0.0, 90.0))),
+    ),
+    "Simulador Fuzzy": (
+        ("slider", lambda at: at.slider[0].set_value(25.0)),
+        ("slider_2", lambda at: at.slider[0].set_value(75.0)),
+    ),
+    "Gerador Automático de Exemplos": (
+        ("simular", lambda at: _botao(at, "Simular Sistema").click()),
+        ("slider", lambda at: at.slider[0].set_value(25.0)),
+    ),
+}
+
+
+def _contar_elementos(no):
+    filhos = getattr(no, "children", None)
+    if not filhos:
+        return 1
+    return 1 + sum(_contar_elementos(f) for f in filhos.values())
+
+
+def _rerun(at, preparar):
+    """Tempo (s) de um rerun depois de `preparar(at)`."""
+    preparar(at)
+    t0 = time.perf_counter()
+    at.run()
+    return time.perf_counter() - t0
+
+
+def medir_pagina(pagina, sistema, repeticoes=3, timeout=300):
+    """
+    Abre `pagina` com `sistema` no session_state e mede cada interação:
+    {interacao: {"mediana_ms", "max_ms", "pico_mb", "elementos"}}.
+    """
+    from streamlit.testing.v1 import AppTest
+
+    os.environ.setdefault("FUZZY_LLM", "replay")
+    os.environ.setdefault("FUZZY_LLM_LATENCIA", "0")
+    at = AppTest.from_file(APP, default_timeout=timeout)
+    at.session_state["sistema_fuzzy"] = sistema
+    at.session_state["gerador_json"] = _como_json(sistema)
+    at.run()  # primeira execução (imports, página inicial): fora da medida
+
+    def abrir(at):
+        at.sidebar.selectbox[0].set_value(pagina)
+
+    resultado = {}
+    for nome, preparar in (("abrir", abrir),) + INTERACOES.get(pagina, ()):
+        tempos = [_rerun(at, preparar) for _ in range(repeticoes)]
+        tracemalloc.start()
+        try:
+            _rerun(at, preparar)
+            _, pico = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        if at.exception:
+            raise RuntimeError(f"{pagina} / {nome}: {at.exception[0].message}")
+        resultado[nome] = {
+            "mediana_ms": float(np.median(tempos)) * 1000,
+            "max_ms": max(tempos) * 1000,
+            "pico_mb": pico / 2 ** 20,
+            "elementos": _contar_elementos(at.main),
+        }
+    return resultado
+
+
+def medir_escala(tamanhos=TAMANHOS, paginas=tuple(INTERACOES), repeticoes=3, semente=0):
+    """Mede todas as `paginas` em cada tamanho. Retorna uma linha por (tamanho, página, interação)."""
+    linhas = []
+    for n_entradas, n_conjuntos, n_regras in tamanhos:
+        sistema = sistema_aleatorio(n_entradas, n_conjuntos, n_regras, semente=semente)
+        for pagina in paginas:
+            for interacao, m in medir_pagina(pagina, sistema, repeticoes).items():
+                linhas.append({"entradas": n_entradas, "conjuntos": n_conjuntos,
+                               "regras": n_regras, "pagina": pagina,
+                               "interacao": interacao, **m})
+    return linhas
+
+
+def expoentes_escala(linhas):
+    """Inclinação de log(tempo) × log(regras) por (página, interação)."""
+    grupos = {}
+    for linha in linhas:
+        grupos.setdefault((linha["pagina"], linha["interacao"]), []).append(
+            (linha["regras"], linha["mediana_ms"]))
+    expoentes = {}
+    for chave, pontos in grupos.items():
+        if len({r for r, _ in pontos}) > 1:
+            r, t = np.log(np.array(pontos)).T
+            expoentes[chave] = float(np.polyfit(r, t, 1)[0])
+    return expoentes
+
+
+def escrever_relatorio(linhas, caminho):
+    """Relatório em Markdown (e as linhas em JSON ao lado, para comparar execuções)."""
+    expoentes = expoentes_escala(linhas)
+    partes = ["# Latência dos reruns por página", "",
+              "| página | interação | entradas | conjuntos | regras | mediana (ms) "
+              "| máx (ms) | pico (MB) | elementos |",
+              "|---|---|---:|---:|---:|---:|---:|---:|---:|"]
+    for l in linhas:
+        partes.append(f"| {l['pagina']} | {l['interacao']} | {l['entradas']} | {l['conjuntos']} "
+                      f"| {l['regras']} | {l['mediana_ms']:.1f} | {l['max_ms']:.1f} "
+                      f"| {l['pico_mb']:.1f} | {l['elementos']} |")
+    partes += ["", "## Expoente de escala (tempo ∝ regras^k)", "",
+               "| página | interação | k |", "|---|---|---:|"]
+    for (pagina, interacao), k in sorted(expoentes.items(), key=lambda item: -item[1]):
+        partes.append(f"| {pagina} | {interacao} | {k:.2f} |")
+    with open(caminho, "w", encoding="utf-8") as f:
+        f.write("\n".join(partes) + "\n")
+    with open(os.path.splitext(caminho)[0] + ".json", "w", encoding="utf-8") as f:
+        json.dump(linhas, f, ensure_ascii=False, indent=1)
+    return caminho
+
+
+if __name__ == "__main__":
+    # python desempenho_paginas.py [relatorio.md] [--limite-ms=2000]
+    # Com limite, termina com código 1 se algum rerun (mediana) passar dele.
+    argumentos = [a for a in sys.argv[1:] if not a.startswith("--")]
+    limite = next((float(a.split("=", 1)[1]) for a in sys.argv[1:]
+                   if a.startswith("--limite-ms=")), None)
+    linhas = medir_escala()
+    print(f"Relatório: {escrever_relatorio(linhas, argumentos[0] if argumentos else 'reruns.md')}")
+    for (pagina, interacao), k in expoentes_escala(linhas).items():
+        pior = max(l["mediana_ms"] for l in linhas
+                   if l["pagina"] == pagina and l["interacao"] == interacao)
+        print(f"  {pagina:32s} {interacao:10s} k={k:5.2f}  pior mediana {pior:9.1f} ms")
+    lentos = [l for l in linhas if limite is not None and l["mediana_ms"] > limite]
+    for l in lentos:
+        print(f"ACIMA DO LIMITE: {l['pagina']} / {l['interacao']} com {l['regras']} regras: "
+              f"{l['mediana_ms']:.0f} ms")
+    sys.exit(1 if lentos else 0)
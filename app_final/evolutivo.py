@@ -0,0 +1,234 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from metricas import CACHE
+from motor_fuzzy import como_matriz, compilar_sistema
+from operadores import TCONORMAS, TNORMAS, normalizar_ops, obter_tconorma, obter_tnorma
+from treinamento import aplicar_parametros, extrair_parametros, projetar_parametros
+
+# -----------------------------------------------
+# OTIMIZADOR EVOLUTIVO (PARAMS, CONSEQUENTES E OPERADORES)
+# -----------------------------------------------
+#
+# Não usa derivadas, então serve para qualquer combinação de operadores,
+# agregação e defuzzificação (qualquer método do motor). A população é avaliada
+# em paralelo com o avaliador em lote de `motor_fuzzy`. Os operadores
+# candidatos são todos os do registro; o gene de operador é a chave com o
+# parâmetro ("yager:3"), que também sofre mutação dentro do domínio válido.
+
+# Desvio da mutação do parâmetro dos operadores, relativo a max(|p|, 1)
+_PASSO_PARAMETRO = 0.5
+
+# Estado de cada processo de avaliação (preenchido por _iniciar_worker)
+_WORKER = {}
+
+
+class Individuo:
+    def __init__(self, theta, consequentes, op_and, op_or):
+        self.theta = theta
+        self.consequentes = consequentes
+        self.op_and = op_and
+        self.op_or = op_or
+        self.aptidao = None
+
+    def chave(self):
+        return (self.theta.tobytes(), self.consequentes.tobytes(),
+                self.op_and, self.op_or)
+
+    def copiar(self):
+        return Individuo(self.theta.copy(), self.consequentes.copy(),
+                         self.op_and, self.op_or)
+
+
+def _opcoes_consequentes(sistema):
+    """Para cada regra, os conjuntos possíveis da sua variável de saída."""
+    opcoes = []
+    for regra in sistema["regras"]:
+        saida = regra["consequente"][0]
+        opcoes.append(list(sistema["saidas"][saida]["conjuntos"].keys()))
+    return opcoes
+
+
+def decodificar(sistema, layout, opcoes, ind):
+    """Converte um indivíduo em (sistema, ops) no formato usado pelo Editor."""
+    novo = aplicar_parametros(sistema, ind.theta, layout)
+    for regra, conjs, k in zip(novo["regras"], opcoes, ind.consequentes):
+        regra["consequente"] = (regra["consequente"][0], conjs[k])
+    return novo, {"and": ind.op_and, "or": ind.op_or}
+
+
+def _mutar_operador(registro, op, rng, taxa, escala):
+    """
+    Com probabilidade `taxa` troca por outro operador do registro (parâmetro
+    padrão); senão, também com probabilidade `taxa`, perturba o parâmetro
+    de um operador paramétrico, descartando valores fora do domínio.
+    """
+    if rng.random() < taxa:
+        return registro[rng.choice(list(registro))]
+    if op.padrao is not None and rng.random() < taxa:
+        p = op.parametro + rng.normal(0, _PASSO_PARAMETRO * escala * max(abs(op.parametro), 1))
+        if op.valido(p):
+            return op.com_parametro(p)
+    return op
+
+
+def _iniciar_worker(sistema, layout, opcoes, X, Y, ag, df):
+    _WORKER.update(sistema=sistema, layout=layout, opcoes=opcoes,
+                   X=X, Y=Y, ag=ag, df=df)
+
+
+def _avaliar(genes):
+    """Erro quadrático médio de um indivíduo (roda dentro do worker)."""
+    theta, consequentes, op_and, op_or = genes
+    w = _WORKER
+    ind = Individuo(theta, consequentes, op_and, op_or)
+    sistema, ops = decodificar(w["sistema"], w["layout"], w["opcoes"], ind)
+    saidas = compilar_sistema(sistema, ops, w["ag"], w["df"]).avaliar(w["X"])
+    erro = np.column_stack([saidas[s] for s in sistema["saidas"]]) - w["Y"]
+    return float(np.nanmean(erro ** 2))
+
+
+def otimizar_evolutivo(sistema, X, Y, ops=None, ag="max", df="centroid",
+                       populacao=100, geracoes=50, processos=None,
+                       evoluir_params=True, evoluir_consequentes=True,
+                       evoluir_operadores=True, taxa_mutacao=0.1, sigma=0.05,
+                       elite=2, torneio=3, semente=0, callback=None):
+    """
+    Algoritmo genético sobre params das funções, consequentes das regras e
+    operadores AND/OR. Minimiza o erro quadrático médio em (X, Y).
+
+    `sigma` é o desvio da mutação relativo à largura do universo e decai ao
+    longo das gerações. `processos=1` avalia no próprio processo.
+    Retorna (sistema, ops, relatorio).
+    """
+    ops = normalizar_ops(ops)
+    rng = np.random.default_rng(semente)
+
+    theta0, layout = extrair_parametros(sistema)
+    theta0 = projetar_parametros(theta0, layout)
+    opcoes = _opcoes_consequentes(sistema)
+    escala = np.empty_like(theta0)
+    for _, _, _, _, inicio, fim, largura in layout:
+        escala[inicio:fim] = max(largura, 1e-9)
+
+    X = como_matriz(X, list(sistema["entradas"].keys()))
+    Y = como_matriz(Y, list(sistema["saidas"].keys()))
+
+    cons0 = np.array([conjs.index(r["consequente"][1])
+                      for r, conjs in zip(sistema["regras"], opcoes)], dtype=int)
+    base = Individuo(theta0, cons0, ops["and"], ops["or"])
+
+    def mutar(ind, s):
+        novo = ind.copiar()
+        if evoluir_params:
+            m = rng.random(len(novo.theta)) < taxa_mutacao
+            if m.any():
+                novo.theta = novo.theta + m * rng.normal(0, s, len(novo.theta)) * escala
+                novo.theta = projetar_parametros(novo.theta, layout)
+        if evoluir_consequentes:
+            for r in np.flatnonzero(rng.random(len(opcoes)) < taxa_mutacao):
+                novo.consequentes[r] = rng.integers(len(opcoes[r]))
+        if evoluir_operadores:
+            # O passo do parâmetro decai com o da mutação dos params
+            passo = s / sigma if sigma > 0 else 1.0
+            novo.op_and = _mutar_operador(TNORMAS, obter_tnorma(novo.op_and), rng,
+                                          taxa_mutacao, passo).chave
+            novo.op_or = _mutar_operador(TCONORMAS, obter_tconorma(novo.op_or), rng,
+                                         taxa_mutacao, passo).chave
+        return novo
+
+    def cruzar(a, b):
+        filho = a.copiar()
+        if evoluir_params:
+            alfa = rng.random(len(a.theta))
+            filho.theta = projetar_parametros(alfa * a.theta + (1 - alfa) * b.theta, layout)
+        troca = rng.random(len(a.consequentes)) < 0.5
+        filho.consequentes = np.where(troca, b.consequentes, a.consequentes)
+        if rng.random() < 0.5:
+            filho.op_and, filho.op_or = b.op_and, b.op_or
+        return filho
+
+    def escolher(pop):
+        cand = rng.choice(len(pop), size=min(torneio, len(pop)), replace=False)
+        return min((pop[i] for i in cand), key=lambda ind: ind.aptidao)
+
+    pop = [base] + [mutar(base, sigma * 4) for _ in range(populacao - 1)]
+
+    cache = {}
+    historico = []
+    processos = processos or os.cpu_count() or 1
+    executor = None
+    if processos > 1:
+        executor = ProcessPoolExecutor(
+            max_workers=processos, initializer=_iniciar_worker,
+            initargs=(sistema, layout, opcoes, X, Y, ag, df))
+    else:
+        _iniciar_worker(sistema, layout, opcoes, X, Y, ag, df)
+
+    inicio_t = time.perf_counter()
+    try:
+        for geracao in range(geracoes):
+            t0 = time.perf_counter()
+            pendentes = {}
+            acertos = 0
+            for ind in pop:
+                k = ind.chave()
+                if k in cache:
+                    ind.aptidao = cache[k]
+                    acertos += 1
+                elif k not in pendentes:
+                    pendentes[k] = ind
+            genes = [(i.theta, i.consequentes, i.op_and, i.op_or)
+                     for i in pendentes.values()]
+            if executor is not None:
+                lote = max(1, len(genes) // (processos * 4))
+                resultados = list(executor.map(_avaliar, genes, chunksize=lote))
+            else:
+                resultados = [_avaliar(g) for g in genes]
+            for k, apt in zip(pendentes, resultados):
+                cache[k] = apt
+            CACHE.inc(acertos, "aptidao", "acerto")
+            CACHE.inc(len(pendentes), "aptidao", "falha")
+            for ind in pop:
+                ind.aptidao = cache[ind.chave()]
+
+            pop.sort(key=lambda ind: ind.aptidao)
+            duracao = time.perf_counter() - t0
+            historico.append({
+                "geracao": geracao + 1,
+                "melhor": pop[0].aptidao,
+                "media": float(np.mean([i.aptidao for i in pop])),
+                "avaliacoes": len(genes),
+                "acertos_cache": acertos,
+                "individuos_por_s": len(genes) / duracao if duracao > 0 else float("inf"),
+            })
+            if callback is not None:
+                callback(historico[-1])
+
+            if geracao == geracoes - 1:
+                break
+            s = sigma * (1 - geracao / geracoes)
+            nova = [ind.copiar() for ind in pop[:elite]]
+            while len(nova) < populacao:
+                filho = cruzar(escolher(pop), escolher(pop))
+                nova.append(mutar(filho, s))
+            pop = nova
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    melhor = pop[0]
+    sistema_final, ops_final = decodificar(sistema, layout, opcoes, melhor)
+    tempo = time.perf_counter() - inicio_t
+    relatorio = {
+        "historico": historico,
+        "melhor_erro": melhor.aptidao,
+        "tempo_s": tempo,
+        "avaliacoes": sum(h["avaliacoes"] for h in historico),
+        "acertos_cache": sum(h["acertos_cache"] for h in historico),
+        "processos": processos,
+    }
+    return sistema_final, ops_final, relatorio
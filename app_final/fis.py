@@ -0,0 +1,345 @@
+import io
+import sys
+import time
+
+import numpy as np
+
+from motor_fuzzy import carregar_sistema, compilar_sistema, normalizar_agregacao, normalizar_defuzz
+from operadores import normalizar_ops, obter_tconorma, obter_tnorma
+
+# -----------------------------------------------
+# IMPORTAÇÃO / EXPORTAÇÃO NO FORMATO .FIS (MATLAB/OCTAVE)
+# -----------------------------------------------
+#
+# Leitura em fluxo: o arquivo é consumido linha a linha (nunca é lido
+# inteiro para a memória) e cada linha de regra vira diretamente um dict de
+# regra, então bases com 10^5 regras não geram textos intermediários. A
+# escrita também é em fluxo, uma linha por regra.
+#
+# Correspondência com o `sistema`:
+#   [InputN]/[OutputN]   -> entradas/saidas (Range -> universo, MFk -> conjuntos)
+#   trimf/trapmf/gaussmf -> mesmos tipos (gaussmf do MATLAB já é [sigma c])
+#   AndMethod min|prod   -> ops["and"];  OrMethod max|probor -> ops["or"]
+#                           (demais t-normas/t-conormas do registro saem e
+#                           entram pela chave, ex.: 'hamacher:0.5')
+#   AggMethod max|sum    -> "max" | "sum_clipped"
+#   DefuzzMethod         -> centroid | bisector | mom | lom | som (outros são mantidos
+#                           como texto; wtaver/height do motor saem com esse nome)
+#   regra "1 0 2, 3 (1) : 1" -> antecedentes (índice 0 = "não importa"),
+#                               um consequente por saída não nula, 1 = AND, 2 = OR
+# O que o motor não representa (NOT, pesos != 1, implicação != min,
+# agregação probor) vira erro ou aviso em config["avisos"]. Na exportação,
+# o que o .fis não representa (conjuntos tipo 2, nomes com aspas) é erro.
+
+TIPOS_SUPORTADOS = ("trimf", "trapmf", "gaussmf")
+
+
+def _verificar_exportavel(sistema):
+    """Erro para o que o .fis não representa, antes de abrir o destino."""
+    for secao in ("entradas", "saidas"):
+        for var, info in sistema[secao].items():
+            # Nomes vão entre aspas simples, uma definição por linha
+            for nome, onde in [(var, "Variável")] + [(c, "Conjunto") for c in info["conjuntos"]]:
+                if any(ch in str(nome) for ch in "'\r\n"):
+                    raise ValueError(f"{onde} '{nome}' tem aspas ou quebra de linha; "
+                                     "renomeie para exportar.")
+            for conj, c in info["conjuntos"].items():
+                if c["tipo"] not in TIPOS_SUPORTADOS:
+                    raise ValueError(f"Tipo '{c['tipo']}' não pode ser exportado.")
+                if "params_inf" in c:
+                    raise ValueError(f"Conjunto '{conj}' em '{var}' é tipo 2; o .fis "
+                                     "só representa conjuntos tipo 1.")
+
+
+def _texto(valor):
+    valor = valor.strip()
+    if len(valor) >= 2 and valor[0] == valor[-1] == "'":
+        return valor[1:-1]
+    return valor
+
+
+def _vetor(valor):
+    valor = valor.strip()
+    if not (valor.startswith("[") and valor.endswith("]")):
+        raise ValueError(f"Vetor inválido: {valor}")
+    return [float(v) for v in valor[1:-1].replace(",", " ").split()]
+
+
+def _abrir(fonte, modo):
+    """Devolve (arquivo, deve_fechar) para caminho, texto .fis ou objeto arquivo."""
+    if hasattr(fonte, "readline" if modo == "r" else "write"):
+        return fonte, False
+    if modo == "r" and isinstance(fonte, str) and "\n" in fonte:
+        return io.StringIO(fonte), True
+    if isinstance(fonte, bytes):
+        return io.StringIO(fonte.decode("utf-8")), True
+    return open(fonte, modo, encoding="utf-8", newline=""), True
+
+
+# -----------------------------------------------
+# LEITURA
+# -----------------------------------------------
+
+
+def _ler_mf(var, valor):
+    # 'nome':'tipo',[p1 p2 ...]
+    nome, resto = valor.split(":", 1)
+    tipo, params = resto.split(",", 1)
+    nome, tipo = _texto(nome), _texto(tipo)
+    if tipo not in TIPOS_SUPORTADOS:
+        raise ValueError(f"Função '{tipo}' do conjunto '{nome}' em '{var}' não é suportada "
+                         f"(use {', '.join(TIPOS_SUPORTADOS)}).")
+    return nome, {"tipo": tipo, "params": _vetor(params)}
+
+
+def _montar_variaveis(sistema, variaveis):
+    for secao, lista in variaveis.items():
+        sistema[secao] = {v["nome"]: {"universo": v["universo"], "conjuntos": v["conjuntos"]}
+                          for v in lista}
+
+
+class _LeitorRegras:
+    """Converte linhas "i1 i2 ..., o1 ... (peso) : conexao" em regras do `sistema`."""
+
+    def __init__(self, entradas, saidas, avisos):
+        # Tuplas (variável, conjunto) criadas uma vez e compartilhadas pelas regras
+        self.termos = [[None] + [(e, c) for c in entradas[e]["conjuntos"]] for e in entradas]
+        self.consequentes = [[None] + [(s, c) for c in saidas[s]["conjuntos"]] for s in saidas]
+        self.avisos = avisos
+        self.regras = []
+        self.pesos_ignorados = 0
+        self.vazias = 0
+
+    def linha(self, texto, numero):
+        try:
+            esquerda, conexao = texto.rsplit(":", 1)
+            indices, peso = esquerda.rsplit("(", 1)
+            ants, cons = indices.split(",", 1)
+            ants = [int(v) for v in ants.split()]
+            cons = [int(v) for v in cons.split()]
+            peso = float(peso.rstrip().rstrip(")"))
+            conexao = int(conexao)
+        except ValueError:
+            raise ValueError(f"Linha {numero}: regra inválida: {texto.strip()}") from None
+        if len(ants) != len(self.termos) or len(cons) != len(self.consequentes):
+            raise ValueError(f"Linha {numero}: a regra não tem um índice por entrada e saída.")
+        if any(i < 0 for i in ants + cons):
+            raise ValueError(f"Linha {numero}: negação (índice negativo) não é suportada.")
+        if peso != 1.0:
+            self.pesos_ignorados += 1
+
+        try:
+            antecedentes = [self.termos[j][i] for j, i in enumerate(ants) if i > 0]
+            consequentes = [self.consequentes[j][i] for j, i in enumerate(cons) if i > 0]
+        except IndexError:
+            raise ValueError(f"Linha {numero}: índice de conjunto inexistente.") from None
+        if not antecedentes:
+            self.vazias += 1
+            return
+        logica = "AND" if conexao == 1 else "OR"
+        for consequente in consequentes:
+            self.regras.append({"antecedentes": antecedentes,
+                                "consequente": consequente, "logica": logica})
+
+    def fechar(self):
+        if self.pesos_ignorados:
+            self.avisos.append(f"{self.pesos_ignorados} regras com peso diferente de 1: "
+                               "o motor não usa pesos, eles foram ignorados.")
+        if self.vazias:
+            self.avisos.append(f"{self.vazias} regras sem antecedentes foram descartadas.")
+
+
+def ler_fis(fonte):
+    """
+    Lê um .fis (caminho, texto ou arquivo aberto) e retorna (sistema, config),
+    com config = {"nome", "ops", "ag", "df", "avisos"} no formato do Editor.
+    """
+    arquivo, fechar = _abrir(fonte, "r")
+    sistema = {"entradas": {}, "saidas": {}, "regras": []}
+    variaveis = {"entradas": [], "saidas": []}
+    cfg_bruta = {}
+    avisos = []
+    secao, atual, regras = None, None, None
+    try:
+        for numero, linha in enumerate(arquivo, 1):
+            texto = linha.strip()
+            if not texto or texto[0] in "%#":
+                continue
+            if texto[0] == "[":
+                secao = texto[1:texto.index("]")]
+                atual = None
+                if secao.startswith("Input") or secao.startswith("Output"):
+                    atual = {"nome": secao, "universo": [0.0, 1.0], "conjuntos": {}}
+                    variaveis["entradas" if secao.startswith("Input") else "saidas"].append(atual)
+                elif secao == "Rules":
+                    _montar_variaveis(sistema, variaveis)
+                    regras = _LeitorRegras(sistema["entradas"], sistema["saidas"], avisos)
+                continue
+
+            if regras is not None:
+                regras.linha(texto, numero)
+                continue
+            if "=" not in texto:
+                raise ValueError(f"Linha {numero}: esperado chave=valor: {texto}")
+            chave, valor = texto.split("=", 1)
+            chave = chave.strip()
+            if secao == "System":
+                cfg_bruta[chave] = _texto(valor)
+            elif atual is not None:
+                if chave == "Name":
+                    atual["nome"] = _texto(valor)
+                elif chave == "Range":
+                    atual["universo"] = _vetor(valor)
+                elif chave.startswith("MF"):
+                    nome, conj = _ler_mf(atual["nome"], valor)
+                    atual["conjuntos"][nome] = conj
+    finally:
+        if fechar:
+            arquivo.close()
+
+    if regras is None:
+        _montar_variaveis(sistema, variaveis)
+    else:
+        regras.fechar()
+        sistema["regras"] = regras.regras
+
+    tipo = cfg_bruta.get("Type", "mamdani").lower()
+    if tipo != "mamdani":
+        raise ValueError(f"Só sistemas Mamdani são suportados (Type='{tipo}').")
+    if cfg_bruta.get("ImpMethod", "min").lower() != "min":
+        avisos.append(f"ImpMethod '{cfg_bruta['ImpMethod']}' não é suportado; usando 'min'.")
+    agg = cfg_bruta.get("AggMethod", "max").lower()
+    if agg not in ("max", "sum"):
+        avisos.append(f"AggMethod '{agg}' não é suportado; usando 'max'.")
+    elif agg == "sum":
+        avisos.append("AggMethod 'sum' usa a soma limitada a 1 do motor (sum_clipped).")
+    ops = {}
+    for campo, chave, obter, padrao in (("AndMethod", "and", obter_tnorma, "min"),
+                                        ("OrMethod", "or", obter_tconorma, "max")):
+        try:
+            ops[chave] = obter(cfg_bruta.get(campo, padrao)).chave
+        except ValueError:
+            avisos.append(f"{campo} '{cfg_bruta[campo]}' não é suportado; usando '{padrao}'.")
+            ops[chave] = padrao
+    config = {
+        "nome": cfg_bruta.get("Name", ""),
+        "ops": ops,
+        "ag": "sum_clipped" if agg == "sum" else "max",
+        "df": cfg_bruta.get("DefuzzMethod", "centroid").lower(),
+        "avisos": avisos,
+    }
+    if normalizar_defuzz(config["df"]) != config["df"]:
+        avisos.append(f"DefuzzMethod '{config['df']}' não é suportado pelo motor; "
+                      "a avaliação usará 'centroid'.")
+    return sistema, config
+
+
+# -----------------------------------------------
+# ESCRITA
+# -----------------------------------------------
+
+
+def _fmt(v):
+    return f"{float(v):.15g}"
+
+
+def escrever_fis(sistema, destino, ops=None, ag="max", df="centroid", nome="sistema"):
+    """Grava o sistema em .fis (caminho ou arquivo aberto), uma regra por linha."""
+    sistema = carregar_sistema(sistema)
+    _verificar_exportavel(sistema)
+    ops = normalizar_ops(ops)
+    entradas, saidas = list(sistema["entradas"]), list(sistema["saidas"])
+    idx_ent = {e: {c: k + 1 for k, c in enumerate(sistema["entradas"][e]["conjuntos"])}
+               for e in entradas}
+    idx_sai = {s: {c: k + 1 for k, c in enumerate(sistema["saidas"][s]["conjuntos"])}
+               for s in saidas}
+    pos_ent = {e: j for j, e in enumerate(entradas)}
+    pos_sai = {s: j for j, s in enumerate(saidas)}
+
+    arquivo, fechar = _abrir(destino, "w")
+    w = arquivo.write
+    try:
+        w("[System]\n")
+        w(f"Name='{str(nome).replace(chr(39), '')}'\n")
+        w("Type='mamdani'\nVersion=2.0\n")
+        w(f"NumInputs={len(entradas)}\nNumOutputs={len(saidas)}\n")
+        w(f"NumRules={len(sistema['regras'])}\n")
+        w(f"AndMethod='{ops['and']}'\n")
+        w(f"OrMethod='{'probor' if ops['or'] == 'prob_or' else ops['or']}'\n")
+        w("ImpMethod='min'\n")
+        w(f"AggMethod='{'max' if normalizar_agregacao(ag) == 'max' else 'sum'}'\n")
+        w(f"DefuzzMethod='{normalizar_defuzz(df)}'\n")
+
+        for rotulo, nomes, secao in (("Input", entradas, "entradas"), ("Output", saidas, "saidas")):
+            for j, var in enumerate(nomes, 1):
+                info = sistema[secao][var]
+                w(f"\n[{rotulo}{j}]\nName='{var}'\n")
+                w(f"Range=[{' '.join(_fmt(v) for v in info['universo'])}]\n")
+                w(f"NumMFs={len(info['conjuntos'])}\n")
+                for k, (conj, c) in enumerate(info["conjuntos"].items(), 1):
+                    w(f"MF{k}='{conj}':'{c['tipo']}',[{' '.join(_fmt(p) for p in c['params'])}]\n")
+
+        w("\n[Rules]\n")
+        ants = [0] * len(entradas)
+        cons = [0] * len(saidas)
+        for n, regra in enumerate(sistema["regras"], 1):
+            for j in range(len(ants)):
+                ants[j] = 0
+            for j in range(len(cons)):
+                cons[j] = 0
+            for var, conj in regra["antecedentes"]:
+                j = pos_ent[var]
+                if ants[j]:
+                    raise ValueError(f"Regra {n}: a entrada '{var}' aparece duas vezes "
+                                     "(não representável em .fis).")
+                ants[j] = idx_ent[var][conj]
+            saida, conj_s = regra["consequente"]
+            cons[pos_sai[saida]] = idx_sai[saida][conj_s]
+            conexao = 1 if regra["logica"] == "AND" else 2
+            w(f"{' '.join(map(str, ants))}, {' '.join(map(str, cons))} (1) : {conexao}\n")
+    finally:
+        if fechar:
+            arquivo.close()
+
+
+# -----------------------------------------------
+# VERIFICAÇÃO DE IDA E VOLTA
+# -----------------------------------------------
+
+
+def verificar_ida_e_volta(sistema, ops=None, ag="max", df="centroid", n=10_000, semente=0):
+    """
+    Exporta para .fis, relê e avalia as duas versões em lote nos mesmos
+    `n` pontos. Retorna o maior erro, a configuração relida e os tempos.
+    """
+    sistema = carregar_sistema(sistema)
+    buffer = io.StringIO()
+    t0 = time.perf_counter()
+    escrever_fis(sistema, buffer, ops, ag, df)
+    t_escrita = time.perf_counter() - t0
+    buffer.seek(0)
+    t0 = time.perf_counter()
+    relido, config = ler_fis(buffer)
+    t_leitura = time.perf_counter() - t0
+
+    rng = np.random.default_rng(semente)
+    X = np.column_stack([rng.uniform(*map(float, info["universo"]), n)
+                         for info in sistema["entradas"].values()])
+    original = compilar_sistema(sistema, ops, ag, df).avaliar(X)
+    voltou = compilar_sistema(relido, config["ops"], config["ag"], config["df"]).avaliar(X)
+    return {
+        "erro_maximo": max(float(np.max(np.abs(original[s] - voltou[s]))) for s in original),
+        "regras": len(relido["regras"]),
+        "config": config,
+        "escrita_s": t_escrita,
+        "leitura_s": t_leitura,
+    }
+
+
+if __name__ == "__main__":
+    # python fis.py controlador.fis  -> lê, mostra avisos e confere a ida e volta
+    sistema, config = ler_fis(sys.argv[1])
+    print(f"{len(sistema['entradas'])} entradas, {len(sistema['saidas'])} saídas, "
+          f"{len(sistema['regras'])} regras; {config}")
+    r = verificar_ida_e_volta(sistema, config["ops"], config["ag"], config["df"])
+    print(f"Ida e volta: erro máximo {r['erro_maximo']:.3g}")
@@ -0,0 +1,360 @@
+import inspect
+import sys
+import time
+import types
+
+import numpy as np
+
+from defuzzificacao import METODOS_CONJUNTOS, TOLERANCIA_MAXIMOS, _corte_area, bissetor
+from motor_fuzzy import (RESOLUCAO, calcular_saida, carregar_sistema, compilar_sistema,
+                         gaussmf, trapmf, trimf)
+
+# -----------------------------------------------
+# GERAÇÃO DE CÓDIGO: AVALIADOR NUMPY AUTÔNOMO
+# -----------------------------------------------
+#
+# Transforma um `sistema` num módulo Python que só depende do NumPy. As
+# regras viram código linear e vetorizado:
+#   - universos e curvas dos conjuntos são calculados uma vez, na importação,
+#     com os parâmetros escritos como constantes;
+#   - cada termo usado vira um `np.interp` sobre a sua curva;
+#   - cada regra vira uma expressão com o operador já escolhido;
+#   - a agregação e a defuzzificação saem sem laços nem dicionários.
+# A semântica é a de `calcular_saida`, a mesma do `SistemaCompilado`. O
+# módulo gerado traz pontos de referência calculados pelo interpretador e
+# uma função `verificar()` que se confere contra eles.
+
+_FUNCOES = {"trimf": trimf, "trapmf": trapmf, "gaussmf": gaussmf}
+
+
+def _nome_funcao(tipo):
+    # avaliar_mf trata qualquer tipo desconhecido como gaussiana
+    return tipo if tipo in _FUNCOES else "gaussmf"
+
+
+def _num(v):
+    return repr(float(v))
+
+
+def _comentario(texto):
+    return " ".join(str(texto).split())
+
+
+def _pontos_referencia(sistema, n, semente):
+    """Cantos dos universos (até 8) e pontos aleatórios."""
+    rng = np.random.default_rng(semente)
+    limites = [tuple(map(float, info["universo"])) for info in sistema["entradas"].values()]
+    cantos = [[lim[(k >> j) & 1] for j, lim in enumerate(limites)]
+              for k in range(min(2 ** len(limites), 8))]
+    aleatorios = np.column_stack([rng.uniform(a, b, n) for a, b in limites]) if limites else np.zeros((n, 0))
+    return np.vstack([np.array(cantos).reshape(-1, len(limites)), aleatorios])
+
+
+def referencia_interpretador(sistema, X, ops=None, ag="max", df="centroid"):
+    """Saídas de `calcular_saida` linha a linha: {saida: array (N,)}."""
+    nomes = list(sistema["entradas"])
+    res = {s: np.zeros(len(X)) for s in sistema["saidas"]}
+    for i, linha in enumerate(X):
+        saidas, _ = calcular_saida(sistema, dict(zip(nomes, linha)), ops, ag, df)
+        for s, (v, _, _) in saidas.items():
+            res[s][i] = v
+    return res
+
+
+def gerar_codigo(sistema, ops=None, ag="max", df="centroid", resolucao=RESOLUCAO,
+                 n_referencia=24, semente=0):
+    """Código-fonte (str) do módulo avaliador do sistema."""
+    sistema = carregar_sistema(sistema)
+    # Mesma normalização de operadores do motor (rótulos do Editor incluídos)
+    base = compilar_sistema(sistema, ops, ag, df, resolucao)
+    entradas, saidas = base.entradas, base.saidas
+    L = []
+    w = L.append
+
+    w('"""')
+    w("Avaliador fuzzy gerado automaticamente por geracao_codigo.py — não editar.")
+    w(f"Entradas: {', '.join(entradas)}. Saídas: {', '.join(saidas)}.")
+    w(f"AND={base.op_and}, OR={base.op_or}, agregação={base.agregacao}, "
+      f"defuzzificação={base.defuzz}, resolução={resolucao}, {len(base.regras)} regras.")
+    w('"""')
+    w("import numpy as np")
+    w("")
+    w(f"ENTRADAS = {tuple(entradas)!r}")
+    w(f"SAIDAS = {tuple(saidas)!r}")
+    w(f"RESOLUCAO = {resolucao}")
+    w("")
+    w("")
+
+    tipos = sorted({_nome_funcao(sistema[secao][v]["conjuntos"][c]["tipo"])
+                    for secao, pares in (("entradas", base.termos),
+                                         ("saidas", [(s, c) for s, cs in base.conjuntos_saida.items()
+                                                     for c in cs]))
+                    for v, c in pares})
+    for tipo in tipos:
+        w(inspect.getsource(_FUNCOES[tipo]).rstrip())
+        w("")
+        w("")
+    if base.defuzz == "bisector":
+        for funcao in (_corte_area, bissetor):
+            w(inspect.getsource(funcao).rstrip())
+            w("")
+            w("")
+    # Demais t-normas/t-conormas: a própria função do registro, chamada em dobra
+    operadores = [op for op, basicos in ((base.tnorma, ("min", "prod")),
+                                         (base.tconorma, ("max", "prob_or")))
+                  if op.base not in basicos]
+    for op in operadores:
+        w(inspect.getsource(op.funcao).rstrip())
+        w("")
+        w("")
+
+    w("# Universos")
+    for i, e in enumerate(entradas):
+        umin, umax = sistema["entradas"][e]["universo"]
+        w(f"_X{i} = np.linspace({_num(umin)}, {_num(umax)}, {resolucao})  # {_comentario(e)}")
+    for j, s in enumerate(saidas):
+        umin, umax = sistema["saidas"][s]["universo"]
+        w(f"_S{j} = np.linspace({_num(umin)}, {_num(umax)}, {resolucao})  # {_comentario(s)}")
+    w("")
+
+    w("# Curvas dos termos dos antecedentes")
+    for t, (var, conj) in enumerate(base.termos):
+        info = sistema["entradas"][var]["conjuntos"][conj]
+        nome = _nome_funcao(info["tipo"])
+        params = ", ".join(_num(p) for p in info["params"])
+        w(f"_T{t} = {nome}(_X{entradas.index(var)}, [{params}])"
+          f"  # {_comentario(var)} é {_comentario(conj)}")
+    w("")
+    w("# Curvas dos conjuntos das saídas")
+    for j, s in enumerate(saidas):
+        for k, conj in enumerate(base.conjuntos_saida[s]):
+            info = sistema["saidas"][s]["conjuntos"][conj]
+            nome = _nome_funcao(info["tipo"])
+            params = ", ".join(_num(p) for p in info["params"])
+            w(f"_C{j}_{k} = {nome}(_S{j}, [{params}])  # {_comentario(s)} é {_comentario(conj)}")
+    if base.defuzz in METODOS_CONJUNTOS:
+        w("")
+        w(f"# Centros e alturas dos conjuntos das saídas ({base.defuzz})")
+        for j, s in enumerate(saidas):
+            centros, alturas = base.centros_saida[s]
+            w(f"_CENTROS{j} = np.array([{', '.join(_num(v) for v in centros)}])")
+            w(f"_ALTURAS{j} = np.array([{', '.join(_num(v) for v in alturas)}])")
+    w("")
+    w("")
+
+    w("def _bloco(X):")
+    w("    n = X.shape[0]")
+    for t, (var, _) in enumerate(base.termos):
+        w(f"    g{t} = np.interp(X[:, {entradas.index(var)}], _X{entradas.index(var)}, _T{t})")
+
+    for r, (idx, eh_and, s, k) in enumerate(base.regras):
+        g = [f"g{t}" for t in idx]
+        regra = sistema["regras"][r]
+        descricao = (f" {regra['logica']} ".join(f"{a} é {c}" for a, c in regra["antecedentes"])
+                     + f" -> {regra['consequente'][0]} é {regra['consequente'][1]}")
+        w(f"    # R{r}: {_comentario(descricao)}")
+        operador = base.tnorma if eh_and else base.tconorma
+        if len(g) == 1:
+            w(f"    f{r} = {g[0]}")
+        elif operador in operadores:
+            w(f"    f{r} = {g[0]}")
+            for o in g[1:]:
+                w(f"    f{r} = {operador.funcao.__name__}(f{r}, {o}, {_num(operador.parametro or 0)})")
+        elif eh_and and base.op_and == "prod":
+            w(f"    f{r} = {' * '.join(g)}")
+        elif eh_and:
+            expr = g[0]
+            for o in g[1:]:
+                expr = f"np.minimum({expr}, {o})"
+            w(f"    f{r} = {expr}")
+        elif base.op_or == "max":
+            expr = g[0]
+            for o in g[1:]:
+                expr = f"np.maximum({expr}, {o})"
+            w(f"    f{r} = {expr}")
+        else:
+            # mesma ordem de operações da t-conorma prob_or (a + b - a * b)
+            w(f"    f{r} = {g[0]}")
+            for o in g[1:]:
+                w(f"    f{r} = f{r} + {o} - f{r} * {o}")
+
+    w("    saidas = {}")
+    for j, s in enumerate(saidas):
+        regras_s = [(r, k) for r, (_, _, s2, k) in enumerate(base.regras) if s2 == s]
+        if base.defuzz in METODOS_CONJUNTOS:
+            # Caminho rápido: só as alturas de ativação de cada conjunto
+            if not regras_s:
+                w(f"    saidas[{s!r}] = np.zeros(n)")
+                continue
+            alturas = []
+            for k in range(len(base.conjuntos_saida[s])):
+                rs = [f"f{r}" for r, k2 in regras_s if k2 == k]
+                if base.agregacao == "max":
+                    expr = rs[0]
+                    for o in rs[1:]:
+                        expr = f"np.maximum({expr}, {o})"
+                else:
+                    expr = f"np.minimum({' + '.join(rs)}, 1)"
+                alturas.append(expr)
+            w(f"    H = np.minimum(np.column_stack([{', '.join(alturas)}]), _ALTURAS{j})")
+            w("    den = H.sum(axis=1)")
+            w(f"    num = H @ _CENTROS{j}")
+            w(f"    saidas[{s!r}] = np.divide(num, den, out=np.zeros_like(num), where=den != 0)")
+            continue
+        if not regras_s:
+            w(f"    agg = np.zeros((n, {resolucao}))")
+        elif base.agregacao == "max":
+            # fmax_r fmin(f_r, y_k) == fmin(max_{r->k} f_r, y_k) para o mesmo conjunto k
+            termos_k = []
+            for k in range(len(base.conjuntos_saida[s])):
+                rs = [f"f{r}" for r, k2 in regras_s if k2 == k]
+                expr = rs[0]
+                for o in rs[1:]:
+                    expr = f"np.maximum({expr}, {o})"
+                expr = f"({expr})" if "(" in expr else expr
+                termos_k.append(f"np.fmin({expr}[:, None], _C{j}_{k})")
+            w(f"    agg = {termos_k[0]}")
+            for t in termos_k[1:]:
+                w(f"    np.fmax(agg, {t}, out=agg)")
+        else:
+            r0, k0 = regras_s[0]
+            w(f"    agg = np.fmin(f{r0}[:, None], _C{j}_{k0})")
+            for r, k in regras_s[1:]:
+                w(f"    agg += np.fmin(f{r}[:, None], _C{j}_{k})")
+            w("    np.minimum(agg, 1, out=agg)")
+
+        if base.defuzz == "centroid":
+            w("    den = agg.sum(axis=1)")
+            w(f"    num = agg @ _S{j}")
+            w(f"    saidas[{s!r}] = np.divide(num, den, out=np.zeros_like(num), where=den != 0)")
+        elif base.defuzz == "bisector":
+            w(f"    saidas[{s!r}] = bissetor(_S{j}, agg)")
+        else:
+            # Máximos com a mesma tolerância relativa do motor
+            w(f"    maximos = agg >= agg.max(axis=1, keepdims=True) * (1 - {TOLERANCIA_MAXIMOS!r})")
+            if base.defuzz == "mom":
+                w(f"    saidas[{s!r}] = (maximos @ _S{j}) / maximos.sum(axis=1)")
+            elif base.defuzz == "lom":
+                w(f"    saidas[{s!r}] = _S{j}[{resolucao - 1} - maximos[:, ::-1].argmax(axis=1)]")
+            else:
+                w(f"    saidas[{s!r}] = _S{j}[maximos.argmax(axis=1)]")
+    w("    return saidas")
+    w("")
+    w("")
+
+    w("def avaliar(dados, tamanho_bloco=4096):")
+    w('    """')
+    w("    `dados`: dict {entrada: array} ou matriz (N, len(ENTRADAS)) nessa ordem.")
+    w("    Retorna {saida: array (N,)}.")
+    w('    """')
+    w("    if isinstance(dados, dict):")
+    w("        X = np.column_stack([np.atleast_1d(np.asarray(dados[e], dtype=float)) for e in ENTRADAS])")
+    w("    else:")
+    w("        X = np.asarray(dados, dtype=float)")
+    w("        if X.ndim == 1:")
+    w("            X = X[:, None] if len(ENTRADAS) == 1 else X[None, :]")
+    w("    n = X.shape[0]")
+    w("    res = {s: np.zeros(n) for s in SAIDAS}")
+    w("    for inicio in range(0, n, tamanho_bloco):")
+    w("        for s, v in _bloco(X[inicio:inicio + tamanho_bloco]).items():")
+    w("            res[s][inicio:inicio + len(v)] = v")
+    w("    return res")
+    w("")
+    w("")
+
+    X_ref = _pontos_referencia(sistema, n_referencia, semente)
+    Y_ref = referencia_interpretador(sistema, X_ref, ops, ag, df)
+    w("# Pontos de referência calculados por calcular_saida na geração")
+    w("_REF_X = np.array([")
+    for linha in X_ref:
+        w(f"    [{', '.join(_num(v) for v in linha)}],")
+    w(f"]).reshape(-1, {len(entradas)})")
+    w("_REF_Y = {")
+    for s in saidas:
+        w(f"    {s!r}: np.array([{', '.join(_num(v) for v in Y_ref[s])}]),")
+    w("}")
+    w("")
+    w("")
+    w("def verificar(tol=1e-9):")
+    w('    """Confere o avaliador com os pontos de referência. Retorna o maior erro."""')
+    w("    obtido = avaliar(_REF_X)")
+    w("    erro = max((float(np.max(np.abs(obtido[s] - _REF_Y[s]))) for s in SAIDAS), default=0.0)")
+    w("    if erro > tol:")
+    w('        raise AssertionError(f"Avaliador diverge da referência: erro {erro:.3g} > {tol:.3g}")')
+    w("    return erro")
+    w("")
+    w("")
+    w('if __name__ == "__main__":')
+    w('    print(f"Erro máximo contra a referência: {verificar():.3g}")')
+    return "\n".join(L) + "\n"
+
+
+def carregar_modulo(codigo, nome="avaliador_gerado"):
+    """Executa o código gerado num módulo novo (sem gravar arquivo)."""
+    modulo = types.ModuleType(nome)
+    exec(compile(codigo, f"<{nome}>", "exec"), modulo.__dict__)
+    return modulo
+
+
+def exportar_modulo(sistema, caminho, ops=None, ag="max", df="centroid", resolucao=RESOLUCAO):
+    """Gera o código, confere contra a referência embutida e grava em `caminho`."""
+    codigo = gerar_codigo(sistema, ops, ag, df, resolucao)
+    carregar_modulo(codigo).verificar()
+    with open(caminho, "w", encoding="utf-8") as f:
+        f.write(codigo)
+    return caminho
+
+
+def verificar_modulo(sistema, modulo, n=2000, ops=None, ag="max", df="centroid", semente=1):
+    """Maior diferença entre o módulo gerado e `calcular_saida` em `n` pontos aleatórios."""
+    sistema = carregar_sistema(sistema)
+    X = _pontos_referencia(sistema, n, semente)
+    esperado = referencia_interpretador(sistema, X, ops, ag, df)
+    obtido = modulo.avaliar(X)
+    return max((float(np.max(np.abs(obtido[s] - esperado[s]))) for s in esperado), default=0.0)
+
+
+def comparar_desempenho(sistema, n=100_000, n_interpretador=2000, ops=None, ag="max",
+                        df="centroid", semente=0):
+    """
+    Amostras/s de `calcular_saida` (laço em Python), do `SistemaCompilado` e
+    do módulo gerado, além do erro máximo do gerado contra o interpretador.
+    """
+    sistema = carregar_sistema(sistema)
+    modulo = carregar_modulo(gerar_codigo(sistema, ops, ag, df))
+    compilado = compilar_sistema(sistema, ops, ag, df)
+    rng = np.random.default_rng(semente)
+    X = np.column_stack([rng.uniform(*map(float, info["universo"]), n)
+                         for info in sistema["entradas"].values()])
+
+    t0 = time.perf_counter()
+    referencia_interpretador(sistema, X[:n_interpretador], ops, ag, df)
+    t_interp = (time.perf_counter() - t0) / n_interpretador
+
+    t0 = time.perf_counter()
+    y_lote = compilado.avaliar(X)
+    t_lote = (time.perf_counter() - t0) / n
+
+    t0 = time.perf_counter()
+    y_gerado = modulo.avaliar(X)
+    t_gerado = (time.perf_counter() - t0) / n
+
+    return {
+        "interpretador_amostras_por_s": 1 / t_interp,
+        "lote_amostras_por_s": 1 / t_lote,
+        "gerado_amostras_por_s": 1 / t_gerado,
+        "ganho_vs_interpretador": t_interp / t_gerado,
+        "ganho_vs_lote": t_lote / t_gerado,
+        "erro_vs_interpretador": verificar_modulo(sistema, modulo, ops=ops, ag=ag, df=df),
+        "erro_vs_lote": max(float(np.max(np.abs(y_gerado[s] - y_lote[s]))) for s in y_lote),
+    }
+
+
+if __name__ == "__main__":
+    # python geracao_codigo.py sistema.json saida.py
+    if len(sys.argv) < 3:
+        print("Uso: python geracao_codigo.py sistema.json avaliador.py")
+        sys.exit(1)
+    exportar_modulo(sys.argv[1], sys.argv[2])
+    for chave, valor in comparar_desempenho(sys.argv[1]).items():
+        print(f"{chave}: {valor:,.4g}")
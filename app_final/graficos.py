@@ -0,0 +1,235 @@
+import hashlib
+import io
+import sys
+import threading
+import tracemalloc
+import warnings
+from collections import OrderedDict
+
+import numpy as np
+from matplotlib.figure import Figure
+
+from metricas import CACHE
+
+# -----------------------------------------------
+# RENDERIZAÇÃO DE FIGURAS COM CACHE
+# -----------------------------------------------
+#
+# Cada rerun do Streamlit recriava todas as figuras com plt.subplots() e
+# nunca as fechava: o pyplot guarda uma referência a cada figura aberta e a
+# memória do servidor só cresce. Aqui as figuras são criadas com a API
+# orientada a objetos (Figure, fora do registro do pyplot), salvas em PNG e
+# descartadas. O PNG fica num cache LRU limitado em bytes, indexado por um
+# hash dos dados que geraram a figura: figuras estáticas e combinações de
+# sliders já vistas não são redesenhadas.
+
+MAX_BYTES_CACHE = 64 * 1024 * 1024
+DPI = 100
+
+_cache = OrderedDict()
+_bytes_cache = 0
+_trava = threading.Lock()
+estatisticas = {"acertos": 0, "falhas": 0, "descartes": 0}
+_acertos = CACHE.rotulos("figuras", "acerto")
+_falhas = CACHE.rotulos("figuras", "falha")
+
+
+def chave_dados(*objs):
+    """Hash estável de números, strings, tuplas/listas/dicts e arrays NumPy."""
+    h = hashlib.blake2b(digest_size=16)
+
+    def atualizar(o):
+        if isinstance(o, np.ndarray):
+            h.update(str((o.dtype, o.shape)).encode())
+            h.update(np.ascontiguousarray(o).tobytes())
+        elif isinstance(o, dict):
+            h.update(b"{")
+            for k in sorted(o, key=repr):
+                atualizar(k)
+                atualizar(o[k])
+            h.update(b"}")
+        elif isinstance(o, (list, tuple)):
+            h.update(b"(")
+            for item in o:
+                atualizar(item)
+            h.update(b")")
+        else:
+            h.update(repr(o).encode())
+        h.update(b"|")
+
+    for o in objs:
+        atualizar(o)
+    return h.hexdigest()
+
+
+def reduzir_pontos(x, y, max_pontos=1000):
+    """
+    Reduz uma curva para ~max_pontos mantendo o mínimo e o máximo de cada
+    faixa (os picos continuam visíveis). `y` pode ser (N,) ou (N, M): com
+    várias colunas ficam os extremos de todas elas (até 2·M pontos por
+    faixa), e o número de faixas cai com M para o total seguir ~max_pontos.
+    """
+    x = np.asarray(x)
+    y = np.asarray(y)
+    n = len(x)
+    if n <= max_pontos:
+        return x, y
+    y2 = y.reshape(n, -1)
+    faixas = max(max_pontos // (2 * y2.shape[1]), 1)
+    limites = np.linspace(0, n, faixas + 1).astype(int)
+    indices = []
+    for ini, fim in zip(limites[:-1], limites[1:]):
+        if fim <= ini:
+            continue
+        trecho = y2[ini:fim]
+        indices.extend(ini + np.unique(np.concatenate((trecho.argmin(axis=0),
+                                                       trecho.argmax(axis=0)))))
+    indices = np.array(indices)
+    return x[indices], y[indices]
+
+
+def plotar(ax, x, y, max_pontos=1000, **kwargs):
+    """ax.plot com a curva reduzida por `reduzir_pontos`."""
+    xr, yr = reduzir_pontos(x, y, max_pontos)
+    return ax.plot(xr, yr, **kwargs)
+
+
+def _guardar(chave, png):
+    global _bytes_cache
+    with _trava:
+        if chave in _cache:
+            return
+        _cache[chave] = png
+        _bytes_cache += len(png)
+        while _bytes_cache > MAX_BYTES_CACHE and len(_cache) > 1:
+            _, antigo = _cache.popitem(last=False)
+            _bytes_cache -= len(antigo)
+            estatisticas["descartes"] += 1
+
+
+def renderizar(chave, desenhar, figsize=(6.4, 4.8), nrows=1, ncols=1, **subplot_kw):
+    """
+    Devolve o PNG (bytes) da figura identificada por `chave`.
+    Na primeira vez chama `desenhar(fig, ax)` numa Figure nova, salva em PNG e
+    libera a figura; depois reaproveita o PNG do cache.
+    """
+    chave = chave if isinstance(chave, str) else chave_dados(chave)
+    with _trava:
+        png = _cache.get(chave)
+        if png is not None:
+            _cache.move_to_end(chave)
+            estatisticas["acertos"] += 1
+            _acertos.inc()
+            return png
+        estatisticas["falhas"] += 1
+        _falhas.inc()
+
+    fig = Figure(figsize=figsize, dpi=DPI)
+    ax = fig.subplots(nrows, ncols, **subplot_kw)
+    try:
+        desenhar(fig, ax)
+        buf = io.BytesIO()
+        fig.savefig(buf, format="png", bbox_inches="tight")
+        png = buf.getvalue()
+    finally:
+        fig.clear()
+        del fig
+    _guardar(chave, png)
+    return png
+
+
+def limpar_cache():
+    global _bytes_cache
+    with _trava:
+        _cache.clear()
+        _bytes_cache = 0
+
+
+def tamanho_cache():
+    with _trava:
+        return len(_cache), _bytes_cache
+
+
+def medir_crescimento_memoria(reruns=150, valores_distintos=20, ingenuo=False):
+    """
+    Simula `reruns` reruns de uma página com três figuras (duas estáticas e
+    uma dependente de um slider com `valores_distintos` posições) e mede com
+    tracemalloc a memória Python alocada após o aquecimento e no final.
+    Com `ingenuo=True` usa o padrão antigo (plt.subplots sem fechar) para
+    comparação. Retorna dict com os bytes no aquecimento, no final e o
+    crescimento por rerun.
+    """
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    x = np.linspace(0, 40, 400)
+
+    def pagina(i):
+        valor = i % valores_distintos
+        y_dinamica = np.exp(-((x - 2 * valor) ** 2) / 8)
+        figuras = [("estatica_a", np.sin(x)), ("estatica_b", np.cos(x)),
+                   (f"dinamica_{valor}", y_dinamica)]
+        for nome, y in figuras:
+            if ingenuo:
+                fig, ax = plt.subplots()
+                ax.plot(x, y)
+            else:
+                renderizar((nome, y), lambda fig, ax, y=y: ax.plot(x, y))
+
+    limpar_cache()
+    aquecimento = valores_distintos * 2
+    tracemalloc.start()
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+            for i in range(aquecimento):
+                pagina(i)
+            base = tracemalloc.get_traced_memory()[0]
+            for i in range(aquecimento, reruns):
+                pagina(i)
+            final = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+        if ingenuo:
+            plt.close("all")
+
+    return {
+        "bytes_apos_aquecimento": base,
+        "bytes_final": final,
+        "crescimento_por_rerun": (final - base) / max(reruns - aquecimento, 1),
+        "figuras_em_cache": tamanho_cache()[0],
+    }
+
+
+# Crescimento aceito por rerun depois do aquecimento (o padrão antigo, sem
+# fechar as figuras, passa de 800 KB por rerun)
+LIMITE_CRESCIMENTO_BYTES = 16 * 1024
+
+
+def verificar_crescimento_memoria(reruns=300, limite=LIMITE_CRESCIMENTO_BYTES, **opcoes):
+    """
+    Roda a página simulada `reruns` vezes e falha (AssertionError) se a memória
+    crescer mais que `limite` bytes por rerun. Retorna a medição.
+    """
+    r = medir_crescimento_memoria(reruns, **opcoes)
+    if r["crescimento_por_rerun"] > limite:
+        raise AssertionError(
+            f"Memória crescendo {r['crescimento_por_rerun']:.0f} bytes/rerun "
+            f"(limite {limite}): {r['bytes_apos_aquecimento']} -> {r['bytes_final']}")
+    return r
+
+
+if __name__ == "__main__":
+    # Termina com código 1 se a renderização com cache vazar memória
+    for ingenuo in (False, True):
+        r = medir_crescimento_memoria(ingenuo=ingenuo)
+        modo = "plt.subplots sem fechar" if ingenuo else "renderizar (cache)"
+        print(f"{modo}: {r['crescimento_por_rerun']:.0f} bytes/rerun "
+              f"({r['bytes_apos_aquecimento']} -> {r['bytes_final']})")
+    try:
+        verificar_crescimento_memoria()
+    except AssertionError as e:
+        print(f"FALHOU: {e}")
+        sys.exit(1)
+    print(f"OK: crescimento abaixo de {LIMITE_CRESCIMENTO_BYTES} bytes/rerun")
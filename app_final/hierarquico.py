@@ -0,0 +1,139 @@
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from metricas import CACHE
+from motor_fuzzy import compilar_sistema
+
+# -----------------------------------------------
+# SISTEMAS FUZZY HIERÁRQUICOS (ENCADEADOS)
+# -----------------------------------------------
+#
+# Cada nó é um `sistema` comum; saídas de um nó alimentam entradas de outros.
+# Os nós são avaliados em ordem topológica. O resultado de cada nó fica em
+# cache junto com as entradas que o produziram: se as entradas de um nó não
+# mudaram, ele não é reavaliado, então só os nós a jusante de uma mudança
+# rodam de novo. Nós do mesmo nível (ramos independentes) rodam em paralelo.
+#
+# Entradas e saídas são identificadas como "no.variavel".
+
+_acertos = CACHE.rotulos("hierarquico", "acerto")
+_falhas = CACHE.rotulos("hierarquico", "falha")
+
+
+class SistemaHierarquico:
+    # Abaixo disso o custo das threads supera o ganho
+    MIN_LINHAS_PARALELO = 1024
+
+    def __init__(self, threads=None):
+        self.nos = {}
+        self.compilados = {}
+        # (destino, entrada) -> (origem, saida)
+        self.ligacoes = {}
+        self.threads = threads
+        self._cache = {}
+        self._trava = threading.Lock()
+        self.estatisticas = {"avaliacoes": 0, "reusos_cache": 0}
+
+    def adicionar_no(self, nome, sistema, ops=None, ag="max", df="centroid"):
+        """Adiciona (ou substitui) um nó; o cache dele é descartado."""
+        self.nos[nome] = sistema
+        self.compilados[nome] = compilar_sistema(sistema, ops, ag, df)
+        self._cache.pop(nome, None)
+
+    def conectar(self, origem, saida, destino, entrada):
+        if saida not in self.nos[origem]["saidas"]:
+            raise ValueError(f"Nó '{origem}' não tem a saída '{saida}'.")
+        if entrada not in self.nos[destino]["entradas"]:
+            raise ValueError(f"Nó '{destino}' não tem a entrada '{entrada}'.")
+        self.ligacoes[(destino, entrada)] = (origem, saida)
+        self.niveis()  # falha cedo se criar um ciclo
+        self._cache.pop(destino, None)
+
+    def niveis(self):
+        """Nós agrupados por nível topológico (cada nível só depende dos anteriores)."""
+        deps = {no: set() for no in self.nos}
+        for (destino, _), (origem, _) in self.ligacoes.items():
+            deps[destino].add(origem)
+        niveis = []
+        feitos = set()
+        while len(feitos) < len(self.nos):
+            nivel = [no for no in self.nos
+                     if no not in feitos and deps[no] <= feitos]
+            if not nivel:
+                raise ValueError("As ligações formam um ciclo.")
+            niveis.append(nivel)
+            feitos.update(nivel)
+        return niveis
+
+    def ordem_topologica(self):
+        return [no for nivel in self.niveis() for no in nivel]
+
+    def entradas_externas(self):
+        return [f"{no}.{var}" for no, sistema in self.nos.items()
+                for var in sistema["entradas"] if (no, var) not in self.ligacoes]
+
+    def _entradas_do_no(self, no, externos, resultados):
+        colunas = []
+        for var in self.compilados[no].entradas:
+            if (no, var) in self.ligacoes:
+                origem, saida = self.ligacoes[(no, var)]
+                colunas.append(resultados[f"{origem}.{saida}"])
+            else:
+                colunas.append(externos[f"{no}.{var}"])
+        return np.column_stack(colunas)
+
+    def _avaliar_no(self, no, X, tamanho_bloco):
+        chave = hashlib.blake2b(np.ascontiguousarray(X).tobytes(), digest_size=16).digest()
+        anterior = self._cache.get(no)
+        if anterior is not None and anterior[0] == chave and anterior[1] == X.shape:
+            with self._trava:
+                self.estatisticas["reusos_cache"] += 1
+            _acertos.inc()
+            return anterior[2]
+        _falhas.inc()
+        saidas = self.compilados[no].avaliar(X, tamanho_bloco)
+        with self._trava:
+            self._cache[no] = (chave, X.shape, saidas)
+            self.estatisticas["avaliacoes"] += 1
+        return saidas
+
+    def avaliar_lote(self, dados, tamanho_bloco=4096):
+        """
+        `dados`: {"no.entrada": array} para todas as entradas externas.
+        Retorna {"no.saida": array} para as saídas de todos os nós.
+        """
+        externos = {k: np.atleast_1d(np.asarray(v, dtype=float)) for k, v in dados.items()}
+        faltando = [k for k in self.entradas_externas() if k not in externos]
+        if faltando:
+            raise ValueError("Faltam valores para: " + ", ".join(faltando))
+
+        resultados = {}
+        n = max((len(v) for v in externos.values()), default=0)
+        paralelo = self.threads != 1 and n >= self.MIN_LINHAS_PARALELO
+        executor = ThreadPoolExecutor(self.threads) if paralelo else None
+        try:
+            for nivel in self.niveis():
+                entradas = {no: self._entradas_do_no(no, externos, resultados)
+                            for no in nivel}
+                if executor is not None and len(nivel) > 1:
+                    futuros = {no: executor.submit(self._avaliar_no, no, entradas[no], tamanho_bloco)
+                               for no in nivel}
+                    saidas_nivel = {no: f.result() for no, f in futuros.items()}
+                else:
+                    saidas_nivel = {no: self._avaliar_no(no, entradas[no], tamanho_bloco)
+                                    for no in nivel}
+                for no, saidas in saidas_nivel.items():
+                    for saida, valores in saidas.items():
+                        resultados[f"{no}.{saida}"] = valores
+        finally:
+            if executor is not None:
+                executor.shutdown()
+        return resultados
+
+    def avaliar(self, valores):
+        """Avalia um único ponto: {"no.entrada": valor} -> {"no.saida": valor}."""
+        resultados = self.avaliar_lote({k: [v] for k, v in valores.items()})
+        return {k: float(v[0]) for k, v in resultados.items()}
@@ -0,0 +1,309 @@
+import bisect
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# -----------------------------------------------
+# MÉTRICAS NO FORMATO PROMETHEUS
+# -----------------------------------------------
+#
+# Registro de contadores, medidores e histogramas com rótulos, exportado no
+# formato de texto do Prometheus (arquivo ou endpoint HTTP local). Cada
+# combinação de rótulos é um objeto próprio: o caminho quente faz
+# `HIST.rotulos("graus")` uma vez (em nível de módulo) e depois só chama
+# `observar`, que custa uma busca binária e uma soma sob trava.
+
+BUCKETS_PADRAO = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+                  0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _texto_rotulos(nomes, valores, extra=""):
+    pares = [f'{n}="{_escapar(v)}"' for n, v in zip(nomes, valores)]
+    if extra:
+        pares.append(extra)
+    return "{" + ",".join(pares) + "}" if pares else ""
+
+
+def _escapar(valor):
+    return str(valor).replace("\\", r"\\").replace("\n", r"\n").replace('"', r'\"')
+
+
+def _numero(v):
+    if v == float("inf"):
+        return "+Inf"
+    return repr(float(v)) if isinstance(v, float) else str(v)
+
+
+class _ValorContador:
+    __slots__ = ("valor", "_trava")
+
+    def __init__(self):
+        self.valor = 0.0
+        self._trava = threading.Lock()
+
+    def inc(self, quantidade=1.0):
+        with self._trava:
+            self.valor += quantidade
+
+
+class _ValorMedidor(_ValorContador):
+    __slots__ = ()
+
+    def definir(self, valor):
+        with self._trava:
+            self.valor = float(valor)
+
+
+class _ValorHistograma:
+    __slots__ = ("limites", "contagens", "soma", "total", "_trava")
+
+    def __init__(self, limites):
+        self.limites = limites
+        self.contagens = [0] * (len(limites) + 1)
+        self.soma = 0.0
+        self.total = 0
+        self._trava = threading.Lock()
+
+    def observar(self, valor):
+        i = bisect.bisect_left(self.limites, valor)
+        with self._trava:
+            self.contagens[i] += 1
+            self.soma += valor
+            self.total += 1
+
+    @contextmanager
+    def cronometrar(self):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observar(time.perf_counter() - t0)
+
+
+class _Metrica:
+    tipo = ""
+    _classe_valor = None
+
+    def __init__(self, nome, ajuda, rotulos=()):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.nomes_rotulos = tuple(rotulos)
+        self._filhos = {}
+        self._trava = threading.Lock()
+
+    def _novo_valor(self):
+        return self._classe_valor()
+
+    def rotulos(self, *valores):
+        """O valor para uma combinação de rótulos (criado na primeira vez)."""
+        if len(valores) != len(self.nomes_rotulos):
+            raise ValueError(f"{self.nome} espera os rótulos {self.nomes_rotulos}.")
+        filho = self._filhos.get(valores)
+        if filho is None:
+            with self._trava:
+                filho = self._filhos.setdefault(valores, self._novo_valor())
+        return filho
+
+    def _amostras(self):
+        with self._trava:
+            return sorted(self._filhos.items())
+
+    def exportar(self):
+        linhas = [f"# HELP {self.nome} {self.ajuda}", f"# TYPE {self.nome} {self.tipo}"]
+        for valores, filho in self._amostras():
+            linhas.append(f"{self.nome}{_texto_rotulos(self.nomes_rotulos, valores)} "
+                          f"{_numero(filho.valor)}")
+        return linhas
+
+
+class Contador(_Metrica):
+    tipo = "counter"
+    _classe_valor = _ValorContador
+
+    def inc(self, quantidade=1.0, *rotulos):
+        self.rotulos(*rotulos).inc(quantidade)
+
+
+class Medidor(_Metrica):
+    tipo = "gauge"
+    _classe_valor = _ValorMedidor
+
+    def definir(self, valor, *rotulos):
+        self.rotulos(*rotulos).definir(valor)
+
+
+class Histograma(_Metrica):
+    tipo = "histogram"
+
+    def __init__(self, nome, ajuda, rotulos=(), buckets=BUCKETS_PADRAO):
+        super().__init__(nome, ajuda, rotulos)
+        self.limites = tuple(sorted(buckets))
+
+    def _novo_valor(self):
+        return _ValorHistograma(self.limites)
+
+    def observar(self, valor, *rotulos):
+        self.rotulos(*rotulos).observar(valor)
+
+    def exportar(self):
+        linhas = [f"# HELP {self.nome} {self.ajuda}", f"# TYPE {self.nome} {self.tipo}"]
+        for valores, filho in self._amostras():
+            with filho._trava:
+                contagens, soma, total = list(filho.contagens), filho.soma, filho.total
+            acumulado = 0
+            for limite, c in zip(self.limites + (float("inf"),), contagens):
+                acumulado += c
+                le = f'le="{_numero(float(limite))}"'
+                linhas.append(f"{self.nome}_bucket"
+                              f"{_texto_rotulos(self.nomes_rotulos, valores, le)} {acumulado}")
+            rot = _texto_rotulos(self.nomes_rotulos, valores)
+            linhas.append(f"{self.nome}_sum{rot} {_numero(soma)}")
+            linhas.append(f"{self.nome}_count{rot} {total}")
+        return linhas
+
+
+class Registro:
+    def __init__(self):
+        self._metricas = {}
+        self._trava = threading.Lock()
+
+    def _registrar(self, classe, nome, ajuda, rotulos, **kwargs):
+        with self._trava:
+            existente = self._metricas.get(nome)
+            if existente is not None:
+                if not isinstance(existente, classe) or existente.nomes_rotulos != tuple(rotulos):
+                    raise ValueError(f"Métrica '{nome}' já registrada com outro tipo ou rótulos.")
+                return existente
+            metrica = classe(nome, ajuda, rotulos, **kwargs)
+            self._metricas[nome] = metrica
+            return metrica
+
+    def contador(self, nome, ajuda, rotulos=()):
+        return self._registrar(Contador, nome, ajuda, rotulos)
+
+    def medidor(self, nome, ajuda, rotulos=()):
+        return self._registrar(Medidor, nome, ajuda, rotulos)
+
+    def histograma(self, nome, ajuda, rotulos=(), buckets=BUCKETS_PADRAO):
+        return self._registrar(Histograma, nome, ajuda, rotulos, buckets=buckets)
+
+    def exportar_texto(self):
+        """Todas as métricas no formato de exposição de texto do Prometheus."""
+        with self._trava:
+            metricas = sorted(self._metricas.values(), key=lambda m: m.nome)
+        linhas = []
+        for m in metricas:
+            linhas.extend(m.exportar())
+        return "\n".join(linhas) + "\n"
+
+    def salvar(self, caminho):
+        """Grava o texto num arquivo (ex.: para o textfile collector do node_exporter)."""
+        temporario = caminho + ".tmp"
+        with open(temporario, "w", encoding="utf-8") as f:
+            f.write(self.exportar_texto())
+        # Troca atômica: o coletor nunca lê um arquivo pela metade
+        os.replace(temporario, caminho)
+
+
+REGISTRO = Registro()
+
+# -----------------------------------------------
+# MÉTRICAS DA APLICAÇÃO
+# -----------------------------------------------
+
+INFERENCIAS = REGISTRO.contador(
+    "fuzzy_inferencias_total",
+    "Amostras avaliadas, por motor (unitario, lote, lut, tipo2).", ("motor",))
+DURACAO_ETAPA = REGISTRO.histograma(
+    "fuzzy_etapa_duracao_segundos",
+    "Duração das etapas de inferência (por chamada ou por bloco do lote).", ("etapa",))
+CACHE = REGISTRO.contador(
+    "fuzzy_cache_acessos_total",
+    "Acessos a caches, por cache e resultado (acerto/falha).", ("cache", "resultado"))
+LLM_DURACAO = REGISTRO.histograma(
+    "fuzzy_llm_duracao_segundos",
+    "Latência das chamadas ao modelo de linguagem, por página.", ("pagina",))
+LLM_ERROS = REGISTRO.contador(
+    "fuzzy_llm_erros_total",
+    "Chamadas ao modelo de linguagem que falharam, por página e tipo de erro.",
+    ("pagina", "erro"))
+LLM_TOKENS_PROMPT = REGISTRO.histograma(
+    "fuzzy_llm_tokens_prompt",
+    "Tamanho dos prompts enviados ao modelo (tokens), por página.", ("pagina",),
+    buckets=(64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384, 32768))
+
+
+@contextmanager
+def medir_llm(pagina):
+    """Cronometra uma chamada ao modelo e conta a falha se ela levantar exceção."""
+    t0 = time.perf_counter()
+    try:
+        yield
+    except Exception as e:
+        LLM_ERROS.inc(1, pagina, type(e).__name__)
+        raise
+    finally:
+        LLM_DURACAO.observar(time.perf_counter() - t0, pagina)
+
+
+# -----------------------------------------------
+# ENDPOINT HTTP
+# -----------------------------------------------
+
+TIPO_CONTEUDO = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def responder_metricas(manipulador, registro=REGISTRO):
+    """Escreve /metrics num BaseHTTPRequestHandler."""
+    dados = registro.exportar_texto().encode("utf-8")
+    manipulador.send_response(200)
+    manipulador.send_header("Content-Type", TIPO_CONTEUDO)
+    manipulador.send_header("Content-Length", str(len(dados)))
+    manipulador.end_headers()
+    manipulador.wfile.write(dados)
+
+
+class _ManipuladorMetricas(BaseHTTPRequestHandler):
+    def log_message(self, formato, *args):
+        pass
+
+    def do_GET(self):
+        if self.path in ("/metrics", "/metricas"):
+            responder_metricas(self)
+        else:
+            self.send_error(404)
+
+
+_servidor = None
+_trava_servidor = threading.Lock()
+
+
+def iniciar_servidor_metricas(porta=9464, host="127.0.0.1"):
+    """
+    Sobe (uma única vez por processo) um endpoint /metrics em segundo plano.
+    Chamadas repetidas, como nos reruns do Streamlit, reaproveitam o servidor.
+    """
+    global _servidor
+    with _trava_servidor:
+        if _servidor is None:
+            _servidor = ThreadingHTTPServer((host, porta), _ManipuladorMetricas)
+            _servidor.daemon_threads = True
+            threading.Thread(target=_servidor.serve_forever, daemon=True).start()
+        return _servidor
+
+
+def medir_sobrecarga(n=200_000):
+    """Custo médio (em segundos) de um `observar` e de um `inc` já rotulados."""
+    reg = Registro()
+    h = reg.histograma("h", "teste", ("r",)).rotulos("a")
+    c = reg.contador("c", "teste", ("r",)).rotulos("a")
+    t0 = time.perf_counter()
+    for _ in range(n):
+        h.observar(0.001)
+    t1 = time.perf_counter()
+    for _ in range(n):
+        c.inc()
+    t2 = time.perf_counter()
+    return {"observar_s": (t1 - t0) / n, "inc_s": (t2 - t1) / n}
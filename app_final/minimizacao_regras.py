@@ -0,0 +1,247 @@
+import copy
+import time
+
+import numpy as np
+
+from motor_fuzzy import calcular_saida, compilar_sistema
+from operadores import normalizar_ops
+
+# -----------------------------------------------
+# MINIMIZAÇÃO DA BASE DE REGRAS
+# -----------------------------------------------
+#
+# Cada regra custa uma iteração em `calcular_saida`. Aqui encontramos regras
+# inválidas, que nunca disparam, duplicadas, subsumidas e conflitantes, e
+# removemos/mesclamos as que não mudam a saída. O resultado é conferido por
+# avaliação em lote sobre amostras do universo das entradas.
+
+
+def _chave_antecedentes(regra):
+    ants = frozenset(tuple(a) for a in regra["antecedentes"])
+    # Com um único antecedente AND e OR dão a mesma força
+    logica = regra["logica"] if len(ants) > 1 else "*"
+    return ants, logica
+
+
+def _suporte(ys):
+    """Pontos do universo onde a pertinência interpolada pode ser > 0."""
+    m = ys > 0
+    s = m.copy()
+    s[1:] |= m[:-1]
+    s[:-1] |= m[1:]
+    return s
+
+
+def _regra_valida(sistema, regra):
+    try:
+        for var, conj in regra["antecedentes"]:
+            sistema["entradas"][var]["conjuntos"][conj]
+        saida, conj_s = regra["consequente"]
+        sistema["saidas"][saida]["conjuntos"][conj_s]
+    except (KeyError, TypeError, ValueError):
+        return False
+    return len(regra["antecedentes"]) > 0
+
+
+def _nunca_dispara(compilado, regra, idx):
+    """True se a força da regra é 0 para qualquer entrada."""
+    suportes = {}
+    for t in idx:
+        var = compilado.termos[t][0]
+        s = _suporte(compilado.curvas_termos[t])
+        suportes.setdefault(var, []).append(s)
+    if regra["logica"] == "AND" or len(idx) == 1:
+        # todos os antecedentes precisam ser > 0 ao mesmo tempo
+        return any(not np.logical_and.reduce(ss).any() for ss in suportes.values())
+    return not any(s.any() for ss in suportes.values() for s in ss)
+
+
+def _subsume(a, b):
+    """
+    True se a força da regra `b` é sempre >= à da regra `a` (mesmo consequente),
+    para qualquer t-norma/t-conorma (graus em [0, 1]).
+    """
+    ants_a, log_a = a
+    ants_b, log_b = b
+    e_a = log_a in ("AND", "*")
+    e_b = log_b in ("AND", "*")
+    ou_a = log_a != "AND"
+    ou_b = log_b != "AND"
+    if e_a and e_b and ants_b <= ants_a:
+        return True
+    if ou_a and ou_b and ants_a <= ants_b:
+        return True
+    if e_a and ou_b and ants_a & ants_b:
+        return True
+    return False
+
+
+def analisar_regras(sistema, ops=None, ag="max"):
+    """
+    Classifica as regras (índices em sistema["regras"]):
+    - invalidas: citam variável/conjunto inexistente
+    - nunca_disparam: antecedentes AND sem suporte em comum
+    - duplicadas: [(i, j)] regra i repete a regra j
+    - subsumidas: [(i, j)] força de i <= força de j, mesmo consequente
+      (só com agregação max, em que i não altera a saída)
+    - conflitantes: [(i, j)] mesmos antecedentes e consequentes diferentes
+    - mesclaveis: grupos de regras OR/simples com o mesmo consequente que
+      viram uma única regra OR quando o OR é max e a agregação é max
+    """
+    ops = normalizar_ops(ops)
+    agregacao_max = ag.lower().strip().startswith("max")
+    regras = sistema["regras"]
+
+    invalidas = [i for i, r in enumerate(regras) if not _regra_valida(sistema, r)]
+    validas = [i for i in range(len(regras)) if i not in set(invalidas)]
+
+    sub = dict(sistema, regras=[regras[i] for i in validas])
+    compilado = compilar_sistema(sub, ops, ag)
+
+    nunca = []
+    for pos, i in enumerate(validas):
+        if _nunca_dispara(compilado, regras[i], compilado.regras[pos][0]):
+            nunca.append(i)
+
+    vistas = {}
+    duplicadas = []
+    conflitantes = []
+    por_antecedentes = {}
+    candidatas = [i for i in validas if i not in set(nunca)]
+    for i in candidatas:
+        chave = _chave_antecedentes(regras[i])
+        cons = tuple(regras[i]["consequente"])
+        if (chave, cons) in vistas:
+            duplicadas.append((i, vistas[(chave, cons)]))
+            continue
+        vistas[(chave, cons)] = i
+        for j, cons_j in por_antecedentes.get(chave, []):
+            if cons_j[0] == cons[0] and cons_j[1] != cons[1]:
+                conflitantes.append((i, j))
+        por_antecedentes.setdefault(chave, []).append((i, cons))
+
+    subsumidas = []
+    mesclaveis = []
+    if agregacao_max:
+        restantes = [i for i in candidatas if i not in {d for d, _ in duplicadas}]
+        removidas = set()
+        for i in restantes:
+            for j in restantes:
+                if i == j or j in removidas:
+                    continue
+                if (tuple(regras[i]["consequente"]) == tuple(regras[j]["consequente"])
+                        and _subsume(_chave_antecedentes(regras[i]),
+                                     _chave_antecedentes(regras[j]))):
+                    subsumidas.append((i, j))
+                    removidas.add(i)
+                    break
+
+        if ops.get("or") == "max":
+            grupos = {}
+            for i in restantes:
+                if i in removidas:
+                    continue
+                if len(regras[i]["antecedentes"]) == 1 or regras[i]["logica"] != "AND":
+                    grupos.setdefault(tuple(regras[i]["consequente"]), []).append(i)
+            mesclaveis = [g for g in grupos.values() if len(g) > 1]
+
+    return {
+        "invalidas": invalidas,
+        "nunca_disparam": nunca,
+        "duplicadas": duplicadas,
+        "subsumidas": subsumidas,
+        "conflitantes": conflitantes,
+        "mesclaveis": mesclaveis,
+    }
+
+
+def _amostras_universo(sistema, n, rng):
+    return np.column_stack([
+        rng.uniform(*map(float, info["universo"]), n)
+        for info in sistema["entradas"].values()
+    ])
+
+
+def _tempo_interpretador(sistema, X, ops, ag, df):
+    nomes = list(sistema["entradas"].keys())
+    t0 = time.perf_counter()
+    for linha in X:
+        calcular_saida(sistema, dict(zip(nomes, linha)), ops, ag, df)
+    return time.perf_counter() - t0
+
+
+def minimizar_regras(sistema, ops=None, ag="max", df="centroid", mesclar=False,
+                     tol=1e-6, n_amostras=5000, n_tempo=200, semente=0):
+    """
+    Remove regras inválidas, que nunca disparam, duplicadas e subsumidas
+    (e, se `mesclar`, junta as mescláveis em uma regra OR). Confere em
+    `n_amostras` pontos que as saídas mudam no máximo `tol`; se não, devolve
+    o sistema original. Conflitos são apenas relatados.
+    Retorna (sistema_reduzido, relatorio).
+    """
+    ops = normalizar_ops(ops)
+    analise = analisar_regras(sistema, ops, ag)
+    regras = sistema["regras"]
+    agregacao_max = ag.lower().strip().startswith("max")
+
+    remover = set(analise["invalidas"]) | set(analise["nunca_disparam"])
+    if agregacao_max:
+        # Com soma limitada regras repetidas contam duas vezes: não são redundantes
+        remover |= {i for i, _ in analise["duplicadas"]}
+        remover |= {i for i, _ in analise["subsumidas"]}
+
+    novas = []
+    mescladas = set()
+    if mesclar:
+        for grupo in analise["mesclaveis"]:
+            ants = []
+            for i in grupo:
+                for a in regras[i]["antecedentes"]:
+                    if tuple(a) not in ants:
+                        ants.append(tuple(a))
+            novas.append((grupo[0], {"antecedentes": ants,
+                                     "consequente": tuple(regras[grupo[0]]["consequente"]),
+                                     "logica": "OR"}))
+            mescladas |= set(grupo)
+
+    reduzidas = []
+    por_indice = dict(novas)
+    for i, r in enumerate(regras):
+        if i in por_indice:
+            reduzidas.append(por_indice[i])
+        elif i not in remover and i not in mescladas:
+            reduzidas.append(copy.deepcopy(r))
+
+    original = dict(sistema, regras=[r for i, r in enumerate(regras)
+                                     if i not in set(analise["invalidas"])])
+    reduzido = dict(copy.deepcopy({k: v for k, v in sistema.items() if k != "regras"}),
+                    regras=reduzidas)
+
+    rng = np.random.default_rng(semente)
+    X = _amostras_universo(sistema, n_amostras, rng)
+    comp_orig = compilar_sistema(original, ops, ag, df)
+    comp_red = compilar_sistema(reduzido, ops, ag, df)
+
+    t0 = time.perf_counter()
+    y_orig = comp_orig.avaliar(X)
+    t_lote_orig = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    y_red = comp_red.avaliar(X)
+    t_lote_red = time.perf_counter() - t0
+
+    dif = max((float(np.max(np.abs(y_orig[s] - y_red[s]))) for s in y_orig), default=0.0)
+    verificado = dif <= tol
+
+    t_int_orig = _tempo_interpretador(original, X[:n_tempo], ops, ag, df)
+    t_int_red = _tempo_interpretador(reduzido, X[:n_tempo], ops, ag, df)
+
+    relatorio = {
+        "analise": analise,
+        "regras_antes": len(regras),
+        "regras_depois": len(reduzidas) if verificado else len(regras),
+        "diferenca_maxima": dif,
+        "verificado": verificado,
+        "speedup_interpretador": t_int_orig / t_int_red if t_int_red > 0 else float("inf"),
+        "speedup_lote": t_lote_orig / t_lote_red if t_lote_red > 0 else float("inf"),
+    }
+    return (reduzido if verificado else sistema), relatorio
@@ -0,0 +1,431 @@
+import hashlib
+import json
+import os
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import numpy as np
+
+from conversa import HistoricoConversa, estimar_tokens, tokens_usados
+from metricas import medir_llm
+from prompts import INSTRUCAO_GERADOR, ModeloFalso, prompt_explicacao, prompt_gerador
+
+# -----------------------------------------------
+# MODELO DE LINGUAGEM PLUGÁVEL (GEMINI, GRAVAÇÃO E REPLAY)
+# -----------------------------------------------
+#
+# As páginas só usam `modelo.generate_content(conteudo)` (ou com
+# stream=True, iterando os pedaços) e os campos `.text` e `.usage_metadata`
+# da resposta. `criar_modelo` devolve qualquer objeto com essa interface,
+# escolhido pela variável de ambiente FUZZY_LLM:
+#   gemini  (padrão) o `genai.GenerativeModel` de verdade;
+#   gravar  o Gemini, gravando prompt, resposta e latência de cada chamada
+#           em FUZZY_LLM_ARQUIVO (JSONL, uma chamada por linha);
+#   replay  local, sem rede: devolve a resposta gravada para o mesmo prompt
+#           ou uma resposta sintética (texto ou JSON do Gerador, às vezes
+#           malformado de propósito para exercitar `extrair_json`).
+# O replay é determinístico: resposta, caso de JSON e jitter dependem só
+# do prompt e da semente. A latência segue o modelo de custo do
+# `ModeloFalso` (ou a latência gravada) mais um jitter uniforme, e com
+# stream=True os pedaços chegam espaçados pelo custo dos seus tokens.
+# Em replay: FUZZY_LLM_LATENCIA (latência fixa, s), FUZZY_LLM_JITTER (s) e
+# FUZZY_LLM_JSON_INVALIDO (fração de respostas JSON malformadas).
+
+BACKENDS_LLM = ("gemini", "gravar", "replay")
+ARQUIVO_PADRAO = "gravacoes_llm.jsonl"
+MODELO_PADRAO = "models/gemini-2.5-flash"
+PAGINAS_LLM = ("chatbot", "explicacao", "gerador")
+
+
+def extrair_json(texto):
+    try:
+        texto = re.sub(r"```json", "", texto)
+        texto = re.sub(r"```", "", texto)
+
+        match = re.search(r"\{.*\}", texto, re.DOTALL)
+        if match:
+            bloco = match.group(0)
+            return json.loads(bloco)
+
+    except Exception as e:
+        return None
+
+    return None
+
+
+# Variações da resposta do Gerador: as três primeiras `extrair_json` recupera
+CASOS_JSON = {
+    "valido": lambda t: t,
+    "cercado": lambda t: f"```json\n{t}\n```",
+    "com_prosa": lambda t: f"Aqui está o sistema pedido:\n{t}\nEspero ter ajudado!",
+    "truncado": lambda t: t[:len(t) * 2 // 3],
+    "virgula_final": lambda t: t.rstrip()[:-1].rstrip() + ",}",
+    "aspas_simples": lambda t: t.replace('"', "'"),
+    "dois_blocos": lambda t: f"{t}\n\nOutra opção:\n{t}",
+    "sem_json": lambda t: "Desculpe, não consegui gerar o sistema agora.",
+}
+
+_PALAVRAS = ("o", "sistema", "fuzzy", "regra", "pertinência", "conjunto", "saída", "entrada",
+             "grau", "de", "com", "a", "temperatura", "quando", "é", "alta", "baixa", "média",
+             "defuzzificação", "centroide", "agregação", "valor", "controle", "ativa")
+_VARIAVEIS = ("temperatura", "umidade", "pressao", "velocidade", "distancia", "luminosidade")
+_SAIDAS = ("potencia", "abertura", "alerta")
+_TEMAS = ("irrigação de estufa", "climatização", "trânsito", "frenagem", "iluminação")
+_PERGUNTAS = ("o que é uma função de pertinência?", "como funciona o centroide?",
+              "qual a diferença entre AND e OR?", "para que serve a agregação?")
+
+
+def chave_prompt(system_instruction, conteudo):
+    h = hashlib.sha256((system_instruction or "").encode("utf-8"))
+    h.update(b"\0")
+    h.update(conteudo.encode("utf-8"))
+    return h.hexdigest()[:32]
+
+
+def backend_llm(backend=None):
+    backend = (backend or os.environ.get("FUZZY_LLM", "gemini")).lower().strip()
+    if backend not in BACKENDS_LLM:
+        raise ValueError(f"Backend de LLM desconhecido: {backend}. Use {', '.join(BACKENDS_LLM)}.")
+    return backend
+
+
+# -----------------------------------------------
+# GRAVAÇÕES
+# -----------------------------------------------
+
+
+class Gravacoes:
+    """Chamadas gravadas (JSONL), indexadas pela chave do prompt."""
+
+    def __init__(self, caminho=None):
+        self.caminho = caminho
+        self.registros = {}
+        self._trava = threading.Lock()
+        if caminho and os.path.exists(caminho):
+            with open(caminho, encoding="utf-8") as f:
+                for linha in f:
+                    if linha.strip():
+                        registro = json.loads(linha)
+                        self.registros[registro["chave"]] = registro
+
+    def __len__(self):
+        return len(self.registros)
+
+    def obter(self, chave):
+        return self.registros.get(chave)
+
+    def gravar(self, registro):
+        with self._trava:
+            self.registros[registro["chave"]] = registro
+            if self.caminho:
+                with open(self.caminho, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(registro, ensure_ascii=False) + "\n")
+
+
+_gravacoes_abertas = {}
+_trava_gravacoes = threading.Lock()
+
+
+def abrir_gravacoes(caminho):
+    """Uma instância por arquivo no processo (os modelos das páginas a compartilham)."""
+    with _trava_gravacoes:
+        if caminho not in _gravacoes_abertas:
+            _gravacoes_abertas[caminho] = Gravacoes(caminho)
+        return _gravacoes_abertas[caminho]
+
+
+class RespostaEmFluxo:
+    """Resposta de stream=True: iterar entrega os pedaços; `.text` junta todos."""
+
+    def __init__(self, pedacos, usage_metadata=None, caso_json=None):
+        self._pedacos = iter(pedacos)
+        self._recebidos = []
+        self.usage_metadata = usage_metadata
+        self.caso_json = caso_json
+
+    def __iter__(self):
+        for pedaco in self._pedacos:
+            self._recebidos.append(pedaco.text)
+            yield pedaco
+
+    @property
+    def text(self):
+        for _ in self:
+            pass
+        return "".join(self._recebidos)
+
+
+class ModeloGravador:
+    """Repassa as chamadas a um modelo real e grava prompt, resposta e latência."""
+
+    def __init__(self, modelo, gravacoes, system_instruction=None):
+        self.modelo = modelo
+        self.gravacoes = gravacoes
+        self.system_instruction = system_instruction
+
+    def _gravar(self, conteudo, texto, latencia_s, resposta):
+        self.gravacoes.gravar({
+            "chave": chave_prompt(self.system_instruction, conteudo),
+            "prompt": conteudo,
+            "resposta": texto,
+            "latencia_s": latencia_s,
+            "tokens_prompt": tokens_usados(resposta, estimar_tokens(conteudo)),
+        })
+
+    def generate_content(self, conteudo, stream=False, **opcoes):
+        t0 = time.perf_counter()
+        if not stream:
+            resposta = self.modelo.generate_content(conteudo, **opcoes)
+            self._gravar(conteudo, resposta.text, time.perf_counter() - t0, resposta)
+            return resposta
+        resposta = self.modelo.generate_content(conteudo, stream=True, **opcoes)
+
+        def pedacos():
+            partes = []
+            for pedaco in resposta:
+                partes.append(pedaco.text)
+                yield pedaco
+            self._gravar(conteudo, "".join(partes), time.perf_counter() - t0, resposta)
+
+        return RespostaEmFluxo(pedacos(), getattr(resposta, "usage_metadata", None))
+
+
+# -----------------------------------------------
+# REPLAY LOCAL
+# -----------------------------------------------
+
+
+def sistema_sintetico(rng):
+    """Sistema no formato pedido por `INSTRUCAO_GERADOR` (2–3 entradas, 1–2 saídas)."""
+    def variavel():
+        umax = float(rng.choice([10, 50, 100]))
+        meio = umax / 2
+        return {"universo": [0, umax], "conjuntos": {
+            "baixo": {"tipo": "trimf", "params": [0, 0, meio]},
+            "medio": {"tipo": "trimf", "params": [0, meio, umax]},
+            "alto": {"tipo": "trimf", "params": [meio, umax, umax]},
+        }}
+
+    entradas = {v: variavel() for v in rng.choice(_VARIAVEIS, int(rng.integers(2, 4)), replace=False)}
+    saidas = {s: variavel() for s in rng.choice(_SAIDAS, int(rng.integers(1, 3)), replace=False)}
+    conjuntos = ["baixo", "medio", "alto"]
+    regras = []
+    for _ in range(int(rng.integers(4, 10))):
+        usadas = rng.choice(list(entradas), int(rng.integers(1, len(entradas) + 1)), replace=False)
+        regras.append({
+            "antecedentes": [[str(v), str(rng.choice(conjuntos))] for v in usadas],
+            "consequente": [str(rng.choice(list(saidas))), str(rng.choice(conjuntos))],
+            "logica": str(rng.choice(["AND", "OR"])),
+        })
+    return {"entradas": entradas, "saidas": saidas, "regras": regras,
+            "explicacao": "Sistema sintético gerado localmente para testes."}
+
+
+class ModeloReplay(ModeloFalso):
+    """
+    Modelo local determinístico: resposta gravada para o mesmo prompt ou
+    sintética, com a latência do `ModeloFalso` (ou a gravada) mais jitter.
+    `taxa_json_invalido` é a fração de respostas JSON trocadas por um dos
+    `casos_json` malformados; a resposta traz o caso usado em `caso_json`.
+    """
+
+    def __init__(self, system_instruction=None, gravacoes=None, jitter_s=0.0,
+                 taxa_json_invalido=0.0, casos_json=None, tokens_por_pedaco=16,
+                 usar_latencia_gravada=True, semente=0, **custos):
+        super().__init__(system_instruction, **custos)
+        self.gravacoes = gravacoes if isinstance(gravacoes, Gravacoes) else Gravacoes(gravacoes)
+        self.jitter_s = jitter_s
+        self.taxa_json_invalido = taxa_json_invalido
+        self.casos_json = tuple(casos_json or (c for c in CASOS_JSON if c != "valido"))
+        self.tokens_por_pedaco = tokens_por_pedaco
+        self.usar_latencia_gravada = usar_latencia_gravada
+        self.semente = semente
+
+    def sintetica(self, conteudo, rng):
+        """(texto, caso_json) de uma resposta inventada para o prompt."""
+        if "JSON" in (self.system_instruction or "") or "JSON" in conteudo:
+            texto = json.dumps(sistema_sintetico(rng), ensure_ascii=False)
+            caso = "valido"
+            if rng.random() < self.taxa_json_invalido:
+                caso = self.casos_json[int(rng.integers(len(self.casos_json)))]
+            return CASOS_JSON[caso](texto), caso
+        palavras = rng.choice(_PALAVRAS, int(rng.integers(40, 160)))
+        return "Resposta simulada: " + " ".join(palavras) + ".", None
+
+    def _pedacos(self, texto, segundos):
+        tamanho = 4 * self.tokens_por_pedaco  # ~4 caracteres por token, como `estimar_tokens`
+        pedacos = [texto[i:i + tamanho] for i in range(0, len(texto), tamanho)] or [""]
+        custos = [self.s_por_token_resposta * estimar_tokens(p) for p in pedacos]
+        # Até o primeiro pedaço: tudo menos a geração da resposta
+        time.sleep(max(segundos - sum(custos), 0))
+        for pedaco, custo in zip(pedacos, custos):
+            time.sleep(custo)
+            yield SimpleNamespace(text=pedaco)
+
+    def generate_content(self, conteudo, stream=False, **opcoes):
+        chave = chave_prompt(self.system_instruction, conteudo)
+        rng = np.random.default_rng([int(chave[:16], 16), self.semente])
+        gravado = self.gravacoes.obter(chave)
+        if gravado is not None:
+            texto, caso = gravado["resposta"], None
+        else:
+            texto, caso = self.sintetica(conteudo, rng)
+        segundos, tokens, em_cache = self.custo(conteudo, texto)
+        if gravado is not None and self.usar_latencia_gravada and gravado.get("latencia_s"):
+            segundos = gravado["latencia_s"]
+        segundos += self.jitter_s * rng.random()
+        uso = SimpleNamespace(prompt_token_count=tokens, cached_content_token_count=em_cache)
+        if stream:
+            return RespostaEmFluxo(self._pedacos(texto, segundos), uso, caso)
+        time.sleep(segundos)
+        return SimpleNamespace(text=texto, usage_metadata=uso, caso_json=caso)
+
+
+def criar_modelo(nome=MODELO_PADRAO, system_instruction=None, backend=None, api_key=None,
+                 arquivo=None, **opcoes):
+    """
+    Modelo com a interface de `GenerativeModel.generate_content` para o
+    backend pedido (ou FUZZY_LLM). `opcoes` vão para o `ModeloReplay`.
+    """
+    backend = backend_llm(backend)
+    arquivo = arquivo or os.environ.get("FUZZY_LLM_ARQUIVO", ARQUIVO_PADRAO)
+    if backend == "replay":
+        for opcao, variavel in (("latencia_fixa_s", "FUZZY_LLM_LATENCIA"),
+                                ("jitter_s", "FUZZY_LLM_JITTER"),
+                                ("taxa_json_invalido", "FUZZY_LLM_JSON_INVALIDO")):
+            if variavel in os.environ:
+                opcoes.setdefault(opcao, float(os.environ[variavel]))
+        return ModeloReplay(system_instruction, abrir_gravacoes(arquivo), **opcoes)
+
+    import google.generativeai as genai
+
+    if api_key:
+        genai.configure(api_key=api_key)
+    modelo = genai.GenerativeModel(nome, system_instruction=system_instruction)
+    if backend == "gravar":
+        return ModeloGravador(modelo, abrir_gravacoes(arquivo), system_instruction)
+    return modelo
+
+
+# -----------------------------------------------
+# TESTE DE CARGA
+# -----------------------------------------------
+
+
+def _percentis(latencias):
+    ms = np.array(latencias) * 1000
+    if not len(ms):
+        return {"chamadas": 0}
+    return {
+        "chamadas": len(ms),
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p90_ms": float(np.percentile(ms, 90)),
+        "p99_ms": float(np.percentile(ms, 99)),
+        "max_ms": float(ms.max()),
+    }
+
+
+def simular_carga(sessoes=16, turnos=6, concorrencia=8, paginas=PAGINAS_LLM, sistema=None,
+                  fluxo=False, semente=0, **opcoes_modelo):
+    """
+    `sessoes` sessões simuladas, `concorrencia` de cada vez, fazem `turnos`
+    ações cada, alternando entre as `paginas`, contra o `ModeloReplay`. Cada
+    ação repete o caminho da página: montar o prompt, chamar o modelo (sob
+    `medir_llm`) e tratar a resposta. Com `fluxo`, Chatbot e explicação usam
+    stream=True e também medem o tempo até o primeiro pedaço.
+    Retorna latências por página (p50/p90/p99/máx, ms), vazão e, no Gerador,
+    [recuperados por `extrair_json`, total] por caso de JSON.
+    """
+    from motor_fuzzy import calcular_saida
+    from sistemas_sinteticos import sistema_grade
+
+    sistema = sistema or sistema_grade(3, 3)
+    modelo = ModeloReplay(semente=semente, **opcoes_modelo)
+    modelo_gerador = ModeloReplay(INSTRUCAO_GERADOR, semente=semente, **opcoes_modelo)
+    latencias = {p: [] for p in paginas}
+    primeiros = {p: [] for p in paginas}
+    casos = {}
+    trava = threading.Lock()
+
+    def chamar(pagina, prompt, t0):
+        with medir_llm(pagina):
+            if not fluxo:
+                return modelo.generate_content(prompt).text
+            resposta = modelo.generate_content(prompt, stream=True)
+            for _ in resposta:
+                with trava:
+                    primeiros[pagina].append(time.perf_counter() - t0)
+                break
+            return resposta.text
+
+    def sessao(k):
+        rng = np.random.default_rng([semente, k])
+        conversa = HistoricoConversa()
+        for t in range(turnos):
+            pagina = paginas[(k + t) % len(paginas)]
+            t0 = time.perf_counter()
+            if pagina == "chatbot":
+                pergunta = f"Pergunta {t} da sessão {k}: {rng.choice(_PERGUNTAS)}"
+                prompt, info = conversa.montar_contexto(pergunta)
+                texto = chamar(pagina, prompt, t0)
+                conversa.registrar(pergunta, texto, info["tokens_estimados"],
+                                   time.perf_counter() - t0)
+            elif pagina == "explicacao":
+                valores = {v: float(rng.uniform(*info["universo"]))
+                           for v, info in sistema["entradas"].items()}
+                resultados, regras_at = calcular_saida(sistema, valores)
+                chamar(pagina, prompt_explicacao(valores, regras_at, resultados), t0)
+            else:
+                tema = f"{rng.choice(_TEMAS)} ({k}.{t})"
+                with medir_llm(pagina):
+                    resposta = modelo_gerador.generate_content(prompt_gerador(tema))
+                    bruto = resposta.text.strip()
+                try:
+                    dados = json.loads(bruto)
+                except Exception:
+                    dados = extrair_json(bruto)
+                valido = isinstance(dados, dict) and all(c in dados for c in
+                                                         ("entradas", "saidas", "regras"))
+                with trava:
+                    contagem = casos.setdefault(resposta.caso_json, [0, 0])
+                    contagem[0] += valido
+                    contagem[1] += 1
+            with trava:
+                latencias[pagina].append(time.perf_counter() - t0)
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(concorrencia) as executor:
+        list(executor.map(sessao, range(sessoes)))
+    duracao = time.perf_counter() - t0
+
+    relatorio = {
+        "sessoes": sessoes,
+        "concorrencia": concorrencia,
+        "tempo_s": duracao,
+        "acoes_por_s": sessoes * turnos / duracao,
+        "paginas": {p: _percentis(v) for p, v in latencias.items()},
+        "json_gerador": casos,
+    }
+    if fluxo:
+        relatorio["primeiro_pedaco"] = {p: _percentis(v) for p, v in primeiros.items() if v}
+    return relatorio
+
+
+if __name__ == "__main__":
+    # python modelos.py [concorrencia ...] -> carga com 30% de JSON malformado e jitter de 50 ms
+    for concorrencia in map(int, sys.argv[1:] or ["1", "8", "32"]):
+        r = simular_carga(sessoes=max(concorrencia, 8), concorrencia=concorrencia,
+                          jitter_s=0.05, taxa_json_invalido=0.3, fluxo=True)
+        print(f"concorrência {concorrencia}: {r['acoes_por_s']:.1f} ações/s")
+        for pagina, p in r["paginas"].items():
+            texto = (f"  {pagina:10s} p50={p['p50_ms']:7.1f}ms p90={p['p90_ms']:7.1f}ms "
+                     f"p99={p['p99_ms']:7.1f}ms")
+            if pagina in r["primeiro_pedaco"]:
+                texto += f" | 1º pedaço p50={r['primeiro_pedaco'][pagina]['p50_ms']:.1f}ms"
+            print(texto)
+        print("  JSON do Gerador (recuperados/total): " + ", ".join(
+            f"{caso}={ok}/{total}" for caso, (ok, total) in sorted(r["json_gerador"].items())))
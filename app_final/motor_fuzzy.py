@@ -0,0 +1,655 @@
+import json
+import time
+import tracemalloc
+
+import numpy as np
+
+from acelerado import AvaliadorFundido, resolver_backend
+from defuzzificacao import (METODOS, METODOS_CONJUNTOS, centros_conjuntos,
+                            defuzzificar_conjuntos, defuzzificar_curvas)
+from metricas import DURACAO_ETAPA, INFERENCIAS
+from operadores import normalizar_ops, obter_tconorma, obter_tnorma
+
+# Número de pontos usados para amostrar os universos (mesmo valor do Simulador)
+RESOLUCAO = 400
+
+# -----------------------------------------------
+# FUNÇÕES FUZZY MANUAIS
+# -----------------------------------------------
+
+
+def trimf(x, params):
+    a, b, c = params
+    y = np.zeros_like(x)
+    mask1 = (a < x) & (x < b)
+    y[mask1] = (x[mask1] - a) / (b - a)
+    y[x == b] = 1.0
+    mask2 = (b < x) & (x < c)
+    y[mask2] = (c - x[mask2]) / (c - b)
+    return y
+
+
+def trapmf(x, params):
+    a, b, c, d = params
+    y = np.zeros_like(x)
+    y[(a < x) & (x < b)] = (x[(a < x) & (x < b)] - a) / (b - a)
+    y[(b <= x) & (x <= c)] = 1
+    y[(c < x) & (x < d)] = (d - x[(c < x) & (x < d)]) / (d - c)
+    return y
+
+
+def gaussmf(x, params):
+    sigma, mean = params
+    return np.exp(-((x - mean) ** 2) / (2 * sigma ** 2))
+
+
+def interp_membership(x, y, value):
+    return np.interp(value, x, y)
+
+
+def avaliar_mf(tipo, x, params):
+    if tipo == "trimf":
+        return trimf(x, params)
+    elif tipo == "trapmf":
+        return trapmf(x, params)
+    return gaussmf(x, params)
+
+
+def validate_mf_params(tipo, params):
+    """
+    Valida params (lista) para cada tipo:
+    - trimf: espera 3 params
+    - trapmf: espera 4 params
+    - gaussmf: espera 2 params (sigma, mean) ou (mean, sigma) dependendo do seu design
+    Retorna (True, "") se válido, caso contrário (False, mensagem_erro)
+    """
+    if not isinstance(params, (list, tuple)):
+        return False, "Parâmetros devem estar em forma de lista separados por vírgula."
+
+    try:
+        params_f = [float(p) for p in params]
+    except Exception:
+        return False, "Todos os parâmetros precisam ser numéricos."
+
+    if tipo == "trimf" and len(params_f) == 3:
+        a, b, c = params_f
+        if not (a <= b <= c):
+            return False, "Para trimf precisa valer: a <= b <= c."
+        return True, ""
+    if tipo == "trapmf" and len(params_f) == 4:
+        a, b, c, d = params_f
+        if not (a <= b <= c <= d):
+            return False, "Para trapmf precisa valer: a <= b <= c <= d."
+        return True, ""
+    if tipo == "gaussmf" and len(params_f) == 2:
+        sigma, mean = params_f
+        if sigma <= 0:
+            return False, "Para gaussmf o sigma deve ser > 0."
+        return True, ""
+    return False, f"Parâmetros incompatíveis para tipo '{tipo}'."
+
+
+# -----------------------------------------------
+# INFERÊNCIA (SEMÂNTICA DO SIMULADOR)
+# -----------------------------------------------
+
+
+def normalizar_defuzz(df):
+    metodo = df.lower().strip()
+    for nome in METODOS:
+        if metodo.startswith(nome):
+            return nome
+    return "centroid"
+
+
+def normalizar_agregacao(ag):
+    return "max" if ag.lower().strip().startswith("max") else "sum"
+
+
+def aplicar_and(a, b, op):
+    return float(obter_tnorma(op)(a, b))
+
+
+def aplicar_or(a, b, op):
+    return float(obter_tconorma(op)(a, b))
+
+
+def defuzzificar(xs, y, metodo):
+    """
+    Defuzzifica uma curva agregada. wtaver/height dependem das ativações
+    dos conjuntos e são tratados em `calcular_saida`.
+    """
+    metodo = normalizar_defuzz(metodo)
+    if metodo in METODOS_CONJUNTOS:
+        raise ValueError(f"'{metodo}' precisa das ativações dos conjuntos de saída.")
+    return float(defuzzificar_curvas(xs, np.asarray(y, dtype=float)[None, :], metodo)[0])
+
+
+def calcular_saida(sistema, valores, ops=None, ag="max", df="centroid"):
+    """
+    Avalia o sistema para um único conjunto de valores de entrada.
+    `ops`, `ag` e `df` aceitam os rótulos gravados pelo Editor Fuzzy.
+    Retorna ({saida: (valor, xs, agregada)}, [(regra, força), ...]).
+    """
+    t0 = time.perf_counter()
+    ops = normalizar_ops(ops)
+    tnorma, tconorma = obter_tnorma(ops["and"]), obter_tconorma(ops["or"])
+    metodo = normalizar_defuzz(df)
+    ag_op = normalizar_agregacao(ag)
+
+    agregadas = {}
+    # Altura de ativação de cada conjunto de saída (usada por wtaver/height)
+    ativacoes = {}
+
+    for saida in sistema["saidas"].keys():
+        agregadas[saida] = np.zeros(RESOLUCAO)
+        ativacoes[saida] = {}
+
+    regras_at = []
+
+    # ---------------------------------------------------
+    # PROCESSAMENTO DAS REGRAS
+    # ---------------------------------------------------
+    for regra in sistema["regras"]:
+
+        vals = []
+        for (var, conj) in regra["antecedentes"]:
+
+            entrada = sistema["entradas"][var]
+            tipo = entrada["conjuntos"][conj]["tipo"]
+            params = entrada["conjuntos"][conj]["params"]
+
+            umin, umax = entrada["universo"]
+            x = np.linspace(umin, umax, RESOLUCAO)
+            y = avaliar_mf(tipo, x, params)
+
+            vals.append(interp_membership(x, y, valores[var]))
+
+        operador = tnorma if regra["logica"] == "AND" else tconorma
+        força = float(operador.reduzir(vals))
+
+        regras_at.append((regra, força))
+
+        saida, conj_s = regra["consequente"]
+        tipo_s = sistema["saidas"][saida]["conjuntos"][conj_s]["tipo"]
+        params_s = sistema["saidas"][saida]["conjuntos"][conj_s]["params"]
+
+        umin, umax = sistema["saidas"][saida]["universo"]
+        xs = np.linspace(umin, umax, RESOLUCAO)
+        ys = avaliar_mf(tipo_s, xs, params_s)
+
+        # ---- Agregação ----
+        anterior = ativacoes[saida].get(conj_s, 0.0)
+        if ag_op == "max":
+            agregadas[saida] = np.fmax(agregadas[saida], np.fmin(força, ys))
+            ativacoes[saida][conj_s] = max(anterior, força)
+        else:  # Soma Limitada
+            agregadas[saida] = np.minimum(1, agregadas[saida] + np.fmin(força, ys))
+            ativacoes[saida][conj_s] = min(1, anterior + força)
+
+    # ---------------------------------------------------
+    # DEFUZZIFICAÇÃO
+    # ---------------------------------------------------
+    resultados = {}
+    for saida, yagg in agregadas.items():
+        umin, umax = sistema["saidas"][saida]["universo"]
+        xs = np.linspace(umin, umax, RESOLUCAO)
+
+        if metodo in METODOS_CONJUNTOS and not ativacoes[saida]:
+            # Nenhuma regra aponta para esta saída: 0, como no motor em lote
+            centroide = 0.0
+        elif metodo in METODOS_CONJUNTOS:
+            conjs = list(ativacoes[saida])
+            curvas = [avaliar_mf(sistema["saidas"][saida]["conjuntos"][c]["tipo"], xs,
+                                 sistema["saidas"][saida]["conjuntos"][c]["params"])
+                      for c in conjs]
+            centros, alturas = centros_conjuntos(xs, np.reshape(curvas, (len(conjs), -1)),
+                                                 metodo)
+            H = np.array([[ativacoes[saida][c] for c in conjs]])
+            centroide = float(defuzzificar_conjuntos(centros, alturas, H)[0])
+        else:
+            centroide = defuzzificar(xs, yagg, metodo)
+
+        resultados[saida] = (centroide, xs, yagg)
+
+    _ETAPA_UNITARIA.observar(time.perf_counter() - t0)
+    _INFERENCIAS_UNITARIAS.inc()
+    return resultados, regras_at
+
+
+def carregar_sistema(dados):
+    """
+    Aceita o JSON do Gerador/Editor (dict, texto JSON ou caminho de arquivo)
+    e devolve o `sistema` com regras no formato de tuplas usado pelo motor.
+    """
+    if isinstance(dados, str):
+        if dados.lstrip().startswith("{"):
+            dados = json.loads(dados)
+        else:
+            with open(dados, encoding="utf-8") as f:
+                dados = json.load(f)
+    for chave in ("entradas", "saidas", "regras"):
+        if chave not in dados:
+            raise ValueError(f"JSON inválido: falta a chave '{chave}'.")
+    return {
+        "entradas": dados["entradas"],
+        "saidas": dados["saidas"],
+        "regras": [
+            {"antecedentes": [(a[0], a[1]) for a in r["antecedentes"]],
+             "consequente": (r["consequente"][0], r["consequente"][1]),
+             "logica": r.get("logica", "AND")}
+            for r in dados["regras"]
+        ],
+    }
+
+
+# -----------------------------------------------
+# AVALIAÇÃO EM LOTE (VETORIZADA)
+# -----------------------------------------------
+
+# Métricas já rotuladas: no laço só resta o `observar`
+_ETAPA_UNITARIA = DURACAO_ETAPA.rotulos("calcular_saida")
+_ETAPA_GRAUS = DURACAO_ETAPA.rotulos("graus")
+_ETAPA_FORCAS = DURACAO_ETAPA.rotulos("forcas")
+_ETAPA_AGREGAR = DURACAO_ETAPA.rotulos("agregar")
+_ETAPA_DEFUZZ = DURACAO_ETAPA.rotulos("defuzzificar")
+_ETAPA_FUNDIDO = DURACAO_ETAPA.rotulos("fundido")
+_INFERENCIAS_UNITARIAS = INFERENCIAS.rotulos("unitario")
+_INFERENCIAS_LOTE = INFERENCIAS.rotulos("lote")
+
+
+def como_matriz(dados, nomes):
+    """
+    Aceita um dict {variavel: array} ou uma matriz (N, len(nomes)) com as
+    colunas na ordem de `nomes` e devolve sempre a matriz.
+    """
+    if isinstance(dados, dict):
+        return np.column_stack([np.atleast_1d(np.asarray(dados[n], dtype=float))
+                                for n in nomes])
+    M = np.asarray(dados, dtype=float)
+    if M.ndim == 1:
+        M = M[:, None] if len(nomes) == 1 else M[None, :]
+    return M
+
+
+class SistemaCompilado:
+    """
+    Versão pré-calculada de um `sistema` para avaliar muitas amostras de uma vez.
+    Segue a mesma semântica de `calcular_saida`: pertinências amostradas no
+    universo e interpoladas, operadores AND/OR, agregação e defuzzificação.
+    `dtype` (float64 ou float32) vale para curvas, forças e resultados;
+    `memoria_max_mb` limita a memória de trabalho de cada bloco do lote.
+    `backend` escolhe o caminho de `avaliar` (ver `acelerado.resolver_backend`):
+    "numpy" por etapas ou "numba" com as etapas fundidas num só kernel.
+    """
+
+    def __init__(self, sistema, ops=None, ag="max", df="centroid", resolucao=RESOLUCAO,
+                 dtype=np.float64, memoria_max_mb=None, backend=None):
+        self.backend = resolver_backend(backend)
+        self._fundido = None
+        self.dtype = np.dtype(dtype)
+        if self.dtype not in (np.float32, np.float64):
+            raise ValueError(f"dtype deve ser float32 ou float64, não {self.dtype}.")
+        self.memoria_max_mb = memoria_max_mb
+        ops = normalizar_ops(ops)
+        self.tnorma = obter_tnorma(ops["and"])
+        self.tconorma = obter_tconorma(ops["or"])
+        self.op_and, self.op_or = self.tnorma.chave, self.tconorma.chave
+        self.agregacao = normalizar_agregacao(ag)
+        self.defuzz = normalizar_defuzz(df)
+        self.resolucao = resolucao
+
+        self.entradas = list(sistema["entradas"].keys())
+        self.saidas = list(sistema["saidas"].keys())
+
+        self.x_entradas = {}
+        for nome, info in sistema["entradas"].items():
+            umin, umax = info["universo"]
+            self.x_entradas[nome] = np.linspace(umin, umax, resolucao)
+
+        self.x_saidas = {}
+        for nome, info in sistema["saidas"].items():
+            umin, umax = info["universo"]
+            self.x_saidas[nome] = np.linspace(umin, umax, resolucao)
+
+        # Termos (variável, conjunto) usados nos antecedentes, sem repetição
+        self.termos = []
+        indice_termo = {}
+        # Conjuntos de saída usados nos consequentes, por saída
+        self.conjuntos_saida = {nome: [] for nome in self.saidas}
+        indice_conj = {}
+
+        # Cada regra vira (índices dos termos, é AND?, saída, índice do conjunto)
+        self.regras = []
+        for regra in sistema["regras"]:
+            idx = []
+            for (var, conj) in regra["antecedentes"]:
+                chave = (var, conj)
+                if chave not in indice_termo:
+                    indice_termo[chave] = len(self.termos)
+                    self.termos.append(chave)
+                idx.append(indice_termo[chave])
+
+            saida, conj_s = regra["consequente"]
+            chave_s = (saida, conj_s)
+            if chave_s not in indice_conj:
+                indice_conj[chave_s] = len(self.conjuntos_saida[saida])
+                self.conjuntos_saida[saida].append(conj_s)
+
+            self.regras.append((
+                np.array(idx, dtype=int),
+                regra["logica"] == "AND",
+                saida,
+                indice_conj[chave_s],
+            ))
+
+        self.coluna_termo = np.array(
+            [self.entradas.index(var) for var, _ in self.termos], dtype=int)
+        self.curvas_termos = []
+        for var, conj in self.termos:
+            info = sistema["entradas"][var]["conjuntos"][conj]
+            self.curvas_termos.append(
+                avaliar_mf(info["tipo"], self.x_entradas[var], info["params"]))
+
+        self.curvas_saida = {}
+        for saida, conjs in self.conjuntos_saida.items():
+            xs = self.x_saidas[saida]
+            curvas = [avaliar_mf(sistema["saidas"][saida]["conjuntos"][c]["tipo"],
+                                 xs, sistema["saidas"][saida]["conjuntos"][c]["params"])
+                      for c in conjs]
+            self.curvas_saida[saida] = (np.array(curvas, dtype=self.dtype) if curvas
+                                        else np.zeros((0, resolucao), dtype=self.dtype))
+        # Universos das saídas no dtype do cálculo (evita promover as curvas a float64)
+        self.x_calculo = {s: xs.astype(self.dtype) for s, xs in self.x_saidas.items()}
+
+        # wtaver/height: centro e altura de cada conjunto, calculados uma vez
+        self.centros_saida = {}
+        if self.defuzz in METODOS_CONJUNTOS:
+            for saida, curvas in self.curvas_saida.items():
+                self.centros_saida[saida] = centros_conjuntos(
+                    self.x_calculo[saida], curvas, self.defuzz)
+
+    def matriz_entradas(self, dados):
+        return como_matriz(dados, self.entradas)
+
+    def graus(self, X):
+        """Pertinência de cada amostra em cada termo: matriz (N, termos)."""
+        G = np.empty((X.shape[0], len(self.termos)), dtype=self.dtype)
+        for t, (var, _) in enumerate(self.termos):
+            G[:, t] = np.interp(X[:, self.coluna_termo[t]],
+                                self.x_entradas[var], self.curvas_termos[t])
+        return G
+
+    def forcas(self, G):
+        """Força de disparo de cada regra: matriz (N, regras)."""
+        F = np.empty((G.shape[0], len(self.regras)), dtype=self.dtype)
+        for r, (idx, eh_and, _, _) in enumerate(self.regras):
+            operador = self.tnorma if eh_and else self.tconorma
+            F[:, r] = operador.reduzir(G[:, idx], 1)
+        return F
+
+    def ativacoes(self, F, saida):
+        """Altura de ativação de cada conjunto da saída: (N, conjuntos)."""
+        fk = np.zeros((F.shape[0], len(self.curvas_saida[saida])), dtype=self.dtype)
+        for r, (_, _, s, k) in enumerate(self.regras):
+            if s == saida:
+                if self.agregacao == "max":
+                    np.fmax(fk[:, k], F[:, r], out=fk[:, k])
+                else:
+                    fk[:, k] += F[:, r]
+        if self.agregacao != "max":
+            np.minimum(fk, 1, out=fk)
+        return fk
+
+    def agregar(self, F):
+        """Curvas agregadas por saída: {saida: (N, resolucao)}."""
+        n = F.shape[0]
+        agregadas = {}
+        for saida in self.saidas:
+            curvas = self.curvas_saida[saida]
+            agg = np.zeros((n, self.resolucao), dtype=self.dtype)
+            if self.agregacao == "max":
+                # fmax_r fmin(f_r, y_k) == fmin(max_{r->k} f_r, y_k) para o mesmo conjunto k
+                fk = self.ativacoes(F, saida)
+                for k in range(len(curvas)):
+                    np.fmax(agg, np.fmin(fk[:, k, None], curvas[k]), out=agg)
+            else:
+                for r, (_, _, s, k) in enumerate(self.regras):
+                    if s == saida:
+                        agg += np.fmin(F[:, r, None], curvas[k])
+                np.minimum(agg, 1, out=agg)
+            agregadas[saida] = agg
+        return agregadas
+
+    def defuzzificar(self, xs, agg):
+        """Defuzzifica um lote de curvas agregadas (N, resolucao)."""
+        return defuzzificar_curvas(xs, agg, self.defuzz)
+
+    def defuzzificar_conjuntos(self, F):
+        """wtaver/height direto das forças, sem montar as curvas agregadas."""
+        return {saida: defuzzificar_conjuntos(*self.centros_saida[saida],
+                                              self.ativacoes(F, saida))
+                for saida in self.saidas}
+
+    def bytes_por_linha(self):
+        """
+        Memória de trabalho estimada por amostra de um bloco: graus, forças,
+        ativações e, fora do caminho rápido, as curvas agregadas de todas as
+        saídas mais dois temporários (N, resolucao) e uma máscara booleana.
+        """
+        item = self.dtype.itemsize
+        k_max = max((len(c) for c in self.curvas_saida.values()), default=0)
+        total = len(self.termos) + len(self.regras) + 2 * k_max
+        if not self.centros_saida:
+            total += self.resolucao * (len(self.saidas) + 2)
+        extra = self.resolucao
+        if self.defuzz == "bisector":
+            extra += (8 - item) * self.resolucao  # soma acumulada sempre em float64
+        return item * total + extra
+
+    def tamanho_bloco(self, tamanho_bloco=4096, memoria_max_mb=None):
+        """`tamanho_bloco`, reduzido para caber em `memoria_max_mb` (ou no limite da instância)."""
+        memoria_max_mb = memoria_max_mb if memoria_max_mb is not None else self.memoria_max_mb
+        if memoria_max_mb is None:
+            return tamanho_bloco
+        return max(1, min(tamanho_bloco, int(memoria_max_mb * 2 ** 20 // self.bytes_por_linha())))
+
+    def avaliar(self, dados, tamanho_bloco=4096, memoria_max_mb=None):
+        """
+        Avalia N amostras em blocos de `tamanho_bloco` linhas (limita a memória
+        das curvas agregadas). Com `memoria_max_mb`, o bloco é reduzido para
+        que a memória de trabalho fique abaixo do limite. Retorna {saida: array (N,)}.
+        """
+        X = self.matriz_entradas(dados)
+        n = X.shape[0]
+        if self.backend == "numba":
+            return self._avaliar_fundido(X)
+        tamanho_bloco = self.tamanho_bloco(tamanho_bloco, memoria_max_mb)
+        resultados = {saida: np.zeros(n, dtype=self.dtype) for saida in self.saidas}
+        for inicio in range(0, n, tamanho_bloco):
+            bloco = X[inicio:inicio + tamanho_bloco]
+            t0 = time.perf_counter()
+            G = self.graus(bloco)
+            t1 = time.perf_counter()
+            F = self.forcas(G)
+            t2 = time.perf_counter()
+            if self.centros_saida:
+                # Caminho rápido: a etapa de agregação não existe
+                t3 = t2
+                valores = self.defuzzificar_conjuntos(F)
+            else:
+                agregadas = self.agregar(F)
+                t3 = time.perf_counter()
+                valores = {saida: self.defuzzificar(self.x_calculo[saida], agg)
+                           for saida, agg in agregadas.items()}
+            for saida, v in valores.items():
+                resultados[saida][inicio:inicio + len(bloco)] = v
+            t4 = time.perf_counter()
+            _ETAPA_GRAUS.observar(t1 - t0)
+            _ETAPA_FORCAS.observar(t2 - t1)
+            if not self.centros_saida:
+                _ETAPA_AGREGAR.observar(t3 - t2)
+            _ETAPA_DEFUZZ.observar(t4 - t3)
+        _INFERENCIAS_LOTE.inc(n)
+        return resultados
+
+    def _avaliar_fundido(self, X):
+        # Empacotado só na primeira chamada: as curvas ainda podem ser
+        # ajustadas depois do construtor (ex.: tipo2)
+        if self._fundido is None:
+            self._fundido = AvaliadorFundido(self)
+        t0 = time.perf_counter()
+        valores = self._fundido.avaliar(X)
+        _ETAPA_FUNDIDO.observar(time.perf_counter() - t0)
+        _INFERENCIAS_LOTE.inc(X.shape[0])
+        return {saida: v.astype(self.dtype, copy=False) for saida, v in valores.items()}
+
+
+def compilar_sistema(sistema, ops=None, ag="max", df="centroid", resolucao=RESOLUCAO,
+                     dtype=np.float64, memoria_max_mb=None, backend=None):
+    return SistemaCompilado(sistema, ops, ag, df, resolucao, dtype, memoria_max_mb, backend)
+
+
+def avaliar_lote(sistema, dados, ops=None, ag="max", df="centroid", tamanho_bloco=4096,
+                 dtype=np.float64, memoria_max_mb=None, backend=None):
+    """
+    Atalho: compila o sistema e avalia um lote de entradas.
+    """
+    compilado = compilar_sistema(sistema, ops, ag, df, dtype=dtype,
+                                 memoria_max_mb=memoria_max_mb, backend=backend)
+    return compilado.avaliar(dados, tamanho_bloco)
+
+
+# -----------------------------------------------
+# TABELA DE CONSULTA (LUT)
+# -----------------------------------------------
+
+
+class TabelaConsulta:
+    """
+    Saídas do sistema pré-calculadas numa grade regular das entradas e
+    interpoladas (multilinear) na consulta. Troca a inferência completa por
+    algumas leituras de tabela: é o caminho rápido para laços de controle.
+    """
+
+    def __init__(self, compilado, pontos=201, max_celulas=1_000_000, tamanho_bloco=4096):
+        self.entradas = compilado.entradas
+        self.saidas = compilado.saidas
+        d = max(len(self.entradas), 1)
+        pontos = max(2, min(pontos, int(max_celulas ** (1 / d))))
+        self.eixos = [np.linspace(compilado.x_entradas[v][0], compilado.x_entradas[v][-1], pontos)
+                      for v in self.entradas]
+
+        self.dtype = compilado.dtype
+        forma = tuple(len(e) for e in self.eixos)
+        total = int(np.prod(forma))
+        tabelas = {s: np.empty(total, dtype=self.dtype) for s in self.saidas}
+        # A grade é gerada bloco a bloco: nunca existe a matriz (células, entradas) inteira
+        tamanho_bloco = compilado.tamanho_bloco(tamanho_bloco)
+        for inicio in range(0, total, tamanho_bloco):
+            indices = np.unravel_index(np.arange(inicio, min(inicio + tamanho_bloco, total)), forma)
+            X = np.column_stack([eixo[i] for eixo, i in zip(self.eixos, indices)])
+            for s, v in compilado.avaliar(X, tamanho_bloco).items():
+                tabelas[s][inicio:inicio + len(v)] = v
+        self.tabelas = {s: v.reshape(forma) for s, v in tabelas.items()}
+
+    def avaliar(self, dados):
+        X = como_matriz(dados, self.entradas)
+        if len(self.eixos) == 1:
+            eixo = self.eixos[0]
+            return {s: np.interp(X[:, 0], eixo, t).astype(self.dtype, copy=False)
+                    for s, t in self.tabelas.items()}
+
+        # Índice da célula e posição relativa dentro dela, por dimensão
+        idx, frac = [], []
+        for j, eixo in enumerate(self.eixos):
+            passo = eixo[1] - eixo[0]
+            pos = (np.clip(X[:, j], eixo[0], eixo[-1]) - eixo[0]) / passo if passo > 0 else np.zeros(len(X))
+            i0 = np.clip(np.floor(pos).astype(int), 0, len(eixo) - 2)
+            idx.append(i0)
+            frac.append((pos - i0).astype(self.dtype, copy=False))
+
+        resultados = {s: np.zeros(len(X), dtype=self.dtype) for s in self.saidas}
+        for canto in range(2 ** len(self.eixos)):
+            peso = np.ones(len(X), dtype=self.dtype)
+            indices = []
+            for j in range(len(self.eixos)):
+                if canto >> j & 1:
+                    peso = peso * frac[j]
+                    indices.append(idx[j] + 1)
+                else:
+                    peso = peso * (1 - frac[j])
+                    indices.append(idx[j])
+            for s, t in self.tabelas.items():
+                resultados[s] += peso * t[tuple(indices)]
+        return resultados
+
+
+def compilar_tabela(sistema, ops=None, ag="max", df="centroid", pontos=201,
+                    dtype=np.float64, memoria_max_mb=None, backend=None):
+    compilado = compilar_sistema(sistema, ops, ag, df, dtype=dtype, memoria_max_mb=memoria_max_mb,
+                                 backend=backend)
+    return TabelaConsulta(compilado, pontos)
+
+
+# -----------------------------------------------
+# PRECISÃO REDUZIDA (FLOAT32)
+# -----------------------------------------------
+
+
+def _medir_pico(funcao):
+    tracemalloc.start()
+    try:
+        t0 = time.perf_counter()
+        resultado = funcao()
+        duracao = time.perf_counter() - t0
+        pico = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return resultado, duracao, pico
+
+
+def comparar_precisao(sistema, ops=None, ag="max", df="centroid", n=100_000, pontos=101,
+                      memoria_max_mb=None, semente=0):
+    """
+    Lote e LUT em float32 contra float64 nas mesmas `n` amostras: erro
+    máximo (absoluto e relativo à largura do universo de cada saída), pico
+    de memória (tracemalloc) e tempo. Os tempos incluem o custo do
+    tracemalloc; compare-os só entre si.
+    """
+    sistema = carregar_sistema(sistema)
+    rng = np.random.default_rng(semente)
+    X = np.column_stack([rng.uniform(*map(float, info["universo"]), n)
+                         for info in sistema["entradas"].values()])
+    larguras = {s: float(info["universo"][1]) - float(info["universo"][0])
+                for s, info in sistema["saidas"].items()}
+
+    relatorio = {}
+    for tipo in ("lote", "lut"):
+        medidas = {}
+        for dtype in (np.float64, np.float32):
+            if tipo == "lote":
+                compilado = compilar_sistema(sistema, ops, ag, df, dtype=dtype)
+                saidas, duracao, pico = _medir_pico(
+                    lambda: compilado.avaliar(X, memoria_max_mb=memoria_max_mb))
+                memoria = 0
+            else:
+                tabela, _, pico = _medir_pico(lambda: compilar_tabela(
+                    sistema, ops, ag, df, pontos, dtype, memoria_max_mb))
+                saidas, duracao, _ = _medir_pico(lambda: tabela.avaliar(X))
+                memoria = sum(t.nbytes for t in tabela.tabelas.values())
+            medidas[np.dtype(dtype).name] = (saidas, duracao, pico, memoria)
+
+        ref, t64, pico64, mem64 = medidas["float64"]
+        aprox, t32, pico32, mem32 = medidas["float32"]
+        erro = {s: float(np.max(np.abs(aprox[s].astype(np.float64) - ref[s]))) for s in ref}
+        relatorio[tipo] = {
+            "erro_maximo": erro,
+            "erro_relativo": {s: e / larguras[s] if larguras[s] else e for s, e in erro.items()},
+            # lote: pico da avaliação; lut: pico da construção da tabela
+            "pico_mb": {"float64": pico64 / 2 ** 20, "float32": pico32 / 2 ** 20},
+            "tempo_s": {"float64": t64, "float32": t32},
+        }
+        if tipo == "lut":
+            relatorio[tipo]["tabelas_mb"] = {"float64": mem64 / 2 ** 20, "float32": mem32 / 2 ** 20}
+    return relatorio
@@ -0,0 +1,224 @@
+import json
+import time
+from types import SimpleNamespace
+
+from conversa import estimar_tokens
+
+# -----------------------------------------------
+# PROMPTS COMPACTOS PARA O MODELO DE LINGUAGEM
+# -----------------------------------------------
+#
+# - Explicação do Simulador: em vez do `repr` de cada regra (inclusive as
+#   que não dispararam), só as regras ativas, em forma linguística curta
+#   ("R3 SE temperatura é quente E umidade é alta ENTÃO ventilador é forte
+#   0.62"), ordenadas pela força, com valores arredondados. A saída é
+#   determinística: o mesmo estado gera o mesmo texto.
+# - Gerador: o esquema do JSON é fixo e vira a instrução de sistema do
+#   modelo (`INSTRUCAO_GERADOR`), montada uma única vez. Cada chamada manda
+#   só o tema, e o prefixo idêntico em todas as chamadas pode ser
+#   reaproveitado pelo cache de prefixo do provedor.
+
+CASAS = 2
+MAX_REGRAS = 15
+
+INSTRUCAO_EXPLICACAO = "Explique a um estudante o comportamento deste sistema fuzzy."
+
+INSTRUCAO_GERADOR = """Responda APENAS com um JSON válido, sem nenhum texto fora dele:
+{"entradas":{"<variavel>":{"universo":[min,max],"conjuntos":{"<conjunto>":{"tipo":"trimf|trapmf|gaussmf","params":[números]}}}},
+"saidas":{<mesmo formato de entradas>},
+"regras":[{"antecedentes":[["<entrada>","<conjunto>"],...],"consequente":["<saida>","<conjunto>"],"logica":"AND|OR"}],
+"explicacao":"<texto explicativo>"}
+Restrições:
+- tipos só trimf (3 params), trapmf (4) ou gaussmf (2: sigma, média);
+- sem chaves numéricas, listas de pontos (x,y) ou índices;
+- 2–3 entradas e 1–2 saídas."""
+
+
+def formatar_numero(v, casas=CASAS):
+    # + 0.0 transforma -0.0 em 0.0
+    return format(round(float(v), casas) + 0.0, "g")
+
+
+def texto_regra(regra):
+    conector = " E " if regra["logica"] == "AND" else " OU "
+    antecedentes = conector.join(f"{var} é {conj}" for var, conj in regra["antecedentes"])
+    saida, conj = regra["consequente"]
+    return f"SE {antecedentes} ENTÃO {saida} é {conj}"
+
+
+def prompt_explicacao(valores, regras_at, resultados, casas=CASAS, max_regras=MAX_REGRAS):
+    """
+    Prompt da explicação a partir da saída de `calcular_saida`: entradas,
+    até `max_regras` regras ativas (as mais fortes) e resultados.
+    """
+    limiar = 0.5 * 10 ** -casas  # abaixo disso a força arredondada é 0
+    ativas = sorted(((forca, i) for i, (_, forca) in enumerate(regras_at) if forca >= limiar),
+                    key=lambda t: (-t[0], t[1]))
+    linhas = [INSTRUCAO_EXPLICACAO,
+              "Entradas: " + ", ".join(f"{v}={formatar_numero(x, casas)}"
+                                       for v, x in valores.items()),
+              "Regras ativas (força):" if ativas else "Regras ativas: nenhuma."]
+    for forca, i in ativas[:max_regras]:
+        linhas.append(f"R{i + 1} {texto_regra(regras_at[i][0])} {formatar_numero(forca, casas)}")
+    omitidas = []
+    if len(ativas) > max_regras:
+        omitidas.append(f"{len(ativas) - max_regras} ativas mais fracas")
+    if len(regras_at) > len(ativas):
+        omitidas.append(f"{len(regras_at) - len(ativas)} com força 0")
+    if omitidas:
+        linhas.append("Regras omitidas: " + "; ".join(omitidas) + ".")
+    linhas.append("Saídas: " + ", ".join(f"{s}={formatar_numero(r[0], casas)}"
+                                         for s, r in resultados.items()))
+    return "\n".join(linhas)
+
+
+def prompt_gerador(tema):
+    """Parte variável do pedido ao Gerador (o esquema vai em `INSTRUCAO_GERADOR`)."""
+    return f'Gere um sistema fuzzy com tema: "{tema.strip()}"'
+
+
+# -----------------------------------------------
+# MODELO FALSO E MEDIÇÃO
+# -----------------------------------------------
+
+
+class ModeloFalso:
+    """
+    Imita `GenerativeModel.generate_content` localmente, sem rede. A
+    latência é um modelo simples de custo: fixa + por token de prompt,
+    com os tokens de uma instrução de sistema já vista cobrados a
+    `fator_cache` (cache de prefixo) + por token de resposta.
+    """
+
+    def __init__(self, system_instruction=None, latencia_fixa_s=0.02, s_por_token=5e-5,
+                 fator_cache=0.25, s_por_token_resposta=1e-4, resposta="ok"):
+        self.system_instruction = system_instruction
+        self.latencia_fixa_s = latencia_fixa_s
+        self.s_por_token = s_por_token
+        self.fator_cache = fator_cache
+        self.s_por_token_resposta = s_por_token_resposta
+        self.resposta = resposta
+        self._prefixos_vistos = set()
+
+    def custo(self, conteudo, resposta):
+        """(segundos, tokens do prompt, tokens em cache) de uma chamada."""
+        tokens_prefixo = estimar_tokens(self.system_instruction or "")
+        tokens_conteudo = estimar_tokens(conteudo)
+        em_cache = tokens_prefixo if self.system_instruction in self._prefixos_vistos else 0
+        if self.system_instruction:
+            self._prefixos_vistos.add(self.system_instruction)
+        segundos = (self.latencia_fixa_s
+                    + self.s_por_token * (tokens_conteudo + tokens_prefixo - em_cache)
+                    + self.s_por_token * self.fator_cache * em_cache
+                    + self.s_por_token_resposta * estimar_tokens(resposta))
+        return segundos, tokens_prefixo + tokens_conteudo, em_cache
+
+    def generate_content(self, conteudo):
+        segundos, tokens, em_cache = self.custo(conteudo, self.resposta)
+        time.sleep(segundos)
+        return SimpleNamespace(text=self.resposta, usage_metadata=SimpleNamespace(
+            prompt_token_count=tokens, cached_content_token_count=em_cache))
+
+
+def _explicacao_original(valores, regras_at, resultados):
+    # Formato anterior do Simulador, mantido só para comparação
+    return f"""
+        Explique o comportamento do sistema fuzzy.
+        Entradas: {valores}
+        Regras acionadas: {[ (r[0], round(r[1],3)) for r in regras_at ]}
+        Resultados: {[ (s, round(v[0],3)) for s,v in resultados.items() ]}
+        """
+
+
+def _gerador_original(tema):
+    # Formato anterior do Gerador, mantido só para comparação
+    return f"""
+        Gere APENAS um JSON VÁLIDO seguindo estritamente este formato:
+
+        {{
+        "entradas": {{
+            "variavel": {{
+                "universo": [min, max],
+                "conjuntos": {{
+                    "nome": {{"tipo": "trimf"|"trapmf"|"gaussmf", "params": [números]}}
+                }}
+            }}
+        }},
+        "saidas": {{
+            "variavel": {{
+                "universo": [min, max],
+                "conjuntos": {{
+                    "nome": {{"tipo": "trimf"|"trapmf"|"gaussmf", "params": [números]}}
+                }}
+            }}
+        }},
+        "regras": [
+            {{
+                "antecedentes": [["entrada", "conjunto"], ["entrada2", "conjunto2"]],
+                "consequente": ["saida", "conjunto"],
+                "logica": "AND"
+            }}
+        ],
+        "explicacao": "texto explicativo"
+        }}
+
+        REGRAS E RESTRIÇÕES IMPORTANTES:
+        - NÃO gere chaves numéricas (ex: "0": {{...}}).
+        - NÃO gere listas de pares (x,y).
+        - NÃO gere membership functions como listas de pontos.
+        - NÃO gere arrays com índice (ex: 0:, 1: ...).
+        - Gere apenas trimf, trapmf ou gaussmf.
+        - NÃO escreva NADA fora do JSON.
+        - Gere no máximo 2–3 entradas e 1–2 saídas.
+
+        Gere um sistema fuzzy com tema: "{tema}"
+        """
+
+
+def _medir(modelo, prompts):
+    tokens, em_cache, latencias = [], [], []
+    for p in prompts:
+        t0 = time.perf_counter()
+        resp = modelo.generate_content(p)
+        latencias.append(time.perf_counter() - t0)
+        tokens.append(resp.usage_metadata.prompt_token_count)
+        em_cache.append(resp.usage_metadata.cached_content_token_count)
+    return {"tokens_medio": sum(tokens) / len(tokens),
+            "tokens_em_cache_medio": sum(em_cache) / len(em_cache),
+            "latencia_media_s": sum(latencias) / len(latencias)}
+
+
+def comparar_prompts(sistema=None, n=20, semente=0, **custos):
+    """
+    Tokens e latência (no `ModeloFalso`) dos prompts antigos e compactos,
+    para a explicação (n estados aleatórios do sistema) e o Gerador (n temas).
+    """
+    import numpy as np
+    from motor_fuzzy import calcular_saida
+    from sistemas_sinteticos import sistema_grade
+
+    sistema = sistema or sistema_grade(3, 5)
+    rng = np.random.default_rng(semente)
+    estados = []
+    for _ in range(n):
+        valores = {v: float(rng.uniform(*info["universo"]))
+                   for v, info in sistema["entradas"].items()}
+        resultados, regras_at = calcular_saida(sistema, valores)
+        estados.append((valores, regras_at, resultados))
+    temas = [f"tema {k}: irrigação de estufa" for k in range(n)]
+
+    return {
+        "explicacao": {
+            "antes": _medir(ModeloFalso(**custos), [_explicacao_original(*e) for e in estados]),
+            "depois": _medir(ModeloFalso(**custos), [prompt_explicacao(*e) for e in estados]),
+        },
+        "gerador": {
+            "antes": _medir(ModeloFalso(**custos), [_gerador_original(t) for t in temas]),
+            "depois": _medir(ModeloFalso(INSTRUCAO_GERADOR, **custos),
+                             [prompt_gerador(t) for t in temas]),
+        },
+    }
+
+
+if __name__ == "__main__":
+    print(json.dumps(comparar_prompts(), indent=2, ensure_ascii=False))
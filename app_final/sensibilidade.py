@@ -0,0 +1,189 @@
+import time
+
+import numpy as np
+
+from motor_fuzzy import compilar_sistema
+
+# -----------------------------------------------
+# MONTE CARLO: INCERTEZA E SENSIBILIDADE (SOBOL)
+# -----------------------------------------------
+#
+# As entradas recebem distribuições (ex.: ruído do sensor de temperatura) e
+# são propagadas pelo avaliador em lote. Tudo é acumulado bloco a bloco, então
+# a memória depende de `tamanho_bloco` e não do número total de amostras.
+#
+# Índices de Sobol pelo esquema de Saltelli: matrizes A e B e, para cada
+# entrada i, A com a coluna i trocada pela de B (AB_i). Estimadores:
+#   S1_i = mean(f(B) * (f(AB_i) - f(A))) / V        (Saltelli 2010)
+#   ST_i = mean((f(A) - f(AB_i)) ** 2) / (2 V)       (Jansen)
+
+
+def amostrar(info, var_info, n, rng):
+    """
+    Sorteia n valores de uma entrada. `info` é um dict com "tipo":
+    - {"tipo": "normal", "media": m, "desvio": s}
+    - {"tipo": "uniforme", "min": a, "max": b}
+    - {"tipo": "triangular", "min": a, "moda": c, "max": b}
+    - {"tipo": "fixo", "valor": v}
+    Sem distribuição (None), usa uniforme em todo o universo.
+    Os valores são limitados ao universo da variável.
+    """
+    umin, umax = (float(v) for v in var_info["universo"])
+    if info is None:
+        x = rng.uniform(umin, umax, n)
+    elif info["tipo"] == "normal":
+        x = rng.normal(info["media"], info["desvio"], n)
+    elif info["tipo"] == "uniforme":
+        x = rng.uniform(info["min"], info["max"], n)
+    elif info["tipo"] == "triangular":
+        x = rng.triangular(info["min"], info["moda"], info["max"], n)
+    elif info["tipo"] == "fixo":
+        x = np.full(n, float(info["valor"]))
+    else:
+        raise ValueError(f"Distribuição desconhecida: {info['tipo']}")
+    return np.clip(x, umin, umax)
+
+
+def amostrar_entradas(sistema, distribuicoes, n, rng):
+    """Matriz (n, n_entradas) na ordem de sistema["entradas"]."""
+    distribuicoes = distribuicoes or {}
+    return np.column_stack([
+        amostrar(distribuicoes.get(var), info, n, rng)
+        for var, info in sistema["entradas"].items()
+    ])
+
+
+def _percentis_histograma(contagens, bordas, ps):
+    acum = np.cumsum(contagens) / max(contagens.sum(), 1)
+    return {p: float(np.interp(p / 100, np.concatenate([[0], acum]), bordas))
+            for p in ps}
+
+
+def analisar_incerteza(sistema, distribuicoes=None, n=100_000, ops=None, ag="max",
+                       df="centroid", sobol=True, tamanho_bloco=8192, bins=50,
+                       pontos_convergencia=8, semente=0):
+    """
+    Propaga as distribuições das entradas pelo sistema e devolve, por saída,
+    média, desvio, percentis, histograma e (se `sobol`) os índices S1/ST de
+    cada entrada com intervalo de ~95% estimado pelas médias dos blocos.
+
+    `relatorio["convergencia"]` traz as estimativas acumuladas em
+    `pontos_convergencia` tamanhos de amostra crescentes.
+    """
+    rng = np.random.default_rng(semente)
+    compilado = compilar_sistema(sistema, ops, ag, df)
+    entradas = compilado.entradas
+    saidas = compilado.saidas
+    k = len(entradas)
+
+    bordas = {s: np.linspace(*map(float, sistema["saidas"][s]["universo"]), bins + 1)
+              for s in saidas}
+    contagens = {s: np.zeros(bins, dtype=np.int64) for s in saidas}
+    # Valores deslocados pela média do 1º bloco: evita cancelamento numérico
+    referencia = {}
+    soma = {s: 0.0 for s in saidas}
+    soma2 = {s: 0.0 for s in saidas}
+    s1_num = {s: np.zeros(k) for s in saidas}
+    st_num = {s: np.zeros(k) for s in saidas}
+    blocos = []  # estimativas de cada bloco, para os intervalos
+    convergencia = []
+    marcas = set(np.unique(np.geomspace(
+        min(tamanho_bloco, n), n, pontos_convergencia).astype(int)))
+
+    feitas = 0
+    avaliacoes = 0
+    t0 = time.perf_counter()
+
+    def estimar(feitas_, n_valores):
+        est = {}
+        for s in saidas:
+            media = soma[s] / n_valores
+            var = max(soma2[s] / n_valores - media ** 2, 0.0)
+            est[s] = {"media": media + referencia[s], "variancia": var}
+            if sobol:
+                est[s]["S1"] = s1_num[s] / feitas_ / var if var > 0 else np.zeros(k)
+                est[s]["ST"] = st_num[s] / feitas_ / (2 * var) if var > 0 else np.zeros(k)
+        return est
+
+    while feitas < n:
+        m = min(tamanho_bloco, n - feitas)
+        A = amostrar_entradas(sistema, distribuicoes, m, rng)
+        fA = compilado.avaliar(A, tamanho_bloco)
+        avaliacoes += m
+        if sobol:
+            B = amostrar_entradas(sistema, distribuicoes, m, rng)
+            fB = compilado.avaliar(B, tamanho_bloco)
+            avaliacoes += m
+
+        bloco = {}
+        for s in saidas:
+            referencia.setdefault(s, float(fA[s].mean()))
+            fA[s] = fA[s] - referencia[s]
+            if sobol:
+                fB[s] = fB[s] - referencia[s]
+            valores = [fA[s], fB[s]] if sobol else [fA[s]]
+            for v in valores:
+                contagens[s] += np.histogram(v + referencia[s], bordas[s])[0]
+                soma[s] += float(v.sum())
+                soma2[s] += float((v ** 2).sum())
+            bloco[s] = {"s1": np.zeros(k), "st": np.zeros(k)}
+
+        if sobol:
+            for i in range(k):
+                AB = A.copy()
+                AB[:, i] = B[:, i]
+                fAB = compilado.avaliar(AB, tamanho_bloco)
+                avaliacoes += m
+                for s in saidas:
+                    fAB[s] = fAB[s] - referencia[s]
+                    s1 = float(np.sum(fB[s] * (fAB[s] - fA[s])))
+                    st = float(np.sum((fA[s] - fAB[s]) ** 2))
+                    s1_num[s][i] += s1
+                    st_num[s][i] += st
+                    bloco[s]["s1"][i] = s1 / m
+                    bloco[s]["st"][i] = st / m
+
+        feitas += m
+        blocos.append((m, bloco))
+        if any(feitas >= marca > feitas - m for marca in marcas):
+            convergencia.append({"amostras": feitas,
+                                 **estimar(feitas, feitas * (2 if sobol else 1))})
+
+    tempo = time.perf_counter() - t0
+    final = estimar(feitas, feitas * (2 if sobol else 1))
+
+    resultado = {}
+    for s in saidas:
+        media = final[s]["media"]
+        r = {
+            "media": media,
+            "desvio": float(np.sqrt(final[s]["variancia"])),
+            "erro_padrao_media": float(np.sqrt(final[s]["variancia"] / (feitas * (2 if sobol else 1)))),
+            "percentis": _percentis_histograma(contagens[s], bordas[s], (5, 25, 50, 75, 95)),
+            "histograma": (contagens[s], bordas[s]),
+        }
+        if sobol:
+            var = final[s]["variancia"]
+            sobol_s = {}
+            for i, var_nome in enumerate(entradas):
+                if var > 0 and len(blocos) > 1:
+                    s1_b = np.array([b[s]["s1"][i] for _, b in blocos]) / var
+                    st_b = np.array([b[s]["st"][i] for _, b in blocos]) / (2 * var)
+                    ic1 = 1.96 * s1_b.std(ddof=1) / np.sqrt(len(blocos))
+                    ict = 1.96 * st_b.std(ddof=1) / np.sqrt(len(blocos))
+                else:
+                    ic1 = ict = float("nan")
+                sobol_s[var_nome] = {"S1": float(final[s]["S1"][i]),
+                                     "ST": float(final[s]["ST"][i]),
+                                     "S1_ic95": float(ic1), "ST_ic95": float(ict)}
+            r["sobol"] = sobol_s
+        resultado[s] = r
+
+    return {
+        "saidas": resultado,
+        "convergencia": convergencia,
+        "amostras": feitas,
+        "avaliacoes": avaliacoes,
+        "tempo_s": tempo,
+        "avaliacoes_por_s": avaliacoes / tempo if tempo > 0 else float("inf"),
+    }
@@ -0,0 +1,366 @@
+import json
+import queue
+import sys
+import threading
+import time
+from http.client import HTTPConnection
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+from biblioteca import abrir_biblioteca
+from metricas import REGISTRO, responder_metricas
+from motor_fuzzy import carregar_sistema, compilar_sistema
+from sistemas_sinteticos import sistema_grade
+
+# -----------------------------------------------
+# SERVIÇO HTTP DE INFERÊNCIA COM MICRO-LOTES
+# -----------------------------------------------
+#
+# Expõe um `sistema` compilado em HTTP/JSON (só biblioteca padrão), sem
+# Streamlit. Requisições de uma linha chegam em threads diferentes; um
+# agendador junta as que chegam ao mesmo tempo num micro-lote (até
+# `max_lote` linhas ou `espera_max_ms` de espera desde a primeira) e avalia
+# o lote inteiro de uma vez com `SistemaCompilado.avaliar`.
+#
+# Rotas:
+#   POST /avaliar       {"valores": {"entrada": x, ...}}  -> {"saidas": {...}}
+#   POST /avaliar_lote  {"lote": [{"entrada": x, ...}, ...]} -> {"saidas": {s: [...]}}
+#   GET  /sistema       entradas e saídas com universos
+#   GET  /estatisticas  contadores do agendador
+#   GET  /metrics       métricas no formato Prometheus (ver metricas.py)
+#   GET  /saude
+#
+# Um sistema da biblioteca pode ser servido pelo hash (`da_biblioteca`): o
+# `SistemaCompilado` vem do cache de artefatos e só é compilado na primeira vez.
+
+LOTE_LINHAS = REGISTRO.histograma(
+    "fuzzy_servico_lote_linhas", "Linhas por micro-lote avaliado.",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024))
+REQUISICAO_DURACAO = REGISTRO.histograma(
+    "fuzzy_servico_requisicao_duracao_segundos",
+    "Duração das requisições HTTP, por rota e código.", ("rota", "codigo"))
+ROTAS_POST = ("/avaliar", "/avaliar_lote")
+
+
+class _Pedido:
+    __slots__ = ("linha", "evento", "resultado", "erro")
+
+    def __init__(self, linha):
+        self.linha = linha
+        self.evento = threading.Event()
+        self.resultado = None
+        self.erro = None
+
+
+class AgendadorLotes:
+    """
+    Junta avaliações de uma linha vindas de várias threads em micro-lotes.
+    `avaliar(valores)` bloqueia até o lote que contém a linha ser avaliado.
+    """
+
+    def __init__(self, compilado, max_lote=256, espera_max_ms=2.0):
+        self.compilado = compilado
+        self.max_lote = max(1, int(max_lote))
+        self.espera_max = max(0.0, espera_max_ms) / 1000
+        self._fila = queue.Queue()
+        self._trava = threading.Lock()
+        self.estatisticas = {"requisicoes": 0, "lotes": 0, "maior_lote": 0}
+        self._thread = threading.Thread(target=self._laco, daemon=True)
+        self._thread.start()
+
+    def linha(self, valores):
+        try:
+            return np.array([float(valores[e]) for e in self.compilado.entradas])
+        except KeyError as e:
+            raise ValueError(f"Falta o valor da entrada {e}.") from None
+        except (TypeError, ValueError):
+            raise ValueError("Os valores das entradas precisam ser numéricos.") from None
+
+    def avaliar(self, valores, timeout=30.0):
+        pedido = _Pedido(self.linha(valores))
+        self._fila.put(pedido)
+        if not pedido.evento.wait(timeout):
+            raise TimeoutError("Tempo esgotado esperando o lote.")
+        if pedido.erro is not None:
+            raise pedido.erro
+        return pedido.resultado
+
+    def _coletar(self, primeiro):
+        lote = [primeiro]
+        prazo = time.perf_counter() + self.espera_max
+        while len(lote) < self.max_lote:
+            try:
+                # Esvazia o que já está na fila sem esperar
+                item = self._fila.get_nowait()
+            except queue.Empty:
+                restante = prazo - time.perf_counter()
+                if restante <= 0:
+                    break
+                try:
+                    item = self._fila.get(timeout=restante)
+                except queue.Empty:
+                    break
+            if item is None:
+                self._fila.put(None)
+                break
+            lote.append(item)
+        return lote
+
+    def _laco(self):
+        while True:
+            primeiro = self._fila.get()
+            if primeiro is None:
+                return
+            lote = self._coletar(primeiro)
+            try:
+                saidas = self.compilado.avaliar(np.vstack([p.linha for p in lote]))
+                for i, p in enumerate(lote):
+                    p.resultado = {s: float(v[i]) for s, v in saidas.items()}
+            except Exception as e:
+                for p in lote:
+                    p.erro = e
+            LOTE_LINHAS.observar(len(lote))
+            with self._trava:
+                self.estatisticas["requisicoes"] += len(lote)
+                self.estatisticas["lotes"] += 1
+                self.estatisticas["maior_lote"] = max(self.estatisticas["maior_lote"], len(lote))
+            for p in lote:
+                p.evento.set()
+
+    def resumo(self):
+        with self._trava:
+            r = dict(self.estatisticas)
+        r["linhas_por_lote"] = r["requisicoes"] / r["lotes"] if r["lotes"] else 0.0
+        return r
+
+    def parar(self):
+        self._fila.put(None)
+        self._thread.join()
+
+
+# -----------------------------------------------
+# SERVIDOR HTTP
+# -----------------------------------------------
+
+
+class _Manipulador(BaseHTTPRequestHandler):
+    # Conexões persistentes: o gerador de carga reaproveita a conexão
+    protocol_version = "HTTP/1.1"
+    # Cabeçalho e corpo saem em escritas separadas; sem isso o Nagle soma ~40 ms
+    disable_nagle_algorithm = True
+
+    def log_message(self, formato, *args):
+        pass
+
+    def _responder(self, codigo, corpo):
+        dados = json.dumps(corpo).encode("utf-8")
+        self.send_response(codigo)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(dados)))
+        self.end_headers()
+        self.wfile.write(dados)
+
+    def _ler_json(self):
+        tamanho = int(self.headers.get("Content-Length", 0))
+        return json.loads(self.rfile.read(tamanho) or b"{}")
+
+    def do_GET(self):
+        servidor = self.server
+        if self.path == "/saude":
+            self._responder(200, {"ok": True})
+        elif self.path == "/estatisticas":
+            self._responder(200, servidor.agendador.resumo())
+        elif self.path in ("/metrics", "/metricas"):
+            responder_metricas(self)
+        elif self.path == "/sistema":
+            sistema = servidor.sistema
+            self._responder(200, {
+                secao: {nome: info["universo"] for nome, info in sistema[secao].items()}
+                for secao in ("entradas", "saidas")
+            })
+        else:
+            self._responder(404, {"erro": "Rota não encontrada."})
+
+    def do_POST(self):
+        t0 = time.perf_counter()
+        codigo = self._tratar_post()
+        rota = self.path if self.path in ROTAS_POST else "outra"
+        REQUISICAO_DURACAO.observar(time.perf_counter() - t0, rota, str(codigo))
+
+    def _tratar_post(self):
+        servidor = self.server
+        try:
+            corpo = self._ler_json()
+            if self.path == "/avaliar":
+                saidas = servidor.agendador.avaliar(corpo.get("valores", {}))
+                self._responder(200, {"saidas": saidas})
+            elif self.path == "/avaliar_lote":
+                # Lotes explícitos já são vetorizados: vão direto ao motor
+                agendador = servidor.agendador
+                X = np.array([agendador.linha(v) for v in corpo.get("lote", [])]).reshape(
+                    -1, len(agendador.compilado.entradas))
+                saidas = agendador.compilado.avaliar(X)
+                self._responder(200, {"saidas": {s: v.tolist() for s, v in saidas.items()}})
+            else:
+                self._responder(404, {"erro": "Rota não encontrada."})
+                return 404
+            return 200
+        except (ValueError, AttributeError) as e:
+            self._responder(400, {"erro": str(e)})
+            return 400
+        except Exception as e:
+            self._responder(500, {"erro": str(e)})
+            return 500
+
+
+class ServidorInferencia(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, sistema, host="127.0.0.1", porta=8000, ops=None, ag="max",
+                 df="centroid", max_lote=256, espera_max_ms=2.0, compilado=None):
+        self.sistema = carregar_sistema(sistema)
+        compilado = compilado or compilar_sistema(self.sistema, ops, ag, df)
+        self.agendador = AgendadorLotes(compilado, max_lote, espera_max_ms)
+        super().__init__((host, porta), _Manipulador)
+
+    @classmethod
+    def da_biblioteca(cls, chave, host="127.0.0.1", porta=8000, ops=None, ag="max",
+                      df="centroid", max_lote=256, espera_max_ms=2.0, biblioteca=None,
+                      backend=None):
+        """Serve o sistema da biblioteca com esse hash (ou prefixo do hash)."""
+        biblioteca = biblioteca or abrir_biblioteca()
+        chave = biblioteca.resolver_hash(chave)
+        return cls(biblioteca.carregar(chave), host, porta, max_lote=max_lote,
+                   espera_max_ms=espera_max_ms,
+                   compilado=biblioteca.compilado(chave, ops, ag, df, backend=backend))
+
+    @property
+    def url(self):
+        host, porta = self.server_address[:2]
+        return f"http://{host}:{porta}"
+
+    def iniciar_em_segundo_plano(self):
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return thread
+
+    def encerrar(self):
+        self.shutdown()
+        self.server_close()
+        self.agendador.parar()
+
+
+# -----------------------------------------------
+# GERADOR DE CARGA
+# -----------------------------------------------
+
+
+def gerar_carga(url, sistema, n_requisicoes=5000, concorrencia=32, semente=0):
+    """
+    Dispara `n_requisicoes` POST /avaliar de `concorrencia` clientes em
+    paralelo (cada um com uma conexão persistente), com entradas uniformes
+    nos universos. Retorna latências (p50/p90/p99/máx, em ms) e vazão.
+    """
+    sistema = carregar_sistema(sistema)
+    rng = np.random.default_rng(semente)
+    nomes = list(sistema["entradas"])
+    X = np.column_stack([rng.uniform(*map(float, sistema["entradas"][e]["universo"]), n_requisicoes)
+                         for e in nomes])
+    corpos = [json.dumps({"valores": dict(zip(nomes, map(float, linha)))}).encode()
+              for linha in X]
+    host, porta = url.split("://", 1)[-1].rsplit(":", 1)
+    latencias = np.full(n_requisicoes, np.nan)
+    erros = []
+
+    def cliente(indices):
+        conexao = HTTPConnection(host, int(porta), timeout=30)
+        try:
+            for i in indices:
+                t0 = time.perf_counter()
+                try:
+                    conexao.request("POST", "/avaliar", corpos[i],
+                                    {"Content-Type": "application/json"})
+                    resposta = conexao.getresponse()
+                    resposta.read()
+                except OSError as e:
+                    erros.append(repr(e))
+                    conexao.close()
+                    continue
+                latencias[i] = time.perf_counter() - t0
+                if resposta.status != 200:
+                    erros.append(resposta.status)
+        finally:
+            conexao.close()
+
+    grupos = np.array_split(np.arange(n_requisicoes), concorrencia)
+    threads = [threading.Thread(target=cliente, args=(g,)) for g in grupos]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    duracao = time.perf_counter() - t0
+
+    ms = latencias * 1000
+    return {
+        "requisicoes": n_requisicoes,
+        "concorrencia": concorrencia,
+        "erros": len(erros),
+        "tempo_s": duracao,
+        "requisicoes_por_s": n_requisicoes / duracao,
+        "p50_ms": float(np.nanpercentile(ms, 50)),
+        "p90_ms": float(np.nanpercentile(ms, 90)),
+        "p99_ms": float(np.nanpercentile(ms, 99)),
+        "max_ms": float(np.nanmax(ms)),
+    }
+
+
+def comparar_lotes(sistema, configuracoes=((1, 0.0), (64, 1.0), (256, 2.0)),
+                   n_requisicoes=5000, concorrencia=32):
+    """Roda o gerador de carga contra um servidor local para cada (max_lote, espera_max_ms)."""
+    relatorio = []
+    for max_lote, espera in configuracoes:
+        servidor = ServidorInferencia(sistema, porta=0, max_lote=max_lote, espera_max_ms=espera)
+        servidor.iniciar_em_segundo_plano()
+        try:
+            r = gerar_carga(servidor.url, servidor.sistema, n_requisicoes, concorrencia)
+            r.update(max_lote=max_lote, espera_max_ms=espera,
+                     linhas_por_lote=servidor.agendador.resumo()["linhas_por_lote"])
+            relatorio.append(r)
+        finally:
+            servidor.encerrar()
+    return relatorio
+
+
+if __name__ == "__main__":
+    # python servico.py sistema.json [porta]   -> serve o sistema
+    # python servico.py --biblioteca=HASH [porta] -> serve um sistema da biblioteca
+    # python servico.py [sistema.json] --carga -> compara configurações de lote
+    #                                           (sem arquivo: `sistema_grade()`)
+    from controle import sistema_ventilador
+
+    argumentos = [a for a in sys.argv[1:] if not a.startswith("--")]
+    if "--carga" in sys.argv:
+        for r in comparar_lotes(argumentos[0] if argumentos else sistema_grade()):
+            print(f"max_lote={r['max_lote']:>3} espera={r['espera_max_ms']}ms: "
+                  f"{r['requisicoes_por_s']:,.0f} req/s, p50={r['p50_ms']:.2f}ms "
+                  f"p99={r['p99_ms']:.2f}ms, {r['linhas_por_lote']:.1f} linhas/lote, "
+                  f"erros={r['erros']}")
+    else:
+        chave = next((a.split("=", 1)[1] for a in sys.argv[1:]
+                      if a.startswith("--biblioteca=")), None)
+        if chave:
+            porta = int(argumentos[0]) if argumentos else 8000
+            servidor = ServidorInferencia.da_biblioteca(chave, porta=porta)
+        else:
+            sistema = argumentos[0] if argumentos else sistema_ventilador()
+            porta = int(argumentos[1]) if len(argumentos) > 1 else 8000
+            servidor = ServidorInferencia(sistema, porta=porta)
+        print(f"Servindo em {servidor.url} (Ctrl+C para sair)")
+        try:
+            servidor.serve_forever()
+        except KeyboardInterrupt:
+            servidor.server_close()
+            servidor.agendador.parar()
@@ -0,0 +1,56 @@
+import itertools
+
+import numpy as np
+
+# -----------------------------------------------
+# SISTEMAS SINTÉTICOS (BENCHMARKS E CARGA)
+# -----------------------------------------------
+#
+# Sistemas gerados para medir os motores, o serviço, os prompts e a
+# interface sem depender de um sistema salvo. Variáveis em [0, 100] com
+# `n_conjuntos` triângulos igualmente espaçados (c0, c1, ...).
+#   sistema_grade      uma regra AND por combinação (conjuntos^entradas regras)
+#   sistema_aleatorio  `n_regras` regras sorteadas, 1 a 3 antecedentes, AND/OR
+
+
+def _variavel(n_conjuntos):
+    # Dicts novos a cada variável: nada compartilhado entre elas
+    passo = 100 / max(n_conjuntos - 1, 1)
+    return {"universo": [0.0, 100.0],
+            "conjuntos": {f"c{k}": {"tipo": "trimf",
+                                    "params": [(k - 1) * passo, k * passo, (k + 1) * passo]}
+                          for k in range(n_conjuntos)}}
+
+
+def sistema_grade(n_entradas=3, n_conjuntos=5):
+    """
+    `n_entradas` entradas com `n_conjuntos` triângulos cada e uma regra AND
+    para cada combinação; a saída "y" tem os mesmos conjuntos.
+    """
+    regras = [
+        {"antecedentes": [(f"x{i}", f"c{k}") for i, k in enumerate(combinacao)],
+         "consequente": ("y", f"c{sum(combinacao) % n_conjuntos}"), "logica": "AND"}
+        for combinacao in itertools.product(range(n_conjuntos), repeat=n_entradas)
+    ]
+    return {"entradas": {f"x{i}": _variavel(n_conjuntos) for i in range(n_entradas)},
+            "saidas": {"y": _variavel(n_conjuntos)},
+            "regras": regras}
+
+
+def sistema_aleatorio(n_entradas=3, n_conjuntos=5, n_regras=25, n_saidas=1, semente=0):
+    """
+    `n_regras` regras sorteadas (1 a 3 antecedentes, 70% AND) sobre
+    entradas x0.. e saídas y0.., com `n_conjuntos` triângulos por variável.
+    """
+    rng = np.random.default_rng(semente)
+    regras = []
+    for _ in range(n_regras):
+        usadas = rng.choice(n_entradas, int(rng.integers(1, min(3, n_entradas) + 1)), replace=False)
+        regras.append({
+            "antecedentes": [(f"x{i}", f"c{int(rng.integers(n_conjuntos))}") for i in usadas],
+            "consequente": (f"y{int(rng.integers(n_saidas))}", f"c{int(rng.integers(n_conjuntos))}"),
+            "logica": "AND" if rng.random() < 0.7 else "OR",
+        })
+    return {"entradas": {f"x{i}": _variavel(n_conjuntos) for i in range(n_entradas)},
+            "saidas": {f"y{j}": _variavel(n_conjuntos) for j in range(n_saidas)},
+            "regras": regras}
@@ -0,0 +1,265 @@
+import copy
+import time
+
+import numpy as np
+
+from metricas import DURACAO_ETAPA, INFERENCIAS
+from motor_fuzzy import RESOLUCAO, SistemaCompilado, avaliar_mf, validate_mf_params
+
+# -----------------------------------------------
+# CONJUNTOS FUZZY TIPO 2 INTERVALARES
+# -----------------------------------------------
+#
+# Um conjunto tipo 2 é um conjunto comum com duas chaves extras:
+#   {"tipo": "trimf", "params": [...],          <- função superior
+#    "params_inf": [...], "altura_inf": 0.8}    <- função inferior
+# A função inferior usa o mesmo tipo, é multiplicada por `altura_inf` e
+# limitada à superior. Conjuntos sem "params_inf" são tipo 1 (inferior ==
+# superior), então sistemas tipo 1 continuam funcionando sem mudança.
+#
+# Inferência Mamdani intervalar: cada regra dispara em [f_inf, f_sup], a
+# agregação gera as curvas inferior/superior e a redução de tipo calcula o
+# centroide intervalar [yl, yr]; a saída é (yl + yr) / 2.
+
+REDUTORES = ("ekm", "nie_tan", "exaustivo")
+
+_ETAPA_REDUCAO = DURACAO_ETAPA.rotulos("reducao_tipo")
+_INFERENCIAS_TIPO2 = INFERENCIAS.rotulos("tipo2")
+
+
+def e_tipo2(conj):
+    return "params_inf" in conj
+
+
+def possui_tipo2(sistema):
+    return any(e_tipo2(c)
+               for secao in ("entradas", "saidas")
+               for info in sistema[secao].values()
+               for c in info["conjuntos"].values())
+
+
+def validate_it2_params(tipo, params, params_inf, altura=1.0):
+    """
+    Valida um conjunto tipo 2: os dois conjuntos de params pelo
+    `validate_mf_params` e 0 < altura <= 1.
+    Retorna (True, "") se válido, caso contrário (False, mensagem_erro)
+    """
+    ok, msg = validate_mf_params(tipo, params)
+    if not ok:
+        return False, "Função superior: " + msg
+    ok, msg = validate_mf_params(tipo, params_inf)
+    if not ok:
+        return False, "Função inferior: " + msg
+    try:
+        altura = float(altura)
+    except Exception:
+        return False, "A altura da função inferior precisa ser numérica."
+    if not (0 < altura <= 1):
+        return False, "A altura da função inferior deve estar em (0, 1]."
+    return True, ""
+
+
+def _sistema_inferior(sistema):
+    """Cópia do sistema em que cada conjunto usa os params da função inferior."""
+    inf = copy.deepcopy(sistema)
+    for secao in ("entradas", "saidas"):
+        for info in inf[secao].values():
+            for c in info["conjuntos"].values():
+                if e_tipo2(c):
+                    c["params"] = [float(p) for p in c["params_inf"]]
+    return inf
+
+
+def _limitar_inferior(sistema, sup, inf):
+    """Aplica a altura e garante inferior <= superior nas curvas amostradas."""
+    for t, (var, conj) in enumerate(inf.termos):
+        altura = float(sistema["entradas"][var]["conjuntos"][conj].get("altura_inf", 1.0))
+        inf.curvas_termos[t] = np.minimum(inf.curvas_termos[t] * altura, sup.curvas_termos[t])
+    for saida, conjs in inf.conjuntos_saida.items():
+        for k, conj in enumerate(conjs):
+            altura = float(sistema["saidas"][saida]["conjuntos"][conj].get("altura_inf", 1.0))
+            inf.curvas_saida[saida][k] = np.minimum(
+                inf.curvas_saida[saida][k] * altura, sup.curvas_saida[saida][k])
+
+
+# -----------------------------------------------
+# REDUÇÃO DE TIPO (VETORIZADA EM LOTE)
+# -----------------------------------------------
+
+
+def reduzir_nie_tan(xs, L, U):
+    """Aproximação fechada de Nie–Tan: centroide de (L + U) / 2."""
+    w = L + U
+    den = w.sum(axis=1)
+    y = np.divide(w @ xs, den, out=np.zeros(len(w)), where=den > 0)
+    return y, y, y
+
+
+def _somas(xs, L, U):
+    d = U - L
+    return (np.cumsum(d, axis=1), np.cumsum(d * xs, axis=1),
+            L.sum(axis=1), L @ xs, U.sum(axis=1), U @ xs)
+
+
+def reduzir_ekm(xs, L, U, max_iter=100):
+    """
+    Karnik–Mendel aprimorado (EKM) para todas as linhas de uma vez.
+    Com somas prefixadas de (U - L), cada iteração custa O(1) por linha:
+      yl(k) = (sum(x L) + P_xd[k]) / (sum(L) + P_d[k])   (U até k, L depois)
+      yr(k) = (sum(x U) - P_xd[k]) / (sum(U) - P_d[k])   (L até k, U depois)
+    Início do EKM (ponto de troca k ≈ m/2.4 para yl e m/1.7 para yr) e
+    parada quando o ponto de troca não muda. Retorna (y, yl, yr, iteracoes).
+    """
+    n, m = L.shape
+    Pd, Pxd, sL, sxL, sU, sxU = _somas(xs, L, U)
+    linhas = np.arange(n)
+    iteracoes = 0
+
+    def indice(y):
+        return np.clip(np.searchsorted(xs, y, side="right") - 1, 0, m - 2)
+
+    def resolver(esquerda):
+        nonlocal iteracoes
+        y = np.zeros(n)
+        # k do artigo conta a partir de 1; aqui k é o índice do último ponto antes da troca
+        k = np.full(n, min(max(round(m / (2.4 if esquerda else 1.7)) - 1, 0), m - 2))
+        ativas = sU > 0
+        for _ in range(max_iter):
+            if not ativas.any():
+                break
+            iteracoes += 1
+            r = linhas[ativas]
+            kr = k[r]
+            if esquerda:
+                a = sxL[r] + Pxd[r, kr]
+                b = sL[r] + Pd[r, kr]
+            else:
+                a = sxU[r] - Pxd[r, kr]
+                b = sU[r] - Pd[r, kr]
+            novo = np.divide(a, b, out=y[r].copy(), where=b > 0)
+            y[r] = novo
+            k2 = indice(novo)
+            parou = k2 == kr
+            k[r] = k2
+            ativas[r[parou]] = False
+        return y
+
+    yl = resolver(True)
+    yr = resolver(False)
+    vazias = sU <= 0
+    yl[vazias] = yr[vazias] = 0.0
+    return (yl + yr) / 2, yl, yr, iteracoes
+
+
+def reduzir_exaustivo(xs, L, U):
+    """Avalia todos os pontos de troca (referência para conferir o EKM)."""
+    Pd, Pxd, sL, sxL, sU, sxU = _somas(xs, L, U)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        yl = np.nanmin((sxL[:, None] + Pxd) / (sL[:, None] + Pd), axis=1)
+        yr = np.nanmax((sxU[:, None] - Pxd) / (sU[:, None] - Pd), axis=1)
+    vazias = sU <= 0
+    yl[vazias] = yr[vazias] = 0.0
+    return (yl + yr) / 2, yl, yr
+
+
+# -----------------------------------------------
+# SISTEMA TIPO 2 COMPILADO
+# -----------------------------------------------
+
+
+class SistemaTipo2:
+    """
+    Avaliação em lote de um sistema tipo 2 intervalar. Reaproveita dois
+    `SistemaCompilado` (funções superiores e inferiores) com as mesmas regras.
+    A defuzzificação é sempre pelo centroide intervalar (redução de tipo).
+    """
+
+    def __init__(self, sistema, ops=None, ag="max", redutor="ekm", resolucao=RESOLUCAO):
+        if redutor not in REDUTORES:
+            raise ValueError(f"Redutor desconhecido: {redutor}")
+        self.redutor = redutor
+        self.superior = SistemaCompilado(sistema, ops, ag, "centroid", resolucao)
+        self.inferior = SistemaCompilado(_sistema_inferior(sistema), ops, ag, "centroid", resolucao)
+        _limitar_inferior(sistema, self.superior, self.inferior)
+        self.entradas = self.superior.entradas
+        self.saidas = self.superior.saidas
+        self.iteracoes = 0
+
+    def agregar(self, X):
+        """Curvas agregadas {saida: (inferior, superior)}, cada uma (N, resolucao)."""
+        X = self.superior.matriz_entradas(X)
+        F_inf = self.inferior.forcas(self.inferior.graus(X))
+        F_sup = self.superior.forcas(self.superior.graus(X))
+        inf = self.inferior.agregar(F_inf)
+        sup = self.superior.agregar(F_sup)
+        return {s: (inf[s], sup[s]) for s in self.saidas}
+
+    def reduzir(self, xs, L, U):
+        if self.redutor == "nie_tan":
+            return reduzir_nie_tan(xs, L, U)
+        if self.redutor == "exaustivo":
+            return reduzir_exaustivo(xs, L, U)
+        y, yl, yr, it = reduzir_ekm(xs, L, U)
+        self.iteracoes += it
+        return y, yl, yr
+
+    def avaliar_intervalo(self, dados, tamanho_bloco=4096):
+        """Retorna {saida: (y, yl, yr)} com arrays (N,)."""
+        X = self.superior.matriz_entradas(dados)
+        n = X.shape[0]
+        res = {s: (np.zeros(n), np.zeros(n), np.zeros(n)) for s in self.saidas}
+        for inicio in range(0, n, tamanho_bloco):
+            bloco = X[inicio:inicio + tamanho_bloco]
+            for s, (L, U) in self.agregar(bloco).items():
+                t0 = time.perf_counter()
+                reduzidos = self.reduzir(self.superior.x_saidas[s], L, U)
+                _ETAPA_REDUCAO.observar(time.perf_counter() - t0)
+                for destino, valores in zip(res[s], reduzidos):
+                    destino[inicio:inicio + len(bloco)] = valores
+        _INFERENCIAS_TIPO2.inc(n)
+        return res
+
+    def avaliar(self, dados, tamanho_bloco=4096):
+        """Mesma interface de `SistemaCompilado.avaliar`: {saida: y}."""
+        return {s: v[0] for s, v in self.avaliar_intervalo(dados, tamanho_bloco).items()}
+
+
+def comparar_com_tipo1(sistema, n=100_000, ops=None, ag="max", semente=0):
+    """
+    Mede amostras/s do sistema tipo 1 (funções superiores) e do tipo 2 com
+    cada redutor, e a diferença máxima do EKM para o exaustivo.
+    """
+    rng = np.random.default_rng(semente)
+    X = np.column_stack([rng.uniform(*map(float, info["universo"]), n)
+                         for info in sistema["entradas"].values()])
+    relatorio = {}
+
+    tipo1 = SistemaCompilado(sistema, ops, ag, "centroid")
+    t0 = time.perf_counter()
+    tipo1.avaliar(X)
+    t1 = time.perf_counter() - t0
+    relatorio["tipo1"] = {"tempo_s": t1, "amostras_por_s": n / t1}
+
+    resultados = {}
+    for redutor in REDUTORES:
+        it2 = SistemaTipo2(sistema, ops, ag, redutor)
+        t0 = time.perf_counter()
+        resultados[redutor] = it2.avaliar(X)
+        t = time.perf_counter() - t0
+        relatorio[redutor] = {"tempo_s": t, "amostras_por_s": n / t, "custo_vs_tipo1": t / t1}
+        if redutor == "ekm":
+            relatorio[redutor]["iteracoes"] = it2.iteracoes
+
+    relatorio["erro_ekm_vs_exaustivo"] = max(
+        (float(np.max(np.abs(resultados["ekm"][s] - resultados["exaustivo"][s])))
+         for s in resultados["ekm"]), default=0.0)
+    return relatorio
+
+
+def curvas_tipo2(xs, conj):
+    """Funções inferior e superior de um conjunto, para os gráficos."""
+    sup = avaliar_mf(conj["tipo"], xs, conj["params"])
+    if not e_tipo2(conj):
+        return sup, sup
+    inf = avaliar_mf(conj["tipo"], xs, conj["params_inf"]) * float(conj.get("altura_inf", 1.0))
+    return np.minimum(inf, sup), sup
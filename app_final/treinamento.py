@@ -0,0 +1,403 @@
+import copy
+import time
+
+import numpy as np
+
+from motor_fuzzy import RESOLUCAO, como_matriz, compilar_sistema, validate_mf_params
+
+# -----------------------------------------------
+# AJUSTE DE PARÂMETROS POR GRADIENTE (ESTILO ANFIS)
+# -----------------------------------------------
+#
+# O ajuste usa a mesma estrutura de inferência do Simulador (Mamdani com
+# defuzzificação por centroide), mas calcula as pertinências das entradas
+# de forma exata (e não interpolada) para obter derivadas analíticas.
+# Em min/max o gradiente segue o termo/regra "vencedor" (subgradiente).
+# Nas demais t-normas/t-conormas do registro (Łukasiewicz, Hamacher, ...)
+# a derivada das forças em relação aos graus é numérica.
+
+_PASSO_DIFERENCA = 1e-6
+
+# Amostras (fixas) em que a perda é medida no fim de cada época
+_AMOSTRAS_AVALIACAO = 4096
+
+
+def extrair_parametros(sistema):
+    """
+    Junta os params de todos os conjuntos (entradas e saídas) em um vetor.
+    Retorna (theta, layout); cada item do layout é
+    (secao, variavel, conjunto, tipo, inicio, fim, largura_do_universo).
+    """
+    valores = []
+    layout = []
+    for secao in ("entradas", "saidas"):
+        for var, info in sistema[secao].items():
+            umin, umax = info["universo"]
+            for conj, cinfo in info["conjuntos"].items():
+                params = [float(p) for p in cinfo["params"]]
+                inicio = len(valores)
+                valores.extend(params)
+                layout.append((secao, var, conj, cinfo["tipo"], inicio,
+                               len(valores), float(umax) - float(umin)))
+    return np.array(valores), layout
+
+
+def aplicar_parametros(sistema, theta, layout):
+    """Devolve uma cópia do sistema com os params trocados pelos de `theta`."""
+    novo = copy.deepcopy(sistema)
+    # Variáveis que compartilham o mesmo dict de conjuntos (deepcopy mantém o
+    # compartilhamento) receberiam os params umas das outras
+    for secao in ("entradas", "saidas"):
+        for var, info in novo[secao].items():
+            novo[secao][var] = {**info, "conjuntos": {c: dict(ci) for c, ci
+                                                      in info["conjuntos"].items()}}
+    for secao, var, conj, _, inicio, fim, _ in layout:
+        novo[secao][var]["conjuntos"][conj]["params"] = [
+            float(v) for v in theta[inicio:fim]]
+    return novo
+
+
+def _isotonica(v):
+    """Projeção euclidiana de v no conjunto v[0] <= v[1] <= ... (PAVA)."""
+    blocos = []  # [soma, quantidade]
+    for x in v:
+        blocos.append([x, 1])
+        while len(blocos) > 1 and blocos[-2][0] / blocos[-2][1] > blocos[-1][0] / blocos[-1][1]:
+            s, n = blocos.pop()
+            blocos[-1][0] += s
+            blocos[-1][1] += n
+    saida = []
+    for s, n in blocos:
+        saida.extend([s / n] * n)
+    return np.array(saida)
+
+
+def projetar_parametros(theta, layout, sigma_min=1e-3):
+    """
+    Mantém os params válidos para `validate_mf_params`:
+    a <= b <= c (<= d) para trimf/trapmf e sigma > 0 para gaussmf.
+    """
+    theta = theta.copy()
+    for _, _, _, tipo, inicio, fim, largura in layout:
+        if tipo in ("trimf", "trapmf"):
+            theta[inicio:fim] = _isotonica(theta[inicio:fim])
+        else:
+            theta[inicio] = max(theta[inicio], sigma_min * max(largura, 1.0))
+    return theta
+
+
+def mf_e_derivadas(tipo, x, params):
+    """
+    Pertinência exata em `x` e suas derivadas em relação aos params.
+    Retorna (y, dy) com y.shape == x.shape e dy.shape == x.shape + (len(params),).
+    """
+    y = np.zeros_like(x)
+    dy = np.zeros(x.shape + (len(params),))
+
+    if tipo == "gaussmf":
+        sigma, mean = params
+        d = x - mean
+        y = np.exp(-(d ** 2) / (2 * sigma ** 2))
+        dy[..., 0] = y * d ** 2 / sigma ** 3
+        dy[..., 1] = y * d / sigma ** 2
+        return y, dy
+
+    # trimf é um trapmf com topo degenerado (b == c)
+    if tipo == "trimf":
+        a, b, c = params
+        ini, topo_i, topo_f, fim = a, b, b, c
+        idx = (0, 1, 1, 2)
+    else:
+        ini, topo_i, topo_f, fim = params
+        idx = (0, 1, 2, 3)
+
+    # Rampa de subida: (x - ini) / (topo_i - ini)
+    m = (ini < x) & (x < topo_i)
+    if topo_i > ini:
+        w = topo_i - ini
+        y[m] = (x[m] - ini) / w
+        dy[m, idx[0]] += (x[m] - topo_i) / w ** 2
+        dy[m, idx[1]] += -(x[m] - ini) / w ** 2
+
+    # Topo (derivada nula)
+    y[(topo_i <= x) & (x <= topo_f)] = 1.0
+
+    # Rampa de descida: (fim - x) / (fim - topo_f)
+    m = (topo_f < x) & (x < fim)
+    if fim > topo_f:
+        w = fim - topo_f
+        y[m] = (fim - x[m]) / w
+        dy[m, idx[2]] += (fim - x[m]) / w ** 2
+        dy[m, idx[3]] += (x[m] - topo_f) / w ** 2
+    return y, dy
+
+
+class _Estrutura:
+    """Índices pré-calculados que ligam termos/regras às fatias de theta."""
+
+    def __init__(self, compilado, layout):
+        fatias = {(s, v, c): (i, f) for s, v, c, _, i, f, _ in layout}
+        tipos = {(s, v, c): t for s, v, c, t, _, _, _ in layout}
+        self.compilado = compilado
+        self.termos = [(fatias[("entradas", v, c)], tipos[("entradas", v, c)],
+                        compilado.coluna_termo[t])
+                       for t, (v, c) in enumerate(compilado.termos)]
+        self.limites = np.array(
+            [(compilado.x_entradas[v][0], compilado.x_entradas[v][-1])
+             for v in compilado.entradas]).reshape(-1, 2)
+        self.saidas = []
+        for saida in compilado.saidas:
+            conjs = [(fatias[("saidas", saida, c)], tipos[("saidas", saida, c)])
+                     for c in compilado.conjuntos_saida[saida]]
+            # regras[k] = índices das regras cujo consequente é o conjunto k
+            regras = [[] for _ in conjs]
+            for r, (_, _, s, k) in enumerate(compilado.regras):
+                if s == saida:
+                    regras[k].append(r)
+            self.saidas.append((compilado.x_saidas[saida], conjs, regras))
+
+
+def _forcas_e_derivadas(compilado, G):
+    """Forças das regras (B, R) e, por regra, dF/dG dos seus antecedentes."""
+    B = G.shape[0]
+    F = np.empty((B, len(compilado.regras)))
+    dF = []
+    for r, (idx, eh_and, _, _) in enumerate(compilado.regras):
+        vals = G[:, idx]
+        m = vals.shape[1]
+        operador = compilado.tnorma if eh_and else compilado.tconorma
+        op = operador.base
+        if m == 1:
+            F[:, r] = vals[:, 0]
+            dF.append(np.ones((B, 1)))
+            continue
+        if op in ("min", "max"):
+            j = vals.argmin(axis=1) if op == "min" else vals.argmax(axis=1)
+            F[:, r] = vals[np.arange(B), j]
+            d = np.zeros((B, m))
+            d[np.arange(B), j] = 1.0
+        elif op == "prod":
+            F[:, r] = vals.prod(axis=1)
+            d = np.stack([np.delete(vals, i, axis=1).prod(axis=1)
+                          for i in range(m)], axis=1)
+        elif op == "prob_or":  # 1 - prod(1 - g)
+            comp = 1 - vals
+            F[:, r] = 1 - comp.prod(axis=1)
+            d = np.stack([np.delete(comp, i, axis=1).prod(axis=1)
+                          for i in range(m)], axis=1)
+        else:
+            # Demais operadores do registro: diferença central, presa a [0, 1]
+            F[:, r] = operador.reduzir(vals, 1)
+            d = np.empty((B, m))
+            for i in range(m):
+                acima, abaixo = vals.copy(), vals.copy()
+                acima[:, i] = np.minimum(vals[:, i] + _PASSO_DIFERENCA, 1)
+                abaixo[:, i] = np.maximum(vals[:, i] - _PASSO_DIFERENCA, 0)
+                d[:, i] = ((operador.reduzir(acima, 1) - operador.reduzir(abaixo, 1))
+                           / (acima[:, i] - abaixo[:, i]))
+        dF.append(d)
+    return F, dF
+
+
+def perda_e_gradiente(estrutura, theta, X, Y):
+    """
+    Passo direto + retropropagação em um mini-lote.
+    X: (B, n_entradas), Y: (B, n_saidas) com alvos na ordem de `compilado.saidas`
+    (NaN ignora o alvo, assim como as linhas em que nenhuma regra dispara).
+    Retorna (erro quadrático médio, gradiente em theta).
+    """
+    compilado = estrutura.compilado
+    B = X.shape[0]
+    X = np.clip(X, estrutura.limites[:, 0], estrutura.limites[:, 1])
+    grad = np.zeros_like(theta)
+
+    # ---- Fuzzificação exata ----
+    G = np.empty((B, len(estrutura.termos)))
+    dG_params = []
+    for t, ((i, f), tipo, col) in enumerate(estrutura.termos):
+        G[:, t], d = mf_e_derivadas(tipo, X[:, col], theta[i:f])
+        dG_params.append(d)
+
+    # ---- Disparo das regras ----
+    F, dF_dG = _forcas_e_derivadas(compilado, G)
+    gF = np.zeros_like(F)
+
+    validos = ~np.isnan(Y)
+    # A média só é conhecida depois de todas as saídas: gradiente acumulado
+    # como soma e dividido no final
+    n_alvos = 0
+    perda = 0.0
+
+    for o, (xs, conjs, regras) in enumerate(estrutura.saidas):
+        if not any(regras):
+            continue
+        curvas, dcurvas = [], []
+        for (i, f), tipo in conjs:
+            c, dc = mf_e_derivadas(tipo, xs, theta[i:f])
+            curvas.append(c)
+            dcurvas.append(dc)
+
+        # ---- Agregação ----
+        if compilado.agregacao == "max":
+            # Regras com o mesmo consequente se reduzem a max das forças
+            agg = np.zeros((B, len(xs)))
+            vencedora = np.full((B, len(xs)), -1)
+            fk, rk = [], []
+            for k, regras_k in enumerate(regras):
+                Fk = F[:, regras_k]
+                j = Fk.argmax(axis=1)
+                fk.append(Fk[np.arange(B), j])
+                rk.append(np.asarray(regras_k)[j])
+                cortada = np.minimum(fk[k][:, None], curvas[k])
+                melhor = cortada > agg
+                agg = np.where(melhor, cortada, agg)
+                vencedora[melhor] = k
+        else:
+            total = np.zeros((B, len(xs)))
+            for k, regras_k in enumerate(regras):
+                for r in regras_k:
+                    total += np.minimum(F[:, r, None], curvas[k])
+            agg = np.minimum(total, 1)
+            ativa = total < 1
+
+        # ---- Centroide ----
+        den = agg.sum(axis=1)
+        ok = den > 0
+        y = np.divide(agg @ xs, den, out=np.zeros(B), where=ok)
+
+        alvo = Y[:, o]
+        usa = validos[:, o] & ok
+        erro = np.where(usa, y - np.nan_to_num(alvo), 0.0)
+        perda += float((erro ** 2).sum())
+        n_alvos += int(usa.sum())
+
+        dy = 2 * erro
+        dagg = np.divide(dy, den, out=np.zeros(B), where=ok)[:, None] * (xs[None, :] - y[:, None])
+
+        # ---- Retropropagação pela agregação ----
+        for k, regras_k in enumerate(regras):
+            (i, f), _ = conjs[k]
+            if compilado.agregacao == "max":
+                g = dagg * (vencedora == k)
+                pela_forca = fk[k][:, None] <= curvas[k]
+                np.add.at(gF, (np.arange(B), rk[k]), (g * pela_forca).sum(axis=1))
+                grad[i:f] += np.where(pela_forca, 0.0, g).sum(axis=0) @ dcurvas[k]
+                continue
+            g = dagg * ativa
+            for r in regras_k:
+                pela_forca = F[:, r, None] <= curvas[k]
+                gF[:, r] += (g * pela_forca).sum(axis=1)
+                grad[i:f] += np.where(pela_forca, 0.0, g).sum(axis=0) @ dcurvas[k]
+
+    # ---- Retropropagação pelas regras e fuzzificação ----
+    gG = np.zeros_like(G)
+    for r, (idx, _, _, _) in enumerate(compilado.regras):
+        np.add.at(gG.T, idx, (gF[:, r, None] * dF_dG[r]).T)
+    for t, ((i, f), _, _) in enumerate(estrutura.termos):
+        grad[i:f] += gG[:, t] @ dG_params[t]
+
+    n_alvos = max(n_alvos, 1)
+    return perda / n_alvos, grad / n_alvos
+
+
+def ajustar_parametros(sistema, X, Y, ops=None, ag="max", df="centroid",
+                       epocas=20, tamanho_lote=256, taxa=0.01, tol=1e-5,
+                       paciencia=3, resolucao=RESOLUCAO, semente=0, callback=None):
+    """
+    Ajusta os params das funções de pertinência a dados de entrada/saída
+    usando gradiente analítico, mini-lotes e Adam com projeção nas restrições.
+
+    X: dict {entrada: array} ou matriz (N, n_entradas); Y: idem para as saídas.
+    `taxa` é relativa à largura do universo de cada variável.
+    Retorna (sistema_ajustado, relatorio); relatorio["perda_final"] é a perda
+    do sistema devolvido, medida ao fim da melhor época.
+    """
+    if not df.lower().strip().startswith("centroid"):
+        raise ValueError(
+            "O ajuste por gradiente exige defuzzificação por centroide; "
+            "use o otimizador evolutivo para os demais métodos.")
+
+    compilado = compilar_sistema(sistema, ops, ag, df, resolucao)
+    theta, layout = extrair_parametros(sistema)
+    theta = projetar_parametros(theta, layout)
+    estrutura = _Estrutura(compilado, layout)
+
+    X = como_matriz(X, compilado.entradas)
+    Y = como_matriz(Y, compilado.saidas)
+    n = X.shape[0]
+
+    escala = np.empty_like(theta)
+    for _, _, _, _, inicio, fim, largura in layout:
+        escala[inicio:fim] = max(largura, 1e-9)
+
+    m = np.zeros_like(theta)
+    v = np.zeros_like(theta)
+    b1, b2, eps = 0.9, 0.999, 1e-8
+    passo = 0
+
+    rng = np.random.default_rng(semente)
+    # A perda da época é medida no theta do fim da época, sempre nas mesmas linhas
+    avaliacao = (np.arange(n) if n <= _AMOSTRAS_AVALIACAO
+                 else np.sort(rng.choice(n, _AMOSTRAS_AVALIACAO, replace=False)))
+    historico = []
+    melhor_theta, melhor_perda = theta.copy(), np.inf
+    sem_melhora = 0
+    convergiu = False
+    inicio_t = time.perf_counter()
+
+    for epoca in range(epocas):
+        ordem = rng.permutation(n)
+        soma, contagem = 0.0, 0
+        t0 = time.perf_counter()
+        for ini in range(0, n, tamanho_lote):
+            lote = ordem[ini:ini + tamanho_lote]
+            perda, grad = perda_e_gradiente(estrutura, theta, X[lote], Y[lote])
+            soma += perda * len(lote)
+            contagem += len(lote)
+
+            passo += 1
+            m = b1 * m + (1 - b1) * grad
+            v = b2 * v + (1 - b2) * grad ** 2
+            m_hat = m / (1 - b1 ** passo)
+            v_hat = v / (1 - b2 ** passo)
+            theta = theta - taxa * escala * m_hat / (np.sqrt(v_hat) + eps)
+            theta = projetar_parametros(theta, layout)
+
+        duracao = time.perf_counter() - t0
+        perda_epoca, _ = perda_e_gradiente(estrutura, theta, X[avaliacao], Y[avaliacao])
+        historico.append({
+            "epoca": epoca + 1,
+            "perda": perda_epoca,
+            "perda_lotes": soma / max(contagem, 1),
+            "amostras_por_s": contagem / duracao if duracao > 0 else float("inf"),
+        })
+        if callback is not None:
+            callback(historico[-1])
+
+        if perda_epoca < melhor_perda * (1 - tol):
+            melhor_perda, melhor_theta = perda_epoca, theta.copy()
+            sem_melhora = 0
+        else:
+            sem_melhora += 1
+            if sem_melhora >= paciencia:
+                convergiu = True
+                break
+
+    tempo = time.perf_counter() - inicio_t
+    ajustado = aplicar_parametros(sistema, melhor_theta, layout)
+    for secao in ("entradas", "saidas"):
+        for var, info in ajustado[secao].items():
+            for conj, cinfo in info["conjuntos"].items():
+                ok, msg = validate_mf_params(cinfo["tipo"], cinfo["params"])
+                if not ok:
+                    raise ValueError(f"Conjunto '{conj}' em '{var}' inválido após ajuste: {msg}")
+
+    relatorio = {
+        "historico": historico,
+        "perda_final": melhor_perda,
+        "epocas": len(historico),
+        "convergiu": convergiu,
+        "tempo_s": tempo,
+        "amostras_por_s": sum(h["amostras_por_s"] for h in historico) / max(len(historico), 1),
+    }
+    return ajustado, relatorio